@@ -0,0 +1,91 @@
+""" Management command to delete the old versions of split modulestore courses and libraries """
+import datetime
+from optparse import make_option
+from textwrap import dedent
+
+from django.core.management import BaseCommand, CommandError
+
+from xmodule.modulestore import ModuleStoreEnum
+from xmodule.modulestore.django import modulestore
+from xmodule.modulestore.split_mongo import compaction
+
+
+class Command(BaseCommand):
+    """
+    Command to delete the old structures of all split courses and libraries, and the definitions which only they
+    used. Without --commit it only reports what would be deleted.
+
+    Examples:
+
+        ./manage.py cms compact_split_history - reports what compaction would delete
+        ./manage.py cms compact_split_history --keep 5 --pause 1 --commit - keeps 5 versions of each branch
+    """
+    help = dedent(__doc__)
+
+    option_list = BaseCommand.option_list + (
+        make_option(
+            '--keep',
+            type='int',
+            dest='keep_versions',
+            default=compaction.DEFAULT_KEEP_VERSIONS,
+            help='Number of versions of each branch to keep, counting the current one'
+        ),
+        make_option(
+            '--min-age-days',
+            type='float',
+            dest='min_age_days',
+            default=compaction.DEFAULT_MIN_AGE.days,
+            help='Never delete anything created within this many days'
+        ),
+        make_option(
+            '--batch-size',
+            type='int',
+            dest='batch_size',
+            default=compaction.DEFAULT_BATCH_SIZE,
+            help='Number of documents to delete at a time'
+        ),
+        make_option(
+            '--pause',
+            type='float',
+            dest='pause',
+            default=0,
+            help='Seconds to wait between batches, to limit the load on the database'
+        ),
+        make_option(
+            '--commit',
+            action='store_true',
+            dest='commit',
+            default=False,
+            help='Delete the documents rather than only counting them'
+        ),
+    )
+
+    def handle(self, *args, **options):
+        if args:
+            raise CommandError("compact_split_history takes no arguments")
+        if options['keep_versions'] < 1:
+            raise CommandError("--keep must be at least 1")
+
+        store = modulestore()._get_modulestore_by_type(ModuleStoreEnum.Type.split)  # pylint: disable=protected-access
+        if store is None:
+            raise CommandError("No split modulestore is configured")
+
+        dry_run = not options['commit']
+        result = store.compact_history(
+            keep_versions=options['keep_versions'],
+            min_age=datetime.timedelta(days=options['min_age_days']),
+            batch_size=options['batch_size'],
+            pause=options['pause'],
+            dry_run=dry_run,
+        )
+
+        if dry_run:
+            self.stdout.write(
+                "Would delete {0.structures_deleted} structures and {0.definitions_deleted} definitions. "
+                "Run with --commit to delete them.\n".format(result)
+            )
+        else:
+            self.stdout.write(
+                "Deleted {0.structures_deleted} structures and {0.definitions_deleted} definitions, "
+                "reclaiming {0.bytes_reclaimed} bytes.\n".format(result)
+            )
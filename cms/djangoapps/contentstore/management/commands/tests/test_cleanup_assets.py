@@ -57,10 +57,14 @@ class ExportAllCourses(ModuleStoreTestCase):
         query = location_to_query(course_filter, wildcard=True, tag=XASSET_LOCATION_TAG)
         query['_id.name'] = all_assets[0]['_id']['name']
         asset_doc = self.content_store.fs_files.find_one(query)
+        # both copies reference the data of the asset
+        self.content_store.fs_files.update({'_id': asset_doc['blob_id']}, {'$inc': {'references': 2}})
         asset_doc['_id']['name'] = u'._example_test.txt'
         self.content_store.fs_files.insert(asset_doc)
         asset_doc['_id']['name'] = u'.DS_Store'
         self.content_store.fs_files.insert(asset_doc)
+        # the assets were added behind the content store's back, so its index of the course's assets is out of date
+        self.content_store.assets_changed(course.id)
 
         # check that now course has four assets
         all_assets, count = self.content_store.get_all_content_for_course(course.id)
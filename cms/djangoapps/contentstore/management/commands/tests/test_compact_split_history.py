@@ -0,0 +1,61 @@
+""" Tests for the compact_split_history command """
+import datetime
+
+from django.core.management import call_command, CommandError
+
+from xmodule.modulestore import ModuleStoreEnum
+from xmodule.modulestore.django import modulestore
+from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
+from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory
+
+
+class TestCompactSplitHistory(ModuleStoreTestCase):
+    """ Tests for the compact_split_history command """
+    def setUp(self):
+        super(TestCompactSplitHistory, self).setUp()
+        # pylint: disable=protected-access
+        self.split_store = modulestore()._get_modulestore_by_type(ModuleStoreEnum.Type.split)
+        self.course = CourseFactory.create(default_store=ModuleStoreEnum.Type.split)
+        self.original_version = self.split_store.get_course_history_info(self.course.id)['original_version']
+        chapter = ItemFactory.create(parent_location=self.course.location, category='chapter')
+        self.html = ItemFactory.create(parent_location=chapter.location, category='html', data='<p>Old</p>')
+        self.html.data = '<p>New</p>'
+        modulestore().update_item(self.html, self.user.id)
+
+    def structure_exists(self, version_guid):
+        """ Whether the structure with the given id is still stored """
+        return bool(self.split_store.db_connection.find_structures_by_id([version_guid]))
+
+    def compact(self, **options):
+        """
+        Runs the command, treating everything as old enough to delete, since it was all just created.
+        """
+        call_command('compact_split_history', min_age_days=-1, **options)
+
+    def test_dry_run(self):
+        self.compact(keep_versions=1)
+        self.assertTrue(self.structure_exists(self.original_version))
+
+    def test_compaction(self):
+        self.compact(keep_versions=1, batch_size=2, commit=True)
+        self.assertFalse(self.structure_exists(self.original_version))
+
+        # the current versions of the course are untouched
+        versions = self.split_store.get_course_index_info(self.course.id)['versions']
+        for branch in (ModuleStoreEnum.BranchName.draft, ModuleStoreEnum.BranchName.published):
+            self.assertTrue(self.structure_exists(versions[branch]))
+            course_key = self.course.id.for_branch(branch)
+            html = self.split_store.get_item(course_key.make_usage_key('html', self.html.location.block_id))
+            self.assertEqual(html.data, '<p>New</p>')
+
+        # nothing more is deleted the second time
+        result = self.split_store.compact_history(keep_versions=1, min_age=-datetime.timedelta(days=1))
+        self.assertEqual((result.structures_deleted, result.definitions_deleted), (0, 0))
+
+    def test_keep_versions(self):
+        self.compact(keep_versions=100, commit=True)
+        self.assertTrue(self.structure_exists(self.original_version))
+
+    def test_keep_at_least_one(self):
+        with self.assertRaises(CommandError):
+            self.compact(keep_versions=0)
@@ -1,7 +1,9 @@
-""" receivers of course_published and library_updated events in order to trigger indexing task """
+""" receivers of modulestore events in order to trigger indexing and cache update tasks """
 from datetime import datetime
 from pytz import UTC
 
+from django.conf import settings
+from django.core.cache import cache
 from django.dispatch import receiver
 
 from xmodule.modulestore.django import SignalHandler
@@ -28,3 +30,20 @@ def listen_for_library_update(sender, library_key, **kwargs):  # pylint: disable
     from .tasks import update_library_index
     if LibrarySearchIndexer.indexing_is_enabled():
         update_library_index.delay(unicode(library_key), datetime.now(UTC).isoformat())
+
+
+@receiver(SignalHandler.metadata_inheritance_changed)
+def listen_for_metadata_inheritance_change(sender, course_key, **kwargs):  # pylint: disable=unused-argument
+    """
+    Receives signal and kicks off celery task to recompute the course's metadata inheritance tree
+    """
+    # import here, because signal is registered at startup, but items in tasks are not yet able to be loaded
+    from .tasks import update_metadata_inheritance_tree, metadata_inheritance_update_pending_cache_key
+
+    # Every container edit sends the signal, so recomputations are debounced: the task is delayed, and further edits
+    # before it starts are picked up by that same run instead of scheduling another one. The flag expires on its own
+    # in case the task is lost.
+    delay = getattr(settings, 'METADATA_INHERITANCE_UPDATE_DELAY', 30)
+    if not cache.add(metadata_inheritance_update_pending_cache_key(course_key), True, delay + 300):
+        return
+    update_metadata_inheritance_tree.apply_async([unicode(course_key)], countdown=delay)
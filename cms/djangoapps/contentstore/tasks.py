@@ -9,12 +9,18 @@ from datetime import datetime
 from pytz import UTC
 
 from django.contrib.auth.models import User
+from django.core.cache import cache
 
+from cache_toolbox.core import del_cached_content
 from contentstore.courseware_index import CoursewareSearchIndexer, LibrarySearchIndexer, SearchIndexingError
 from contentstore.utils import initialize_permissions
 from course_action_state.models import CourseRerunState
-from opaque_keys.edx.keys import CourseKey
+from opaque_keys.edx.keys import AssetKey, CourseKey
+from xmodule.contentstore.content import DEFAULT_THUMBNAIL_VARIANT
+from xmodule.contentstore.django import contentstore
 from xmodule.course_module import CourseFields
+from xmodule.exceptions import NotFoundError
+from xmodule.modulestore import ModuleStoreEnum
 from xmodule.modulestore.django import modulestore
 from xmodule.modulestore.exceptions import DuplicateCourseError, ItemNotFoundError
 
@@ -117,6 +123,24 @@ def update_library_index(library_id, triggered_time_isoformat):
         LOGGER.debug('Search indexing successful for library %s', library_id)
 
 
+def metadata_inheritance_update_pending_cache_key(course_key):
+    """
+    Returns the cache key flagging that the metadata inheritance tree of the course is due to be recomputed.
+    """
+    return u'contentstore.metadata_inheritance_update_pending.{}'.format(course_key)
+
+
+@task()
+def update_metadata_inheritance_tree(course_key_string):
+    """ Recomputes the cached metadata inheritance tree of an old Mongo course. """
+    course_key = CourseKey.from_string(course_key_string)
+    # edits from now on are not covered by this run, so allow them to schedule another one
+    cache.delete(metadata_inheritance_update_pending_cache_key(course_key))
+    store = modulestore()._get_modulestore_by_type(ModuleStoreEnum.Type.mongo)  # pylint: disable=protected-access
+    store.recompute_metadata_inheritance_tree(course_key)
+    LOGGER.debug('Recomputed metadata inheritance tree of course %s', course_key_string)
+
+
 @task()
 def push_course_update_task(course_key_string, course_subscription_id, course_display_name):
     """
@@ -125,3 +149,37 @@ def push_course_update_task(course_key_string, course_subscription_id, course_di
     # TODO Use edx-notifications library instead (MA-638).
     from .push_notification import send_push_course_update
     send_push_course_update(course_key_string, course_subscription_id, course_display_name)
+
+
+@task()
+def generate_thumbnails(asset_key_string):
+    """
+    Generates the thumbnails of an uploaded image, and links them from the asset of the image.
+    """
+    asset_key = AssetKey.from_string(asset_key_string)
+    store = contentstore()
+    try:
+        content = store.find(asset_key)
+    except NotFoundError:
+        LOGGER.debug('Asset %s was deleted before its thumbnails were generated', asset_key_string)
+        return
+
+    thumbnails = store.generate_thumbnails(content)
+    for thumbnail in thumbnails.itervalues():
+        del_cached_content(thumbnail.location)
+    if DEFAULT_THUMBNAIL_VARIANT not in thumbnails:
+        return
+
+    try:
+        store.set_attrs(asset_key, {
+            'thumbnail_location': thumbnails[DEFAULT_THUMBNAIL_VARIANT].location.to_deprecated_list_repr(),
+            'thumbnail_variants': {
+                variant: thumbnail.location.name
+                for variant, thumbnail in thumbnails.iteritems()
+                if variant != DEFAULT_THUMBNAIL_VARIANT
+            },
+        })
+    except NotFoundError:
+        LOGGER.debug('Asset %s was deleted before its thumbnails were generated', asset_key_string)
+        return
+    del_cached_content(asset_key)
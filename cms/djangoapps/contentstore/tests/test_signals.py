@@ -0,0 +1,32 @@
+"""
+Tests for the receivers of modulestore signals.
+"""
+from django.core.cache import cache
+from django.test import TestCase
+from mock import patch
+from opaque_keys.edx.locations import SlashSeparatedCourseKey
+
+from contentstore.signals import listen_for_metadata_inheritance_change
+from contentstore.tasks import metadata_inheritance_update_pending_cache_key, update_metadata_inheritance_tree
+
+
+class MetadataInheritanceChangedTest(TestCase):
+    """
+    Tests for scheduling the recomputation of metadata inheritance trees.
+    """
+    def setUp(self):
+        super(MetadataInheritanceChangedTest, self).setUp()
+        self.course_key = SlashSeparatedCourseKey('edX', 'toy', '2012_Fall')
+        self.addCleanup(cache.delete, metadata_inheritance_update_pending_cache_key(self.course_key))
+
+    def test_recomputation_debounced(self):
+        with patch.object(update_metadata_inheritance_tree, 'apply_async') as mock_apply_async:
+            listen_for_metadata_inheritance_change(None, course_key=self.course_key)
+            listen_for_metadata_inheritance_change(None, course_key=self.course_key)
+        mock_apply_async.assert_called_once_with([unicode(self.course_key)], countdown=30)
+
+        # once the task starts, later edits schedule another run
+        cache.delete(metadata_inheritance_update_pending_cache_key(self.course_key))
+        with patch.object(update_metadata_inheritance_tree, 'apply_async') as mock_apply_async:
+            listen_for_metadata_inheritance_change(None, course_key=self.course_key)
+        self.assertTrue(mock_apply_async.called)
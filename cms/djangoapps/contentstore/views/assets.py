@@ -13,6 +13,7 @@ from django.conf import settings
 from edxmako.shortcuts import render_to_response
 from cache_toolbox.core import del_cached_content
 
+from contentstore.tasks import generate_thumbnails
 from contentstore.utils import reverse_course_url
 from xmodule.contentstore.django import contentstore
 from xmodule.modulestore.django import modulestore
@@ -107,20 +108,15 @@ def _assets_json(request, course_key):
     if requested_filter:
         if requested_filter == 'OTHER':
             all_filters = settings.FILES_AND_UPLOAD_TYPE_FILTERS
-            where = []
-            for all_filter in all_filters:
-                extension_filters = all_filters[all_filter]
-                where.extend(
-                    ["JSON.stringify(this.contentType).toUpperCase() != JSON.stringify('{}').toUpperCase()".format(
-                        extension_filter) for extension_filter in extension_filters])
             filter_params = {
-                "$where": ' && '.join(where),
+                "contentType": {"$nin": [
+                    extension_filter.lower()
+                    for all_filter in all_filters for extension_filter in all_filters[all_filter]
+                ]},
             }
         else:
-            where = ["JSON.stringify(this.contentType).toUpperCase() == JSON.stringify('{}').toUpperCase()".format(
-                req_filter) for req_filter in requested_file_types]
             filter_params = {
-                "$where": ' || '.join(where),
+                "contentType": {"$in": [file_type.lower() for file_type in requested_file_types or []]},
             }
 
     sort_direction = DESCENDING
@@ -259,29 +255,22 @@ def _upload_asset(request, course_key):
     sc_partial = partial(StaticContent, content_loc, filename, mime_type)
     if chunked:
         content = sc_partial(upload_file.chunks())
-        tempfile_path = upload_file.temporary_file_path()
     else:
         content = sc_partial(upload_file.read())
-        tempfile_path = None
 
-    # first let's see if a thumbnail can be created
-    (thumbnail_content, thumbnail_location) = contentstore().generate_thumbnail(
-        content,
-        tempfile_path=tempfile_path,
-    )
+    # commit the content, which has no thumbnails until they are generated in the background
+    contentstore().save(content)
+    del_cached_content(content.location)
 
     # delete cached thumbnail even if one couldn't be created this time (else
     # the old thumbnail will continue to show)
-    del_cached_content(thumbnail_location)
-    # now store thumbnail location only if we could create it
-    if thumbnail_content is not None:
-        content.thumbnail_location = thumbnail_location
+    del_cached_content(StaticContent.compute_location(
+        course_key, StaticContent.generate_thumbnail_name(content_loc.name), is_thumbnail=True
+    ))
+    if mime_type is not None and mime_type.split('/')[0] == 'image':
+        generate_thumbnails.delay(unicode(content_loc))
 
-    # then commit the content
-    contentstore().save(content)
-    del_cached_content(content.location)
-
-    # readback the saved content - we need the database timestamp
+    # readback the saved content - we need the database timestamp, and the thumbnail if it's already there
     readback = contentstore().find(content.location)
     locked = getattr(content, 'locked', False)
     response_payload = {
@@ -290,7 +279,7 @@ def _upload_asset(request, course_key):
             content.content_type,
             readback.last_modified_at,
             content.location,
-            content.thumbnail_location,
+            readback.thumbnail_location,
             locked
         ),
         'msg': _('Upload completed')
@@ -334,6 +323,12 @@ def _update_asset(request, course_key, asset_key):
             except:
                 logging.warning('Could not delete thumbnail: %s', thumbnail_location)
 
+        # the thumbnails of the other variants aren't kept, as they can be generated again from the asset
+        for thumbnail_name in (content.thumbnail_variants or {}).itervalues():
+            thumbnail_location = course_key.make_asset_key('thumbnail', thumbnail_name)
+            contentstore().delete(thumbnail_location)
+            del_cached_content(thumbnail_location)
+
         # delete the original
         contentstore().delete(content.get_id())
         # remove from cache
@@ -21,6 +21,7 @@ from opaque_keys.edx.locations import SlashSeparatedCourseKey, AssetLocation
 from static_replace import replace_static_urls
 import mock
 from ddt import ddt
+from PIL import Image
 from ddt import data
 
 TEST_DATA_DIR = settings.COMMON_TEST_DATA_ROOT
@@ -263,6 +264,28 @@ class UploadTestCase(AssetsTestCase):
         resp = self.client.post(self.url, {"name": "file.txt"}, "application/json")
         self.assertEquals(resp.status_code, 400)
 
+    def test_image_thumbnails(self):
+        image = BytesIO()
+        Image.new('RGB', (1000, 800)).save(image, 'JPEG')
+        image.seek(0)
+        image.name = 'picture.jpg'
+        resp = self.client.post(self.url, {"name": "picture", "file": image})
+        self.assertEquals(resp.status_code, 200)
+
+        # the thumbnails are generated by a celery task, which runs eagerly under test
+        self.assertIsNotNone(json.loads(resp.content)['asset']['thumbnail'])
+        content = contentstore().find(StaticContent.compute_location(self.course.id, 'picture.jpg'))
+        self.assertIsNotNone(content.thumbnail_location)
+        self.assertItemsEqual(
+            content.thumbnail_variants.keys(), [variant for variant in settings.THUMBNAIL_VARIANTS if variant != 'studio']
+        )
+        for variant, thumbnail_name in content.thumbnail_variants.iteritems():
+            thumbnail = contentstore().find(self.course.id.make_asset_key('thumbnail', thumbnail_name))
+            width, height = Image.open(BytesIO(thumbnail.data)).size
+            max_width, max_height = settings.THUMBNAIL_VARIANTS[variant]
+            self.assertLessEqual(width, max_width)
+            self.assertLessEqual(height, max_height)
+
     @data(
         (int(MAX_FILE_SIZE / 2.0), "small.file.test", 200),
         (MAX_FILE_SIZE, "justequals.file.test", 200),
@@ -320,6 +320,10 @@ DEPRECATED_ADVANCED_COMPONENT_TYPES = ENV_TOKENS.get(
 
 VIDEO_UPLOAD_PIPELINE = ENV_TOKENS.get('VIDEO_UPLOAD_PIPELINE', VIDEO_UPLOAD_PIPELINE)
 
+################ ASSET THUMBNAILS ###############
+
+THUMBNAIL_VARIANTS = ENV_TOKENS.get('THUMBNAIL_VARIANTS', THUMBNAIL_VARIANTS)
+
 ################ PUSH NOTIFICATIONS ###############
 
 PARSE_KEYS = AUTH_TOKENS.get("PARSE_KEYS", {})
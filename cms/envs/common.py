@@ -662,6 +662,17 @@ YOUTUBE = {
     },
 }
 
+############################# ASSET THUMBNAILS #################################
+
+# The thumbnails generated in the background for uploaded images, as the maximum
+# [width, height] of each variant. The 'studio' variant is the one shown in Studio.
+# Content stores created outside of Studio only generate a 128x128 'studio' thumbnail.
+THUMBNAIL_VARIANTS = {
+    'studio': [128, 128],
+    'mobile': [480, 480],
+    'course_card': [378, 225],
+}
+
 ############################# VIDEO UPLOAD PIPELINE #############################
 
 VIDEO_UPLOAD_PIPELINE = {
@@ -744,6 +755,7 @@ INSTALLED_APPS = (
     'edx_jsme',    # Molecular Structure
 
     'openedx.core.djangoapps.content.course_structures',
+    'openedx.core.djangoapps.content.course_overviews',
 )
 
 
@@ -17,6 +17,9 @@ FORUM_ROLE_MODERATOR = ugettext_noop('Moderator')
 FORUM_ROLE_COMMUNITY_TA = ugettext_noop('Community TA')
 FORUM_ROLE_STUDENT = ugettext_noop('Student')
 
+# Permissions which students lose while posting is not allowed in the course (e.g. during a blackout period).
+POSTING_PERMISSION_PREFIXES = ('edit', 'update', 'create')
+
 
 @receiver(post_save, sender=CourseEnrollment)
 def assign_default_role_on_enrollment(sender, instance, **kwargs):
@@ -87,14 +90,24 @@ class Role(models.Model):
         course = modulestore().get_course(self.course_id)
         if course is None:
             raise ItemNotFoundError(self.course_id)
-        if self.name == FORUM_ROLE_STUDENT and \
-           (permission.startswith('edit') or permission.startswith('update') or permission.startswith('create')) and \
-           (not course.forum_posts_allowed):
+        if is_permission_withheld(self.name, permission, lambda: course):
             return False
 
         return self.permissions.filter(name=permission).exists()
 
 
+def is_permission_withheld(role_name, permission, get_course):
+    """
+    Returns whether a role with the given name is denied the permission in its course, even if the role has it:
+    students can't post while posting is not allowed in the course.
+
+    `get_course` returns the course descriptor; it is only called when the answer depends on the course.
+    """
+    if role_name != FORUM_ROLE_STUDENT or not permission.startswith(POSTING_PERMISSION_PREFIXES):
+        return False
+    return not get_course().forum_posts_allowed
+
+
 class Permission(models.Model):
     name = models.CharField(max_length=30, null=False, blank=False, primary_key=True)
     roles = models.ManyToManyField(Role, related_name="permissions")
@@ -1,7 +1,8 @@
 from django.test import TestCase
+from mock import Mock
 
 from opaque_keys.edx.locations import SlashSeparatedCourseKey
-from django_comment_common.models import Role
+from django_comment_common.models import Role, is_permission_withheld
 from student.models import CourseEnrollment, User
 
 
@@ -54,3 +55,24 @@ class RoleAssignmentTest(TestCase):
     #     )
     #     self.assertNotIn(student_role, self.student_user.roles.all())
     #     self.assertIn(student_role, another_student.roles.all())
+
+
+class PermissionWithheldTest(TestCase):
+    """
+    Tests for the rule withholding posting permissions from students while posting is not allowed.
+    """
+    def test_posting_not_allowed(self):
+        course = Mock(forum_posts_allowed=False)
+        self.assertTrue(is_permission_withheld('Student', 'create_thread', lambda: course))
+        self.assertFalse(is_permission_withheld('Student', 'vote', lambda: course))
+        self.assertFalse(is_permission_withheld('Moderator', 'create_thread', lambda: course))
+
+    def test_posting_allowed(self):
+        course = Mock(forum_posts_allowed=True)
+        self.assertFalse(is_permission_withheld('Student', 'create_thread', lambda: course))
+
+    def test_course_loaded_only_when_needed(self):
+        get_course = Mock()
+        is_permission_withheld('Student', 'vote', get_course)
+        is_permission_withheld('Moderator', 'create_thread', get_course)
+        self.assertFalse(get_course.called)
@@ -1,5 +1,7 @@
 import threading
 
+from celery.signals import task_prerun, task_postrun
+
 _request_cache_threadlocal = threading.local()
 _request_cache_threadlocal.data = {}
 
@@ -19,3 +21,13 @@ class RequestCache(object):
     def process_response(self, request, response):
         self.clear_request_cache()
         return response
+
+
+@task_prerun.connect
+@task_postrun.connect
+def clear_request_cache_for_task(**kwargs):  # pylint: disable=unused-argument
+    """
+    Celery tasks run outside of the middleware, so each one gets its own request cache: nothing cached by an earlier
+    task, e.g. field overrides, is seen by the next one or kept by the worker.
+    """
+    RequestCache().clear_request_cache()
@@ -15,6 +15,7 @@ import hashlib
 import json
 import logging
 from pytz import UTC
+import threading
 import uuid
 from collections import defaultdict, OrderedDict
 import dogstats_wrapper as dog_stats_api
@@ -26,9 +27,9 @@ from django.utils import timezone
 from django.contrib.auth.models import User
 from django.contrib.auth.hashers import make_password
 from django.contrib.auth.signals import user_logged_in, user_logged_out
-from django.db import models, IntegrityError
+from django.db import models, IntegrityError, transaction
 from django.db.models import Count
-from django.db.models.signals import pre_save, post_save
+from django.db.models.signals import pre_save, post_save, post_delete
 from django.dispatch import receiver, Signal
 from django.core.exceptions import ObjectDoesNotExist
 from django.utils.translation import ugettext_noop
@@ -78,20 +79,78 @@ class AnonymousUserId(models.Model):
     unique_together = (user, course_id)
 
 
-def anonymous_id_for_user(user, course_id, save=True):
+class AnonymousIdCache(object):
     """
-    Return a unique id for a (user, course) pair, suitable for inserting
-    into e.g. personalized survey links.
+    A process-level LRU cache of the anonymous ids known to be stored in
+    AnonymousUserId, by user id and course id.
 
-    If user is an `AnonymousUser`, returns `None`
+    Only committed rows may be cached: a row created in a transaction which is
+    then rolled back would otherwise never be stored again by this process.
 
-    Keyword arguments:
-    save -- Whether the id should be saved in an AnonymousUserId object.
+    Entries are evicted per user, least recently used first.
     """
-    # This part is for ability to get xblock instance in xblock_noauth handlers, where user is unauthenticated.
-    if user.is_anonymous():
-        return None
+    def __init__(self, max_users):
+        self.max_users = max_users
+        self._ids = OrderedDict()
+        self._lock = threading.Lock()
 
+    def get(self, user_id, course_id):
+        """
+        Returns the stored anonymous id of the user in the course, or None if it is not cached.
+        """
+        with self._lock:
+            course_ids = self._ids.pop(user_id, None)
+            if course_ids is None:
+                return None
+            self._ids[user_id] = course_ids
+            return course_ids.get(course_id)
+
+    def set(self, user_id, course_id, anonymous_id):
+        """
+        Remembers that the anonymous id of the user in the course is stored.
+        """
+        with self._lock:
+            course_ids = self._ids.pop(user_id, {})
+            course_ids[course_id] = anonymous_id
+            self._ids[user_id] = course_ids
+            while len(self._ids) > self.max_users:
+                self._ids.popitem(last=False)
+
+    def clear_user(self, user_id):
+        """
+        Forgets the anonymous ids of the user.
+        """
+        with self._lock:
+            self._ids.pop(user_id, None)
+
+    def clear(self):
+        """
+        Forgets all anonymous ids.
+        """
+        with self._lock:
+            self._ids.clear()
+
+
+# Number of users whose stored anonymous ids each process remembers, to avoid
+# querying AnonymousUserId whenever an anonymous id is needed.
+ANONYMOUS_ID_CACHE_SIZE = 10000
+
+anonymous_id_cache = AnonymousIdCache(ANONYMOUS_ID_CACHE_SIZE)  # pylint: disable=invalid-name
+
+
+def _anonymous_ids_committed():
+    """
+    Whether the AnonymousUserId rows seen so far are committed, i.e. the
+    current transaction, if any, has not written anything yet.
+    """
+    return not transaction.is_managed() or not transaction.is_dirty()
+
+
+def _compute_anonymous_id(user, course_id):
+    """
+    Returns the anonymous id of the user in the course (or of the user if course_id is None),
+    memoizing it on the user object.
+    """
     cached_id = getattr(user, '_anonymous_id', {}).get(course_id)
     if cached_id is not None:
         return cached_id
@@ -108,10 +167,49 @@ def anonymous_id_for_user(user, course_id, save=True):
         user._anonymous_id = {}  # pylint: disable=protected-access
 
     user._anonymous_id[course_id] = digest  # pylint: disable=protected-access
+    return digest
+
+
+def _log_mismatched_anonymous_id(user, course_id, stored_id, digest):
+    """
+    Logs that the anonymous id stored for the user in the course is not the one computed.
+    """
+    log.error(
+        u"Stored anonymous user id %r for user %r "
+        u"in course %r doesn't match computed id %r",
+        user,
+        course_id,
+        stored_id,
+        digest
+    )
+
+
+def anonymous_id_for_user(user, course_id, save=True):
+    """
+    Return a unique id for a (user, course) pair, suitable for inserting
+    into e.g. personalized survey links.
+
+    If user is an `AnonymousUser`, returns `None`
+
+    Keyword arguments:
+    save -- Whether the id should be saved in an AnonymousUserId object.
+    """
+    # This part is for ability to get xblock instance in xblock_noauth handlers, where user is unauthenticated.
+    if user.is_anonymous():
+        return None
+
+    cached_id = getattr(user, '_anonymous_id', {}).get(course_id)
+    if cached_id is not None:
+        return cached_id
+
+    digest = _compute_anonymous_id(user, course_id)
 
     if save is False:
         return digest
 
+    if anonymous_id_cache.get(user.id, course_id) == digest:
+        return digest
+
     try:
         anonymous_user_id, __ = AnonymousUserId.objects.get_or_create(
             defaults={'anonymous_user_id': digest},
@@ -119,22 +217,85 @@ def anonymous_id_for_user(user, course_id, save=True):
             course_id=course_id
         )
         if anonymous_user_id.anonymous_user_id != digest:
-            log.error(
-                u"Stored anonymous user id %r for user %r "
-                u"in course %r doesn't match computed id %r",
-                user,
-                course_id,
-                anonymous_user_id.anonymous_user_id,
-                digest
-            )
+            _log_mismatched_anonymous_id(user, course_id, anonymous_user_id.anonymous_user_id, digest)
     except IntegrityError:
         # Another thread has already created this entry, so
         # continue
         pass
 
+    if _anonymous_ids_committed():
+        anonymous_id_cache.set(user.id, course_id, digest)
     return digest
 
 
+def anonymous_ids_for_users(users, course_id, save=True):
+    """
+    Returns a dictionary from user id to the anonymous id of each of the given
+    users in the course, as returned by anonymous_id_for_user.
+
+    The ids are also memoized on the user objects, so that later calls to
+    anonymous_id_for_user for these users make no queries. If save is True, the
+    ids that are not stored yet are stored together.
+    """
+    users = [user for user in users if not user.is_anonymous()]
+    anonymous_ids = {user.id: _compute_anonymous_id(user, course_id) for user in users}
+    if save is False:
+        return anonymous_ids
+
+    unsaved_users = [
+        user for user in users
+        if anonymous_id_cache.get(user.id, course_id) != anonymous_ids[user.id]
+    ]
+    if not unsaved_users:
+        return anonymous_ids
+
+    stored_ids = dict(
+        AnonymousUserId.objects.filter(user__in=unsaved_users, course_id=course_id).values_list(
+            'user_id', 'anonymous_user_id'
+        )
+    )
+    stored_ids_committed = _anonymous_ids_committed()
+    new_rows = []
+    for user in unsaved_users:
+        digest = anonymous_ids[user.id]
+        if user.id not in stored_ids:
+            new_rows.append(AnonymousUserId(user=user, course_id=course_id, anonymous_user_id=digest))
+        elif stored_ids[user.id] != digest:
+            _log_mismatched_anonymous_id(user, course_id, stored_ids[user.id], digest)
+
+    try:
+        AnonymousUserId.objects.bulk_create(new_rows)
+    except IntegrityError:
+        # Another thread has already created some of these entries, so
+        # create the others one at a time
+        for row in new_rows:
+            try:
+                AnonymousUserId.objects.get_or_create(
+                    defaults={'anonymous_user_id': row.anonymous_user_id},
+                    user=row.user,
+                    course_id=course_id
+                )
+            except IntegrityError:
+                pass
+
+    # The rows created above are only committed once the transaction is, if
+    # any; those which were already stored were committed if nothing had been
+    # written before.
+    all_committed = _anonymous_ids_committed()
+    for user in unsaved_users:
+        if all_committed or (stored_ids_committed and user.id in stored_ids):
+            anonymous_id_cache.set(user.id, course_id, anonymous_ids[user.id])
+    return anonymous_ids
+
+
+@receiver(post_delete, sender=AnonymousUserId)
+def clear_cached_anonymous_ids(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """
+    Forgets the anonymous ids cached for a user when their stored ids are deleted.
+    """
+    anonymous_id_cache.clear_user(instance.user_id)
+
+
 def user_by_anonymous_id(uid):
     """
     Return user by anonymous_user_id using AnonymousUserId lookup table.
@@ -21,7 +21,8 @@ from mock import Mock, patch
 from opaque_keys.edx.locations import SlashSeparatedCourseKey
 
 from student.models import (
-    anonymous_id_for_user, user_by_anonymous_id, CourseEnrollment, unique_id_for_user, LinkedInAddToProfileConfiguration
+    anonymous_id_for_user, anonymous_ids_for_users, anonymous_id_cache, user_by_anonymous_id, AnonymousUserId,
+    CourseEnrollment, unique_id_for_user, LinkedInAddToProfileConfiguration
 )
 from student.views import (process_survey_link, _cert_info,
                            change_enrollment, complete_course_mode_info)
@@ -865,6 +866,8 @@ class AnonymousLookupTable(ModuleStoreTestCase):
         patcher = patch('student.models.tracker')
         patcher.start()
         self.addCleanup(patcher.stop)
+        # Users of earlier tests may have had the same ids
+        anonymous_id_cache.clear()
 
     def test_for_unregistered_user(self):  # same path as for logged out user
         self.assertEqual(None, anonymous_id_for_user(AnonymousUser(), self.course.id))
@@ -884,3 +887,47 @@ class AnonymousLookupTable(ModuleStoreTestCase):
         real_user = user_by_anonymous_id(anonymous_id)
         self.assertEqual(self.user, real_user)
         self.assertEqual(anonymous_id, anonymous_id_for_user(self.user, course2.id, save=False))
+
+    # Test cases run in a transaction, which is never committed
+    @patch('student.models._anonymous_ids_committed', Mock(return_value=True))
+    def test_bulk_anonymous_ids(self):
+        users = [self.user, UserFactory(), UserFactory()]
+        # One of the ids is already stored
+        existing_id = anonymous_id_for_user(users[0], self.course.id)
+        users = [User.objects.get(id=user.id) for user in users]
+        anonymous_id_cache.clear()
+
+        # One query finds the stored ids, and another creates the others
+        with self.assertNumQueries(2):
+            anonymous_ids = anonymous_ids_for_users(users, self.course.id)
+        self.assertEqual(anonymous_ids[users[0].id], existing_id)
+        for user in users:
+            self.assertEqual(user_by_anonymous_id(anonymous_ids[user.id]), user)
+
+        # The ids are memoized on the users, and the stored ids are cached for the process
+        with self.assertNumQueries(0):
+            for user in users:
+                self.assertEqual(anonymous_id_for_user(user, self.course.id), anonymous_ids[user.id])
+            self.assertEqual(anonymous_ids_for_users(users, self.course.id), anonymous_ids)
+
+    @patch('student.models._anonymous_ids_committed', Mock(return_value=True))
+    def test_anonymous_id_cache(self):
+        anonymous_id = anonymous_id_for_user(self.user, self.course.id)
+        user = User.objects.get(id=self.user.id)
+        with self.assertNumQueries(0):
+            self.assertEqual(anonymous_id_for_user(user, self.course.id), anonymous_id)
+
+        # Deleting the stored id evicts it from the cache, so that it is stored again
+        AnonymousUserId.objects.filter(user=self.user).delete()
+        user = User.objects.get(id=self.user.id)
+        anonymous_id_for_user(user, self.course.id)
+        self.assertEqual(user_by_anonymous_id(anonymous_id), self.user)
+
+    def test_uncommitted_ids_not_cached(self):
+        # The ids stored in a transaction which may still be rolled back are looked up again
+        users = [self.user, UserFactory()]
+        anonymous_id_for_user(users[0], self.course.id)
+        anonymous_ids_for_users(users, self.course.id)
+        users = [User.objects.get(id=user.id) for user in users]
+        with self.assertNumQueries(1):
+            anonymous_ids_for_users(users, self.course.id)
@@ -5,6 +5,7 @@ invalidation. Import these instead of django.core.cache.
 Note that 'default' is being preserved for user session caching, which we're
 not migrating so as not to inconvenience users by logging them all out.
 """
+import hashlib
 import urllib
 from functools import wraps
 
@@ -15,12 +16,31 @@ from django.core import cache
 # to returning the default cache. This will happen with dev machines.
 from django.utils.translation import get_language
 
+from microsite_configuration import microsite
+
 try:
     cache = cache.get_cache('general')
 except Exception:
     cache = cache.cache
 
 
+# How long rendered fragments are kept. Fragment keys include the version of the content they render, so this
+# only bounds how long stale entries linger.
+FRAGMENT_CACHE_TIMEOUT = 60 * 60
+
+
+def fragment_cache_key(*key_parts):
+    """
+    Returns the cache key for a fragment of html shared by all users, such as a course catalog tile.
+
+    key_parts identify the fragment and the version of its content. The key also includes the microsite and
+    language of the current request, since templates and translations differ between them.
+    """
+    key_parts = (microsite.get_value('subdomain', 'default'), get_language()) + key_parts
+    # Hash the parts, since they may contain characters or lengths that memcached does not accept in keys.
+    return 'fragment.' + hashlib.md5(u'.'.join(unicode(part) for part in key_parts).encode('utf-8')).hexdigest()
+
+
 def cache_if_anonymous(*get_parameters):
     """Cache a page for anonymous users.
 
@@ -3,19 +3,25 @@ Functions that can are used to modify XBlock fragments for use in the LMS and St
 """
 
 import datetime
+from collections import defaultdict
 import json
 import logging
 import static_replace
+import time
 import uuid
+import zlib
 import markupsafe
 from lxml import html, etree
 from contracts import contract
 
 from django.conf import settings
+from django.core.cache import cache
 from django.utils.timezone import UTC
 from django.utils.html import escape
 from django.contrib.auth.models import User
+from django.dispatch import Signal
 from edxmako.shortcuts import render_to_string
+from request_cache.middleware import RequestCache
 from xblock.core import XBlock
 from xblock.exceptions import InvalidScopeError
 from xblock.fragment import Fragment
@@ -28,6 +34,17 @@ from xmodule.modulestore.django import modulestore
 
 log = logging.getLogger(__name__)
 
+# How long the grade histograms of a course are kept after they are computed, for staff to see until they are
+# computed again.
+GRADE_HISTOGRAM_ROLLUP_TIMEOUT = 60 * 60 * 24
+# Number of blocks whose grade histograms are cached together, which keeps each cache value well under memcached's
+# 1MB limit.
+GRADE_HISTOGRAM_CHUNK_SIZE = 500
+
+# Sent with the course_key when the grade histogram rollup of a course is missing or stale. The LMS receives it to
+# recompute the rollup in the background (see compute_grade_histograms).
+grade_histograms_stale = Signal(providing_args=['course_key'])
+
 
 def wrap_fragment(fragment, new_content):
     """
@@ -177,23 +194,152 @@ def grade_histogram(module_id):
     Warning: If a student has just looked at an xmodule and not attempted
     it, their grade is None. Since there will always be at least one such student
     this function almost always returns [].
+
+    Returns None while the rollup of the course is not available yet; see grade_histograms.
     '''
+    return grade_histograms([module_id])[module_id]
+
+
+def grade_histograms(module_ids):
+    """
+    Returns the grade histograms of the given blocks (e.g. all the problems of a unit), by module_id, reading the
+    rollup of their course once.
+
+    The histograms of each course are only read here, from a rollup which is computed in the background (see
+    compute_grade_histograms), and may be up to GRADE_HISTOGRAM_CACHE_TIMEOUT seconds out of date. The histograms
+    are None while the rollup of the course is not available yet.
+    """
+    result = {}
+    by_course = defaultdict(list)
+    for module_id in module_ids:
+        by_course[module_id.course_key].append(module_id)
+    for course_key, course_module_ids in by_course.iteritems():
+        histograms = _cached_course_grade_histograms(
+            course_key, [module_id.to_deprecated_string() for module_id in course_module_ids]
+        )
+        for module_id in course_module_ids:
+            result[module_id] = None if histograms is None else histograms.get(module_id.to_deprecated_string(), [])
+    return result
+
+
+def _course_grade_histograms_cache_key(course_key):
+    """
+    Returns the cache key of the grade histogram rollup of the given course, which holds the time it was computed
+    and its number of chunks.
+    """
+    return u'xmodule_modifiers.grade_histograms.{}'.format(course_key.to_deprecated_string())
+
+
+def _course_grade_histograms_chunk_cache_key(course_key, computed, index):
+    """
+    Returns the cache key of a chunk of the grade histogram rollup of the given course computed at the given time.
+    """
+    return u'xmodule_modifiers.grade_histograms.{}.{}.{}'.format(course_key.to_deprecated_string(), computed, index)
+
+
+def _grade_histograms_chunk_index(module_id, chunk_count):
+    """
+    Returns the index of the chunk of the rollup which holds the histogram of the given module_id string.
+    """
+    return zlib.crc32(module_id.encode('utf-8')) % chunk_count
+
+
+def _course_grade_histograms_pending_cache_key(course_key):
+    """
+    Returns the cache key marking that the grade histogram rollup of the given course is being recomputed.
+    """
+    return u'xmodule_modifiers.grade_histograms_pending.{}'.format(course_key.to_deprecated_string())
+
+
+def _cached_course_grade_histograms(course_key, module_ids):
+    """
+    Returns a dict of the grade histograms of the blocks of the given course, by module_id string, holding at least
+    those of the given module_id strings (when they have one), from the cached rollup, or None if there is none.
+
+    Schedules the recomputation of the rollup if it is missing or older than GRADE_HISTOGRAM_CACHE_TIMEOUT, by
+    sending grade_histograms_stale. The chunks of the rollup which are read are remembered for the rest of the
+    request, since staff pages show many blocks of a course.
+    """
+    rollups = RequestCache.get_request_cache().data.setdefault('course_grade_histograms', {})
+    if course_key not in rollups:
+        rollup = cache.get(_course_grade_histograms_cache_key(course_key))
+        if rollup is None or time.time() - rollup['computed'] > settings.GRADE_HISTOGRAM_CACHE_TIMEOUT:
+            # Only one recomputation is scheduled at a time. The marker expires in case the task is lost.
+            pending_key = _course_grade_histograms_pending_cache_key(course_key)
+            if cache.add(pending_key, True, settings.GRADE_HISTOGRAM_CACHE_TIMEOUT):
+                grade_histograms_stale.send(sender=None, course_key=course_key)
+        rollups[course_key] = (rollup, {}, {})
+    rollup, loaded_chunks, histograms = rollups[course_key]
+    if rollup is None:
+        return None
+
+    chunk_keys = set(
+        _course_grade_histograms_chunk_cache_key(
+            course_key, rollup['computed'], _grade_histograms_chunk_index(module_id, rollup['chunks'])
+        )
+        for module_id in module_ids
+    ) - set(loaded_chunks)
+    if chunk_keys:
+        chunks = cache.get_many(list(chunk_keys))
+        if len(chunks) < len(chunk_keys):
+            # Part of the rollup was evicted: compute it again, showing no histograms meanwhile.
+            cache.delete(_course_grade_histograms_cache_key(course_key))
+            rollups.pop(course_key)
+            return _cached_course_grade_histograms(course_key, module_ids)
+        loaded_chunks.update(chunks)
+        for chunk in chunks.itervalues():
+            histograms.update(chunk)
+    return histograms
+
+
+def compute_grade_histograms(course_key):
+    """
+    Computes the grade histograms of every block of the given course with one aggregate query, and caches them as a
+    rollup.
+
+    The rollup is split into chunks of about GRADE_HISTOGRAM_CHUNK_SIZE blocks, by a hash of the block's module_id,
+    so that no cache value exceeds memcached's item size limit. The chunks of each computation have their own keys,
+    and the entry naming the current computation is written last, so readers never mix two computations.
+    """
     from django.db import connection
     cursor = connection.cursor()
 
-    q = """SELECT courseware_studentmodule.grade,
+    q = """SELECT courseware_studentmodule.module_id,
+                  courseware_studentmodule.grade,
                   COUNT(courseware_studentmodule.student_id)
     FROM courseware_studentmodule
-    WHERE courseware_studentmodule.module_id=%s
-    GROUP BY courseware_studentmodule.grade"""
-    # Passing module_id this way prevents sql-injection.
-    cursor.execute(q, [module_id.to_deprecated_string()])
+    WHERE courseware_studentmodule.course_id=%s
+    GROUP BY courseware_studentmodule.module_id, courseware_studentmodule.grade"""
+    # Passing course_id this way prevents sql-injection.
+    cursor.execute(q, [course_key.to_deprecated_string()])
+
+    grades_by_module = defaultdict(list)
+    for module_id, grade, count in cursor.fetchall():
+        grades_by_module[module_id].append((grade, count))
+
+    computed = time.time()
+    chunk_count = max(1, -(-len(grades_by_module) // GRADE_HISTOGRAM_CHUNK_SIZE))
+    chunks = [{} for __ in xrange(chunk_count)]
+    for module_id, grades in grades_by_module.iteritems():
+        grades.sort(key=lambda x: x[0])
+        chunks[_grade_histograms_chunk_index(module_id, chunk_count)][module_id] = (
+            [] if grades[0][0] is None else grades
+        )
 
-    grades = list(cursor.fetchall())
-    grades.sort(key=lambda x: x[0])  # Add ORDER BY to sql query?
-    if len(grades) >= 1 and grades[0][0] is None:
-        return []
-    return grades
+    # Stale rollups are still shown while the next one is computed.
+    cache.set_many(
+        {
+            _course_grade_histograms_chunk_cache_key(course_key, computed, index): chunk
+            for index, chunk in enumerate(chunks)
+        },
+        GRADE_HISTOGRAM_ROLLUP_TIMEOUT
+    )
+    cache.set(
+        _course_grade_histograms_cache_key(course_key),
+        {'computed': computed, 'chunks': chunk_count},
+        GRADE_HISTOGRAM_ROLLUP_TIMEOUT
+    )
+    cache.delete(_course_grade_histograms_pending_cache_key(course_key))
 
 
 @contract(user=User, has_instructor_access=bool, block=XBlock, view=basestring, frag=Fragment, context=dict)
@@ -228,7 +374,7 @@ def add_staff_markup(user, has_instructor_access, block, view, frag, context):
     block_id = block.location
     if block.has_score and settings.FEATURES.get('DISPLAY_HISTOGRAMS_TO_STAFF'):
         histogram = grade_histogram(block_id)
-        render_histogram = len(histogram) > 0
+        render_histogram = bool(histogram)
     else:
         histogram = None
         render_histogram = False
@@ -13,11 +13,14 @@ Main module which shows problems (of "capa" type).
 This is used by capa_module.
 """
 
+from collections import OrderedDict
 from copy import deepcopy
 from datetime import datetime
+import hashlib
 import logging
 import os.path
 import re
+import threading
 
 from lxml import etree
 from pytz import UTC
@@ -58,6 +61,87 @@ html_problem_semantics = [
 
 log = logging.getLogger(__name__)
 
+# maximum number of parsed problem definitions kept by ParsedProblemCache
+PARSED_PROBLEM_CACHE_SIZE = 500
+
+
+class ParsedProblem(object):
+    """
+    The seed-independent products of parsing a problem definition.
+
+    Attributes:
+        tree: the problem XML, with includes processed and IDs assigned. It must not be modified; problems
+            work on their own copy unless shares_tree is True.
+        script_code (string): the code of all Python <script> tags.
+        python_path (list): the directories the script code needs on its path.
+        responses (list): a (response index, Response class, input field indexes) tuple for each response, in
+            order, where the indexes are the positions of the elements in tree.iter().
+        shares_tree (bool): whether problems can use the tree itself, because nothing modifies it.
+        includes (list): a (filename, version) pair for each included file, where the version is as returned
+            by LoncapaProblem._include_version.
+    """
+    def __init__(self, tree, script_code, python_path, responses=(), shares_tree=False, includes=()):
+        self.tree = tree
+        self.script_code = script_code
+        self.python_path = python_path
+        self.responses = responses
+        self.shares_tree = shares_tree
+        self.includes = includes
+
+
+class ParsedProblemCache(object):
+    """
+    A process-wide, least-recently-used cache of ParsedProblems, keyed by a hash of the problem definition.
+
+    Problems are instantiated for every render, check and rescore, but the definition only changes when the
+    course is edited, so re-parsing the XML (and re-reading included files) each time is wasted work.
+    """
+    def __init__(self, max_size=PARSED_PROBLEM_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(problem_text, problem_id, filestore):
+        """
+        Returns the cache key for a problem definition. Included files and script paths are resolved against the
+        filestore, so its location is part of the key.
+        """
+        md5 = hashlib.md5()
+        for part in (problem_text, problem_id, getattr(filestore, 'root_path', None)):
+            md5.update(repr(part))
+        return md5.hexdigest()
+
+    def get(self, key):
+        """
+        Returns the ParsedProblem for the key, or None.
+        """
+        with self._lock:
+            parsed = self._entries.pop(key, None)
+            if parsed is not None:
+                self._entries[key] = parsed
+            return parsed
+
+    def set(self, key, parsed):
+        """
+        Stores the ParsedProblem for the key, evicting the least recently used entry if the cache is full.
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = parsed
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """
+        Empties the cache.
+        """
+        with self._lock:
+            self._entries.clear()
+
+
+parsed_problem_cache = ParsedProblemCache()  # pylint: disable=invalid-name
+
 #-----------------------------------------------------------------------------
 # main class for this module
 
@@ -154,25 +238,18 @@ class LoncapaProblem(object):
         self.done = state.get('done', False)
         self.input_state = state.get('input_state', {})
 
-        # Convert startouttext and endouttext to proper <text></text>
-        problem_text = re.sub(r"startouttext\s*/", "text", problem_text)
-        problem_text = re.sub(r"endouttext\s*/", "/text", problem_text)
-        self.problem_text = problem_text
-
-        # parse problem XML file into an element tree
-        self.tree = etree.XML(problem_text)
-
-        # handle any <include file="foo"> tags
-        self._process_includes()
+        # Parsing doesn't depend on the seed or the student, so it is shared between instances of the same problem.
+        # Only problems whose responses modify the XML need a copy of the tree.
+        parsed = self._get_parsed_problem(problem_text)
+        self.tree = parsed.tree if parsed.shares_tree else deepcopy(parsed.tree)
 
         # construct script processor context (eg for customresponse problems)
-        self.context = self._extract_context(self.tree)
+        self.context = self._extract_context(self.tree, parsed)
 
-        # Pre-parse the XML tree: modifies it to add ID's and perform some in-place
-        # transformations.  This also creates the dict (self.responders) of Response
-        # instances for each question in the problem. The dict has keys = xml subtree of
-        # Response, values = Response instance
-        self._preprocess_problem(self.tree)
+        # Pre-parse the XML tree: creates the dict (self.responders) of Response
+        # instances for each question in the problem, which may perform some in-place
+        # transformations. The dict has keys = xml subtree of Response, values = Response instance
+        self._preprocess_problem(self.tree, parsed)
 
         if not self.student_answers:  # True when student_answers is an empty dict
             self.set_initial_display()
@@ -191,6 +268,62 @@ class LoncapaProblem(object):
 
         self.extracted_tree = self._extract_html(self.tree)
 
+    def _get_parsed_problem(self, problem_text):
+        """
+        Returns the ParsedProblem for the given problem text, from parsed_problem_cache if possible.
+        Also sets self.problem_text.
+        """
+        cache_key = ParsedProblemCache.make_key(problem_text, self.problem_id, self.capa_system.filestore)
+
+        # Convert startouttext and endouttext to proper <text></text>
+        problem_text = re.sub(r"startouttext\s*/", "text", problem_text)
+        problem_text = re.sub(r"endouttext\s*/", "/text", problem_text)
+        self.problem_text = problem_text
+
+        parsed = parsed_problem_cache.get(cache_key)
+        if parsed is not None and not self._includes_unchanged(parsed.includes):
+            parsed = None
+        if parsed is None:
+            # parse problem XML file into an element tree
+            self.tree = etree.XML(problem_text)
+
+            # handle any <include file="foo"> tags
+            includes = self._process_includes()
+
+            script_code, python_path = self._extract_script_code(self.tree)
+            responses, shares_tree = self._assign_ids(self.tree)
+            parsed = ParsedProblem(self.tree, script_code, python_path, responses, shares_tree, includes)
+            parsed_problem_cache.set(cache_key, parsed)
+        return parsed
+
+    def _includes_unchanged(self, includes):
+        """
+        Returns whether none of the given included files, as listed by ParsedProblem.includes, has changed.
+        """
+        for filename, version in includes:
+            try:
+                current_version = self._include_version(filename)
+            except Exception:  # pylint: disable=broad-except
+                current_version = None
+            if current_version != version:
+                return False
+        return True
+
+    def _include_version(self, filename):
+        """
+        Returns a token which changes whenever the given included file does: its modification time, or a digest
+        of its content if the filestore doesn't report that.
+        """
+        filestore = self.capa_system.filestore
+        try:
+            modified_time = filestore.getinfo(filename).get('modified_time')
+        except Exception:  # pylint: disable=broad-except
+            modified_time = None
+        if modified_time is not None:
+            return modified_time
+        with filestore.open(filename) as ifp:
+            return hashlib.md5(ifp.read()).hexdigest()
+
     def do_reset(self):
         """
         Reset internal state to unfinished, with no answers
@@ -533,13 +666,19 @@ class LoncapaProblem(object):
         """
         Handle any <include file="foo"> tags by reading in the specified file and inserting it
         into our XML tree.  Fail gracefully if debugging.
+
+        Returns the included files as listed by ParsedProblem.includes.
         """
+        included_files = []
         includes = self.tree.findall('.//include')
         for inc in includes:
             filename = inc.get('file')
             if filename is not None:
+                # if the file can't be included, noticing that it changed is enough
+                included_files.append((filename, None))
                 try:
                     # open using LoncapaSystem OSFS filestore
+                    version = self._include_version(filename)
                     ifp = self.capa_system.filestore.open(filename)
                 except Exception as err:
                     log.warning(
@@ -577,8 +716,11 @@ class LoncapaProblem(object):
                 parent = inc.getparent()
                 parent.insert(parent.index(inc), incxml)
                 parent.remove(inc)
+                included_files[-1] = (filename, version)
                 log.debug('Included %s into %s' % (filename, self.problem_id))
 
+        return included_files
+
     def _extract_system_path(self, script):
         """
         Extracts and normalizes additional paths for code execution.
@@ -613,17 +755,13 @@ class LoncapaProblem(object):
 
         return path
 
-    def _extract_context(self, tree):
+    def _extract_script_code(self, tree):
         """
-        Extract content of <script>...</script> from the problem.xml file, and exec it in the
-        context of this problem.  Provides ability to randomize problems, and also set
-        variables for problem answer checking.
+        Extract content of <script>...</script> from the problem.xml file, along with the
+        Python path it needs.
 
-        Problem XML goes to Python execution context. Runs everything in script tags.
+        Returns (code, python_path).
         """
-        context = {}
-        context['seed'] = self.seed
-        context['anonymous_student_id'] = self.capa_system.anonymous_student_id
         all_code = ''
 
         python_path = []
@@ -646,6 +784,30 @@ class LoncapaProblem(object):
             code = unescape(script.text, XMLESC)
             all_code += code
 
+        return all_code, python_path
+
+    def _extract_context(self, tree, parsed=None):
+        """
+        Extract content of <script>...</script> from the problem.xml file, and exec it in the
+        context of this problem.  Provides ability to randomize problems, and also set
+        variables for problem answer checking.
+
+        Problem XML goes to Python execution context. Runs everything in script tags.
+
+        If the ParsedProblem of the tree is given, its script code is used instead of
+        extracting it again.
+        """
+        context = {}
+        context['seed'] = self.seed
+        context['anonymous_student_id'] = self.capa_system.anonymous_student_id
+
+        if parsed is None:
+            all_code, python_path = self._extract_script_code(tree)
+        else:
+            all_code, python_path = parsed.script_code, parsed.python_path
+        # the path is extended below, so don't modify the shared list
+        python_path = list(python_path)
+
         extra_files = []
         if all_code:
             # An asset named python_lib.zip can be imported by Python code.
@@ -777,19 +939,19 @@ class LoncapaProblem(object):
 
         return tree
 
-    def _preprocess_problem(self, tree):  # private
+    def _assign_ids(self, tree):
         """
         Assign IDs to all the responses
         Assign sub-IDs to all entries (textline, schematic, etc.)
-        Annoted correctness and value
-        In-place transformation
+        In-place transformation, which only depends on the problem id, so it is done once per parsed problem.
 
-        Also create capa Response instances for each responsetype and save as self.responders
-
-        Obtain all responder answers and save as self.responder_answers dict (key = response)
+        Returns the responses as listed by ParsedProblem.responses, and whether problems can share the tree.
         """
+        indexes = dict((element, index) for index, element in enumerate(tree.iter()))
+        responses = []
+        shares_tree = True
+
         response_id = 1
-        self.responders = {}
         for response in tree.xpath('//' + "|//".join(responsetypes.registry.registered_tags())):
             response_id_str = self.problem_id + "_" + str(response_id)
             # create and save ID for this response
@@ -810,8 +972,43 @@ class LoncapaProblem(object):
                 entry.attrib['id'] = "%s_%i_%i" % (self.problem_id, response_id, answer_id)
                 answer_id = answer_id + 1
 
-            # instantiate capa Response
             responsetype_cls = responsetypes.registry.get_class_for_tag(response.tag)
+            responses.append((indexes[response], responsetype_cls, [indexes[entry] for entry in inputfields]))
+
+            # Solutions within responses get other IDs once the responses are created (see _assign_solution_ids).
+            if responsetype_cls.modifies_xml or any(entry.tag in solution_tags for entry in inputfields):
+                shares_tree = False
+
+        if shares_tree:
+            self._assign_solution_ids(tree)
+        return responses, shares_tree
+
+    def _assign_solution_ids(self, tree):
+        """
+        Assign IDs to all the solutions.
+        """
+        # <solution>...</solution> may not be associated with any specific response; give
+        # IDs for those separately
+        # TODO: We should make the namespaces consistent and unique (e.g. %s_problem_%i).
+        solution_id = 1
+        for solution in tree.findall('.//solution'):
+            solution.attrib['id'] = "%s_solution_%i" % (self.problem_id, solution_id)
+            solution_id += 1
+
+    def _preprocess_problem(self, tree, parsed):  # private
+        """
+        Create capa Response instances for each responsetype of the parsed problem, whose tree is
+        either tree or copied to it, and save as self.responders
+
+        Obtain all responder answers and save as self.responder_answers dict (key = response)
+        """
+        elements = list(tree.iter())
+        self.responders = {}
+        for response_index, responsetype_cls, inputfield_indexes in parsed.responses:
+            response = elements[response_index]
+            inputfields = [elements[index] for index in inputfield_indexes]
+
+            # instantiate capa Response
             responder = responsetype_cls(response, inputfields, self.context, self.capa_system)
             # save in list in self
             self.responders[response] = responder
@@ -827,10 +1024,5 @@ class LoncapaProblem(object):
                           self.responders[response])  # FIXME
                 raise
 
-        # <solution>...</solution> may not be associated with any specific response; give
-        # IDs for those separately
-        # TODO: We should make the namespaces consistent and unique (e.g. %s_problem_%i).
-        solution_id = 1
-        for solution in tree.findall('.//solution'):
-            solution.attrib['id'] = "%s_solution_%i" % (self.problem_id, solution_id)
-            solution_id += 1
+        if not parsed.shares_tree:
+            self._assign_solution_ids(tree)
@@ -128,6 +128,9 @@ class LoncapaResponse(object):
 
       - hint_tag             : xhtml tag identifying hint associated with this response inside
                                hintgroup
+
+      - modifies_xml         : whether the Response changes its XML (or that of its input fields),
+                               in which case each problem works on its own copy of the XML
     """
     __metaclass__ = abc.ABCMeta  # abc = Abstract Base Class
 
@@ -137,6 +140,7 @@ class LoncapaResponse(object):
     max_inputfields = None
     allowed_inputfields = []
     required_attributes = []
+    modifies_xml = False
 
     def __init__(self, xml, inputfields, context, system):
         """
@@ -445,6 +449,7 @@ class JavascriptResponse(LoncapaResponse):
     tags = ['javascriptresponse']
     max_inputfields = 1
     allowed_inputfields = ['javascriptinput']
+    modifies_xml = True
 
     def setup_response(self):
 
@@ -691,6 +696,7 @@ class ChoiceResponse(LoncapaResponse):
     tags = ['choiceresponse']
     max_inputfields = 1
     allowed_inputfields = ['checkboxgroup', 'radiogroup']
+    modifies_xml = True
     correct_choices = None
 
     def setup_response(self):
@@ -762,6 +768,7 @@ class MultipleChoiceResponse(LoncapaResponse):
     tags = ['multiplechoiceresponse']
     max_inputfields = 1
     allowed_inputfields = ['choicegroup']
+    modifies_xml = True
     correct_choices = None
 
     def setup_response(self):
@@ -1337,6 +1344,7 @@ class StringResponse(LoncapaResponse):
     allowed_inputfields = ['textline']
     required_attributes = ['answer']
     max_inputfields = 1
+    modifies_xml = True
     correct_answer = []
 
     def setup_response_backward(self):
@@ -1828,6 +1836,7 @@ class SymbolicResponse(CustomResponse):
     human_name = _('Symbolic Math Input')
     tags = ['symbolicresponse']
     max_inputfields = 1
+    modifies_xml = True
 
     def setup_response(self):
         # Symbolic response always uses symmath_check()
@@ -2873,6 +2882,7 @@ class ChoiceTextResponse(LoncapaResponse):
                            'checkboxtextgroup',
                            'radiotextgroup'
                            ]
+    modifies_xml = True
 
     def __init__(self, *args, **kwargs):
         self.correct_inputs = {}
@@ -0,0 +1,106 @@
+"""
+Tests for the caching of parsed problem definitions in capa_problem.
+"""
+import os
+import shutil
+import tempfile
+import textwrap
+import unittest
+
+import fs.osfs
+import mock
+
+from capa.capa_problem import LoncapaProblem, ParsedProblem, ParsedProblemCache, parsed_problem_cache
+from . import new_loncapa_problem, test_capa_system
+
+
+class ParsedProblemCacheTest(unittest.TestCase):
+    """
+    Tests that LoncapaProblems share parsed definitions without sharing state.
+    """
+    xml_str = textwrap.dedent("""
+        <problem>
+            <script type="loncapa/python">
+                answer = str(random.randint(0, 1e9))
+            </script>
+            <p>Enter the number $answer</p>
+            <stringresponse answer="$answer">
+                <textline size="20"/>
+            </stringresponse>
+        </problem>
+    """)
+
+    def setUp(self):
+        super(ParsedProblemCacheTest, self).setUp()
+        parsed_problem_cache.clear()
+        self.addCleanup(parsed_problem_cache.clear)
+
+    def test_problem_parsed_once(self):
+        with mock.patch.object(LoncapaProblem, '_process_includes', autospec=True) as mock_process_includes:
+            new_loncapa_problem(self.xml_str, seed=1)
+            new_loncapa_problem(self.xml_str, seed=2)
+        self.assertEqual(mock_process_includes.call_count, 1)
+
+    def test_instances_isolated(self):
+        first = new_loncapa_problem(self.xml_str, seed=1)
+        second = new_loncapa_problem(self.xml_str, seed=2)
+
+        # Scripts still run with each problem's own seed, on its own copy of the tree.
+        self.assertNotEqual(first.context['answer'], second.context['answer'])
+        self.assertIsNot(first.tree, second.tree)
+        self.assertEqual(first.context['script_code'], second.context['script_code'])
+        self.assertIn(first.context['answer'], first.get_html())
+        self.assertIn(second.context['answer'], second.get_html())
+
+    def test_unmodified_tree_shared(self):
+        xml_str = textwrap.dedent("""
+            <problem>
+                <optionresponse>
+                    <optioninput options="('Correct','Incorrect')" correct="Correct"/>
+                </optionresponse>
+                <solution><p>Because.</p></solution>
+            </problem>
+        """)
+        first = new_loncapa_problem(xml_str, seed=1)
+        second = new_loncapa_problem(xml_str, seed=2)
+
+        # Option responses don't modify their XML, so the problems use the parsed tree itself.
+        self.assertIs(first.tree, second.tree)
+        self.assertEqual(first.tree.find('.//solution').get('id'), '1_solution_1')
+        self.assertEqual(
+            first.grade_answers({'1_2_1': 'Correct'}).get_correctness('1_2_1'), 'correct'
+        )
+        self.assertEqual(
+            second.grade_answers({'1_2_1': 'Incorrect'}).get_correctness('1_2_1'), 'incorrect'
+        )
+
+    def test_changed_include_reparsed(self):
+        course_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, course_dir)
+        include_path = os.path.join(course_dir, 'included.xml')
+        capa_system = test_capa_system()
+        capa_system.filestore = fs.osfs.OSFS(course_dir)
+        xml_str = '<problem><include file="included.xml"/></problem>'
+
+        with open(include_path, 'w') as include_file:
+            include_file.write('<p>Old text</p>')
+        self.assertIn('Old text', new_loncapa_problem(xml_str, capa_system=capa_system).get_html())
+
+        with open(include_path, 'w') as include_file:
+            include_file.write('<p>New text</p>')
+        os.utime(include_path, (0, 0))
+        self.assertIn('New text', new_loncapa_problem(xml_str, capa_system=capa_system).get_html())
+
+    def test_eviction(self):
+        cache = ParsedProblemCache(max_size=2)
+        entries = [ParsedProblem(None, '', []) for __ in range(3)]
+        cache.set('a', entries[0])
+        cache.set('b', entries[1])
+
+        # Reading 'a' makes 'b' the least recently used entry.
+        self.assertIs(cache.get('a'), entries[0])
+        cache.set('c', entries[2])
+
+        self.assertIsNone(cache.get('b'))
+        self.assertIs(cache.get('a'), entries[0])
+        self.assertIs(cache.get('c'), entries[2])
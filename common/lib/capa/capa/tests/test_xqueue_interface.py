@@ -0,0 +1,73 @@
+"""
+Tests for the xqueue interface.
+"""
+import json
+import unittest
+
+from mock import Mock, patch
+
+from capa.xqueue_interface import XQueueInterface, make_xheader
+
+
+class XQueueInterfaceTest(unittest.TestCase):
+    """
+    Tests for sending submissions to the xqueue.
+    """
+    URL = 'http://xqueue.example.com'
+    DJANGO_AUTH = {'username': 'lms', 'password': 'secret'}
+
+    def setUp(self):
+        super(XQueueInterfaceTest, self).setUp()
+        self.header = make_xheader('http://lms.example.com/callback', 'key', 'test-queue')
+        self.body = json.dumps({'student_response': 'print "hello"'})
+
+    def test_shared_session(self):
+        first = XQueueInterface(self.URL, self.DJANGO_AUTH)
+        second = XQueueInterface(self.URL, self.DJANGO_AUTH)
+        other = XQueueInterface('http://other.example.com', self.DJANGO_AUTH)
+        self.assertIs(first.session, second.session)
+        self.assertIsNot(first.session, other.session)
+
+    def test_send_to_queue(self):
+        interface = XQueueInterface(self.URL, self.DJANGO_AUTH)
+        with patch.object(interface, '_http_post', Mock(return_value=(0, '3'))) as mock_post:
+            self.assertEqual(interface.send_to_queue(self.header, self.body), (0, '3'))
+        mock_post.assert_called_once_with(
+            self.URL + '/xqueue/submit/',
+            {'xqueue_header': self.header, 'xqueue_body': self.body},
+            files={}
+        )
+
+    def test_login_required(self):
+        interface = XQueueInterface(self.URL, self.DJANGO_AUTH)
+        replies = [(1, 'login_required'), (0, 'logged in'), (0, '0')]
+        with patch.object(interface, '_http_post', Mock(side_effect=replies)) as mock_post:
+            self.assertEqual(interface.send_to_queue(self.header, self.body), (0, '0'))
+        self.assertEqual(mock_post.call_count, 3)
+        self.assertEqual(mock_post.call_args_list[1][0][0], self.URL + '/xqueue/login/')
+
+    def test_background_sender(self):
+        sender = Mock()
+        interface = XQueueInterface(self.URL, self.DJANGO_AUTH, background_sender=sender)
+        with patch.object(interface, '_http_post') as mock_post:
+            self.assertEqual(interface.send_to_queue(self.header, self.body), (0, '0'))
+        sender.assert_called_once_with(self.header, self.body)
+        self.assertFalse(mock_post.called)
+
+    def test_background_sender_failure_sends_synchronously(self):
+        interface = XQueueInterface(self.URL, self.DJANGO_AUTH, background_sender=Mock(side_effect=IOError))
+        with patch.object(interface, '_http_post', Mock(return_value=(1, 'unexpected HTTP status code [500]'))):
+            self.assertEqual(
+                interface.send_to_queue(self.header, self.body),
+                (1, 'unexpected HTTP status code [500]')
+            )
+
+    def test_files_sent_synchronously(self):
+        sender = Mock()
+        interface = XQueueInterface(self.URL, self.DJANGO_AUTH, background_sender=sender)
+        upload = Mock()
+        upload.name = 'submission.py'
+        with patch.object(interface, '_http_post', Mock(return_value=(0, '1'))) as mock_post:
+            self.assertEqual(interface.send_to_queue(self.header, self.body, files_to_upload=[upload]), (0, '1'))
+        self.assertEqual(mock_post.call_args[1], {'files': {'submission.py': upload}})
+        self.assertFalse(sender.called)
@@ -4,7 +4,10 @@
 import hashlib
 import json
 import logging
+import threading
+
 import requests
+import requests.adapters
 import dogstats_wrapper as dog_stats_api
 
 
@@ -16,6 +19,9 @@ XQUEUE_METRIC_NAME = 'edxapp.xqueue'
 # Wait time for response from Xqueue.
 XQUEUE_TIMEOUT = 35  # seconds
 
+# Maximum number of connections open to an xqueue server from a process.
+XQUEUE_POOL_SIZE = 10
+
 
 def make_hashkey(seed):
     """
@@ -62,16 +68,54 @@ def parse_xreply(xreply):
     return (return_code, content)
 
 
+def _get_session(url, django_auth, requests_auth, pool_size):
+    """
+    Returns the requests session shared by all interfaces to the given xqueue
+    server with the given credentials, creating it if needed.
+
+    Sharing the session lets the interfaces of a process reuse its keep-alive
+    connections and its login cookie. At most `pool_size` connections are
+    opened to the server; further posts wait for a connection to be free.
+    """
+    key = (
+        url,
+        django_auth.get('username') if django_auth else None,
+        getattr(requests_auth, 'username', None),
+    )
+    with _sessions_lock:
+        if key not in _sessions:
+            session = requests.Session()
+            session.auth = requests_auth
+            adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, pool_block=True)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            _sessions[key] = session
+        return _sessions[key]
+
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
 class XQueueInterface(object):
     """
     Interface to the external grading system
+
+    If a `background_sender` is given, submissions without files are handed
+    to it rather than sent to the xqueue server, so that send_to_queue
+    returns without waiting for the server. It is called as
+    `background_sender(header, body)`, and must durably schedule a call to
+    `send_now(header, body)`, e.g. by starting a task which is retried until
+    the submission is sent. If it raises, the submission is sent
+    synchronously.
     """
 
-    def __init__(self, url, django_auth, requests_auth=None):
+    def __init__(self, url, django_auth, requests_auth=None, background_sender=None,
+                 pool_size=XQUEUE_POOL_SIZE):
         self.url = unicode(url)
         self.auth = django_auth
-        self.session = requests.Session()
-        self.session.auth = requests_auth
+        self.session = _get_session(self.url, django_auth, requests_auth, pool_size)
+        self.background_sender = background_sender
 
     def send_to_queue(self, header, body, files_to_upload=None):
         """
@@ -84,7 +128,10 @@ class XQueueInterface(object):
 
         files_to_upload: List of file objects to be uploaded to xqueue along with queue request
 
-        Returns (error_code, msg) where error_code != 0 indicates an error
+        Returns (error_code, msg) where error_code != 0 indicates an error. On
+        success, msg is xqueue's reply, the length of its queue before the
+        submission. For submissions handed to the background sender, that
+        length is not known yet and msg is always '0'.
         """
 
         # log the send to xqueue
@@ -95,22 +142,41 @@ class XQueueInterface(object):
             u'queue:{}'.format(queue_name)
         ])
 
-        # Attempt to send to queue
-        (error, msg) = self._send_to_queue(header, body, files_to_upload)
-
-        # Log in, then try again
-        if error and (msg == 'login_required'):
-            (error, content) = self._login()
-            if error != 0:
-                # when the login fails
-                log.debug("Failed to login to queue: %s", content)
-                return (error, content)
-            if files_to_upload is not None:
-                # Need to rewind file pointers
-                for f in files_to_upload:
-                    f.seek(0)
+        # Uploaded files are only open for the duration of the request, so they
+        # are always sent right away.
+        if self.background_sender is not None and files_to_upload is None:
+            try:
+                self.background_sender(header, body)
+            except Exception:  # pylint: disable=broad-except
+                log.exception("Could not send xqueue submission in the background; sending synchronously.")
+            else:
+                return (0, u'0')
+
+        return self.send_now(header, body, files_to_upload)
+
+    def send_now(self, header, body, files_to_upload=None):
+        """
+        Sends a submission to xqueue right away, logging in and trying again
+        if needed. Returns (error_code, msg) as send_to_queue does.
+        """
+        queue_name = json.loads(header).get('queue_name', u'')
+        with dog_stats_api.timer(XQUEUE_METRIC_NAME + '.send_to_queue.time', tags=[u'queue:{}'.format(queue_name)]):
+            # Attempt to send to queue
             (error, msg) = self._send_to_queue(header, body, files_to_upload)
 
+            # Log in, then try again
+            if error and (msg == 'login_required'):
+                (error, content) = self._login()
+                if error != 0:
+                    # when the login fails
+                    log.debug("Failed to login to queue: %s", content)
+                    return (error, content)
+                if files_to_upload is not None:
+                    # Need to rewind file pointers
+                    for f in files_to_upload:
+                        f.seek(0)
+                (error, msg) = self._send_to_queue(header, body, files_to_upload)
+
         return (error, msg)
 
     def _login(self):
@@ -134,10 +200,13 @@ class XQueueInterface(object):
 
     def _http_post(self, url, data, files=None):
         try:
-            r = self.session.post(url, data=data, files=files)
+            r = self.session.post(url, data=data, files=files, timeout=XQUEUE_TIMEOUT)
         except requests.exceptions.ConnectionError, err:
             log.error(err)
             return (1, 'cannot connect to server')
+        except requests.exceptions.Timeout, err:
+            log.error(err)
+            return (1, 'server timed out')
 
         if r.status_code not in [200]:
             return (1, 'unexpected HTTP status code [%d]' % r.status_code)
@@ -4,6 +4,13 @@ XASSET_LOCATION_TAG = 'c4x'
 XASSET_SRCREF_PREFIX = 'xasset:'
 
 XASSET_THUMBNAIL_TAIL_NAME = '.jpg'
+# Every name ending in XASSET_THUMBNAIL_TAIL_NAME is the default thumbnail name of some asset, so the thumbnails of
+# the other variants end differently to never share a name with one.
+XASSET_VARIANT_THUMBNAIL_TAIL_NAME = '.jpeg'
+
+# The thumbnail of the default variant is the one shown in Studio and recorded as the thumbnail_location of the
+# image. The other variants are configured by the THUMBNAIL_VARIANTS setting.
+DEFAULT_THUMBNAIL_VARIANT = 'studio'
 
 STREAM_DATA_CHUNK_SIZE = 1024
 
@@ -21,7 +28,7 @@ from PIL import Image
 
 class StaticContent(object):
     def __init__(self, loc, name, content_type, data, last_modified_at=None, thumbnail_location=None, import_path=None,
-                 length=None, locked=False):
+                 length=None, locked=False, thumbnail_variants=None):
         self.location = loc
         self.name = name  # a display string which can be edited, and thus not part of the location which needs to be fixed
         self.content_type = content_type
@@ -29,6 +36,8 @@ class StaticContent(object):
         self.length = length
         self.last_modified_at = last_modified_at
         self.thumbnail_location = thumbnail_location
+        # the names of the thumbnails of the variants other than the default, by variant
+        self.thumbnail_variants = thumbnail_variants
         # optional information about where this file was imported from. This is needed to support import/export
         # cycles
         self.import_path = import_path
@@ -39,10 +48,15 @@ class StaticContent(object):
         return self.location.category == 'thumbnail'
 
     @staticmethod
-    def generate_thumbnail_name(original_name):
+    def generate_thumbnail_name(original_name, variant=DEFAULT_THUMBNAIL_VARIANT):
         name_root, ext = os.path.splitext(original_name)
         if not ext == XASSET_THUMBNAIL_TAIL_NAME:
             name_root = name_root + ext.replace(u'.', u'-')
+        if variant != DEFAULT_THUMBNAIL_VARIANT:
+            return u"{name_root}__{variant}{extension}".format(
+                name_root=name_root,
+                variant=variant,
+                extension=XASSET_VARIANT_THUMBNAIL_TAIL_NAME,)
         return u"{name_root}{extension}".format(
             name_root=name_root,
             extension=XASSET_THUMBNAIL_TAIL_NAME,)
@@ -171,10 +185,10 @@ class StaticContent(object):
 
 class StaticContentStream(StaticContent):
     def __init__(self, loc, name, content_type, stream, last_modified_at=None, thumbnail_location=None, import_path=None,
-                 length=None, locked=False):
+                 length=None, locked=False, thumbnail_variants=None):
         super(StaticContentStream, self).__init__(loc, name, content_type, None, last_modified_at=last_modified_at,
                                                   thumbnail_location=thumbnail_location, import_path=import_path,
-                                                  length=length, locked=locked)
+                                                  length=length, locked=locked, thumbnail_variants=thumbnail_variants)
         self._stream = stream
 
     def stream_data(self):
@@ -206,7 +220,8 @@ class StaticContentStream(StaticContent):
         self._stream.seek(0)
         content = StaticContent(self.location, self.name, self.content_type, self._stream.read(),
                                 last_modified_at=self.last_modified_at, thumbnail_location=self.thumbnail_location,
-                                import_path=self.import_path, length=self.length, locked=self.locked)
+                                import_path=self.import_path, length=self.length, locked=self.locked,
+                                thumbnail_variants=self.thumbnail_variants)
         return content
 
 
@@ -220,10 +235,12 @@ class ContentStore(object):
     def find(self, filename):
         raise NotImplementedError
 
-    def get_all_content_for_course(self, course_key, start=0, maxresults=-1, sort=None, filter_params=None):
+    def get_all_content_for_course(self, course_key, start=0, maxresults=-1, sort=None, filter_params=None,
+                                   after=None):
         '''
         Returns a list of static assets for a course, followed by the total number of assets.
         By default all assets are returned, but start and maxresults can be provided to limit the query.
+        Instead of start, the asset key after which to continue the listing can be given as after.
 
         The return format is a list of asset data dictionaries.
         The asset data dictionaries have the following keys:
@@ -248,35 +265,70 @@ class ContentStore(object):
         """
         raise NotImplementedError
 
+    # the maximum (width, height) of the thumbnail of each variant; the django content store sets it from the
+    # THUMBNAIL_VARIANTS setting
+    thumbnail_variants = {DEFAULT_THUMBNAIL_VARIANT: (128, 128)}
+
     def generate_thumbnail(self, content, tempfile_path=None):
-        thumbnail_content = None
-        # use a naming convention to associate originals with the thumbnail
-        thumbnail_name = StaticContent.generate_thumbnail_name(content.location.name)
+        """
+        Generates and saves the thumbnails of all variants of an image (see generate_thumbnails), and records the
+        names of those other than the default in content.thumbnail_variants.
 
+        Returns the thumbnail of the default variant (None if it couldn't be generated) and its location.
+        """
+        thumbnails = self.generate_thumbnails(content, tempfile_path=tempfile_path)
+        content.thumbnail_variants = {
+            variant: thumbnail.location.name
+            for variant, thumbnail in thumbnails.iteritems()
+            if variant != DEFAULT_THUMBNAIL_VARIANT
+        } or None
         thumbnail_file_location = StaticContent.compute_location(
-            content.location.course_key, thumbnail_name, is_thumbnail=True
+            content.location.course_key, StaticContent.generate_thumbnail_name(content.location.name),
+            is_thumbnail=True
         )
+        return thumbnails.get(DEFAULT_THUMBNAIL_VARIANT), thumbnail_file_location
+
+    def generate_thumbnails(self, content, tempfile_path=None):
+        """
+        Generates and saves a thumbnail of each variant in thumbnail_variants if the content is an image. The image
+        is decoded once, at the smallest scale which still covers the largest variant.
 
+        Returns the thumbnails generated, by variant.
+        """
+        thumbnails = {}
         # if we're uploading an image, then let's generate a thumbnail so that we can
         # serve it up when needed without having to rescale on the fly
-        if content.content_type is not None and content.content_type.split('/')[0] == 'image':
-            try:
-                # use PIL to do the thumbnail generation (http://www.pythonware.com/products/pil/)
-                # My understanding is that PIL will maintain aspect ratios while restricting
-                # the max-height/width to be whatever you pass in as 'size'
-                # @todo: move the thumbnail size to a configuration setting?!?
-                if tempfile_path is None:
-                    im = Image.open(StringIO.StringIO(content.data))
-                else:
-                    im = Image.open(tempfile_path)
-
-                # I've seen some exceptions from the PIL library when trying to save palletted
-                # PNG files to JPEG. Per the google-universe, they suggest converting to RGB first.
-                im = im.convert('RGB')
-                size = 128, 128
-                im.thumbnail(size, Image.ANTIALIAS)
+        if content.content_type is None or content.content_type.split('/')[0] != 'image':
+            return thumbnails
+        try:
+            # use PIL to do the thumbnail generation (http://www.pythonware.com/products/pil/)
+            # My understanding is that PIL will maintain aspect ratios while restricting
+            # the max-height/width to be whatever you pass in as 'size'
+            if tempfile_path is None:
+                im = Image.open(StringIO.StringIO(content.data))
+            else:
+                im = Image.open(tempfile_path)
+
+            # Lets decoders which can (JPEG's) skip straight to a reduced scale rather than decoding every pixel.
+            im.draft('RGB', (
+                max(width for width, __ in self.thumbnail_variants.itervalues()),
+                max(height for __, height in self.thumbnail_variants.itervalues()),
+            ))
+            # I've seen some exceptions from the PIL library when trying to save palletted
+            # PNG files to JPEG. Per the google-universe, they suggest converting to RGB first.
+            im = im.convert('RGB')
+
+            for variant, size in self.thumbnail_variants.iteritems():
+                # use a naming convention to associate originals with the thumbnail
+                thumbnail_name = StaticContent.generate_thumbnail_name(content.location.name, variant)
+                thumbnail_file_location = StaticContent.compute_location(
+                    content.location.course_key, thumbnail_name, is_thumbnail=True
+                )
+
+                thumbnail_image = im.copy()
+                thumbnail_image.thumbnail(size, Image.ANTIALIAS)
                 thumbnail_file = StringIO.StringIO()
-                im.save(thumbnail_file, 'JPEG')
+                thumbnail_image.save(thumbnail_file, 'JPEG')
                 thumbnail_file.seek(0)
 
                 # store this thumbnail as any other piece of content
@@ -284,12 +336,13 @@ class ContentStore(object):
                                                   'image/jpeg', thumbnail_file)
 
                 self.save(thumbnail_content)
+                thumbnails[variant] = thumbnail_content
 
-            except Exception, e:
-                # log and continue as thumbnails are generally considered as optional
-                logging.exception(u"Failed to generate thumbnail for {0}. Exception: {1}".format(content.location, str(e)))
+        except Exception, e:
+            # log and continue as thumbnails are generally considered as optional
+            logging.exception(u"Failed to generate thumbnail for {0}. Exception: {1}".format(content.location, str(e)))
 
-        return thumbnail_content, thumbnail_file_location
+        return thumbnails
 
     def ensure_indexes(self):
         """
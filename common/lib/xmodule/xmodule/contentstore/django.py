@@ -26,5 +26,7 @@ def contentstore(name='default'):
             if name in settings.CONTENTSTORE['ADDITIONAL_OPTIONS']:
                 options.update(settings.CONTENTSTORE['ADDITIONAL_OPTIONS'][name])
         _CONTENTSTORE[name] = class_(**options)
+        if hasattr(settings, 'THUMBNAIL_VARIANTS'):
+            _CONTENTSTORE[name].thumbnail_variants = settings.THUMBNAIL_VARIANTS
 
     return _CONTENTSTORE[name]
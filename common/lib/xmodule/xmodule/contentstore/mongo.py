@@ -1,22 +1,39 @@
 import pymongo
 import gridfs
 from gridfs.errors import NoFile
+from bson.objectid import ObjectId
+from pymongo.errors import DuplicateKeyError
 
 from xmodule.contentstore.content import XASSET_LOCATION_TAG
 
+import datetime
+import hashlib
 import logging
+import threading
 
 from .content import StaticContent, ContentStore, StaticContentStream
 from xmodule.exceptions import NotFoundError
 from fs.osfs import OSFS
 import os
 import json
+from collections import OrderedDict
 from bson.son import SON
 from opaque_keys.edx.keys import AssetKey
 from xmodule.modulestore.django import ASSET_IGNORE_REGEX
 
+# The most courses whose asset metadata each content store keeps indexed in memory.
+ASSET_INDEX_MAX_COURSES = 20
+
 
 class MongoContentStore(ContentStore):
+    """
+    A content store keeping assets and thumbnails in GridFS.
+
+    Listings of a course's assets come from an in-memory index of its fs.files documents, which is kept coherent
+    through the version that every change made by a content store increments. Writes which bypass the content store
+    (e.g. inserting into fs_files directly) don't increment it, so the index stays stale until assets_changed is
+    called for the course.
+    """
 
     # pylint: disable=unused-argument
     def __init__(self, host, db, port=27017, user=None, password=None, bucket='fs', collection=None, **kwargs):
@@ -42,6 +59,12 @@ class MongoContentStore(ContentStore):
         self.fs = gridfs.GridFS(_db, bucket)
 
         self.fs_files = _db[bucket + ".files"]  # the underlying collection GridFS uses
+        self.fs_chunks = _db[bucket + ".chunks"]
+        # the version of the assets of each course, incremented by every change made through a content store
+        self.asset_versions = _db[bucket + ".versions"]
+
+        self._asset_indexes = OrderedDict()
+        self._asset_indexes_lock = threading.RLock()
 
     def close_connections(self):
         """
@@ -58,33 +81,158 @@ class MongoContentStore(ContentStore):
         self.fs_files.database.connection.drop_database(self.fs_files.database)
 
     def save(self, content):
+        """
+        Saves the content. Its data is stored once per distinct content in a blob (see _save_blob), which the
+        gridFS file of the asset references instead of holding chunks of its own.
+        """
         content_id, content_son = self.asset_db_key(content.location)
 
+        data_fields = self._save_blob(content.data)
+
         # The way to version files in gridFS is to not use the file id as the _id but just as the filename.
         # Then you can upload as many versions as you like and access by date or version. Because we use
         # the location as the _id, we must delete before adding (there's no replace method in gridFS)
-        self.delete(content_id)  # delete is a noop if the entry doesn't exist; so, don't waste time checking
+        self._delete_asset(content_id)  # delete is a noop if the entry doesn't exist; so, don't waste time checking
 
         thumbnail_location = content.thumbnail_location.to_deprecated_list_repr() if content.thumbnail_location else None
-        with self.fs.new_file(_id=content_id, filename=unicode(content.location), content_type=content.content_type,
-                              displayname=content.name, content_son=content_son,
-                              thumbnail_location=thumbnail_location,
-                              import_path=content.import_path,
-                              # getattr b/c caching may mean some pickled instances don't have attr
-                              locked=getattr(content, 'locked', False)) as fp:
-            if hasattr(content.data, '__iter__'):
-                for chunk in content.data:
+        self._insert_asset(
+            data_fields, _id=content_id, filename=unicode(content.location), contentType=content.content_type,
+            displayname=content.name, content_son=content_son,
+            thumbnail_location=thumbnail_location,
+            import_path=content.import_path,
+            # getattr b/c caching may mean some pickled instances don't have attr
+            locked=getattr(content, 'locked', False),
+            thumbnail_variants=getattr(content, 'thumbnail_variants', None)
+        )
+
+        self._asset_changed(content_id, content_son)
+        return content
+
+    def _save_blob(self, data):
+        """
+        Stores the data in a blob: a gridFS file which holds the data of every asset with the same content and
+        counts the assets referencing it. If there is a blob with the same SHA-256 digest already, it gets
+        referenced instead and the data just written is dropped. (Blobs are shared between courses, so md5, which
+        authors could craft collisions of, isn't used to identify them.)
+
+        Returns the fields describing the data to store on the file of the asset, including the blob_id.
+        """
+        sha256 = hashlib.sha256()
+        with self.fs.new_file() as fp:
+            if hasattr(data, '__iter__'):
+                for chunk in data:
+                    sha256.update(chunk)
                     fp.write(chunk)
             else:
-                fp.write(content.data)
+                sha256.update(data)
+                fp.write(data)
+        data_fields = {
+            'length': fp.length, 'chunkSize': fp.chunk_size, 'uploadDate': fp.upload_date, 'md5': fp.md5,
+        }
+
+        while True:
+            blob = self.fs_files.find_and_modify(
+                {'blob_sha256': sha256.hexdigest(), 'length': fp.length}, {'$inc': {'references': 1}}
+            )
+            if blob is not None:
+                self.fs.delete(fp._id)
+                data_fields['blob_id'] = blob['_id']
+                return data_fields
+            try:
+                self.fs_files.update({'_id': fp._id}, {'$set': {'blob_sha256': sha256.hexdigest(), 'references': 1}})
+            except DuplicateKeyError:
+                # the same data was saved concurrently and became the blob first
+                continue
+            data_fields['blob_id'] = fp._id
+            return data_fields
+
+    def _convert_to_blob(self, asset):
+        """
+        Moves the data of an asset saved with chunks of its own (as all assets were before blobs) to a blob, and
+        returns the _id of the blob. The asset references the blob before its chunks are removed, so it stays
+        readable throughout.
 
-        return content
+        :param asset: the document of the asset, with the _id as returned by make_id_son
+        """
+        # The data is copied chunk by chunk, so that it never has to fit in memory, and digested along the way.
+        blob_id = ObjectId()
+        sha256 = hashlib.sha256()
+        for chunk in self.fs_chunks.find({'files_id': asset['_id']}, sort=[('n', pymongo.ASCENDING)]):
+            sha256.update(chunk['data'])
+            chunk.update(_id=ObjectId(), files_id=blob_id)
+            self.fs_chunks.insert(chunk)
+
+        while True:
+            blob = self.fs_files.find_and_modify(
+                {'blob_sha256': sha256.hexdigest(), 'length': asset['length']}, {'$inc': {'references': 1}}
+            )
+            if blob is not None:
+                self.fs_chunks.remove({'files_id': blob_id})
+                blob_id = blob['_id']
+                break
+            try:
+                self.fs_files.insert({
+                    '_id': blob_id, 'length': asset['length'], 'chunkSize': asset['chunkSize'],
+                    'uploadDate': asset['uploadDate'], 'md5': asset['md5'],
+                    'blob_sha256': sha256.hexdigest(), 'references': 1,
+                })
+            except DuplicateKeyError:
+                # the same data became a blob concurrently
+                continue
+            break
+
+        self.fs_files.update({'_id': asset['_id']}, {'$set': {'blob_id': blob_id}})
+        self.fs_chunks.remove({'files_id': asset['_id']})
+        return blob_id
+
+    def _release_blob(self, blob_id):
+        """
+        Drops a reference to the blob, removing the blob once no asset references it.
+        """
+        blob = self.fs_files.find_and_modify({'_id': blob_id}, {'$inc': {'references': -1}}, new=True)
+        if blob is not None and blob['references'] <= 0:
+            # only if it wasn't referenced again in the meantime
+            if self.fs_files.remove({'_id': blob_id, 'references': {'$lte': 0}})['n']:
+                self.fs_chunks.remove({'files_id': blob_id})
+
+    def _insert_asset(self, data_fields, **fields):
+        """
+        Inserts the gridFS file of an asset whose data is in the blob described by data_fields.
+        """
+        fields.update(data_fields)
+        self.fs_files.insert(fields)
+
+    def _delete_asset(self, content_id, asset=None):
+        """
+        Deletes the gridFS file of the asset, and releases the blob it references if any.
+
+        :param asset: the document of the asset if it has already been read
+        """
+        if asset is None:
+            asset = self.fs_files.find_one({'_id': content_id}, fields=['blob_id'])
+        self.fs.delete(content_id)
+        if asset is not None and asset.get('blob_id') is not None:
+            self._release_blob(asset['blob_id'])
+
+    def _open_data(self, fp):
+        """
+        Returns the gridFS file holding the data of the asset whose gridFS file is fp.
+        """
+        blob_id = getattr(fp, 'blob_id', None)
+        if blob_id is None:
+            return fp
+        return self.fs.get(blob_id)
 
     def delete(self, location_or_id):
         if isinstance(location_or_id, AssetKey):
-            location_or_id, _ = self.asset_db_key(location_or_id)
+            location_or_id, content_son = self.asset_db_key(location_or_id)
+        elif isinstance(location_or_id, basestring):
+            __, content_son = self.asset_db_key(AssetKey.from_string(location_or_id))
+        else:
+            content_son = location_or_id
         # Deletes of non-existent files are considered successful
-        self.fs.delete(location_or_id)
+        self._delete_asset(location_or_id)
+        self._asset_changed(location_or_id, content_son, deleted=True)
 
     def find(self, location, throw_on_not_found=True, as_stream=False):
         content_id, __ = self.asset_db_key(location)
@@ -99,10 +247,11 @@ class MongoContentStore(ContentStore):
                         thumbnail_location[4]
                     )
                 return StaticContentStream(
-                    location, fp.displayname, fp.content_type, fp, last_modified_at=fp.uploadDate,
+                    location, fp.displayname, fp.content_type, self._open_data(fp), last_modified_at=fp.uploadDate,
                     thumbnail_location=thumbnail_location,
                     import_path=getattr(fp, 'import_path', None),
-                    length=fp.length, locked=getattr(fp, 'locked', False)
+                    length=fp.length, locked=getattr(fp, 'locked', False),
+                    thumbnail_variants=getattr(fp, 'thumbnail_variants', None)
                 )
             else:
                 with self.fs.get(content_id) as fp:
@@ -113,10 +262,12 @@ class MongoContentStore(ContentStore):
                             thumbnail_location[4]
                         )
                     return StaticContent(
-                        location, fp.displayname, fp.content_type, fp.read(), last_modified_at=fp.uploadDate,
+                        location, fp.displayname, fp.content_type, self._open_data(fp).read(),
+                        last_modified_at=fp.uploadDate,
                         thumbnail_location=thumbnail_location,
                         import_path=getattr(fp, 'import_path', None),
-                        length=fp.length, locked=getattr(fp, 'locked', False)
+                        length=fp.length, locked=getattr(fp, 'locked', False),
+                        thumbnail_variants=getattr(fp, 'thumbnail_variants', None)
                     )
         except NoFile:
             if throw_on_not_found:
@@ -163,7 +314,7 @@ class MongoContentStore(ContentStore):
             # to look. -- pmitros
             self.export(asset['asset_key'], output_directory)
             for attr, value in asset.iteritems():
-                if attr not in ['_id', 'md5', 'uploadDate', 'length', 'chunkSize', 'asset_key']:
+                if attr not in ['_id', 'md5', 'uploadDate', 'length', 'chunkSize', 'asset_key', 'blob_id']:
                     policy.setdefault(asset['asset_key'].name, {})[attr] = value
 
         with open(assets_policy_file, 'w') as f:
@@ -172,9 +323,11 @@ class MongoContentStore(ContentStore):
     def get_all_content_thumbnails_for_course(self, course_key):
         return self._get_all_content_for_course(course_key, get_thumbnails=True)[0]
 
-    def get_all_content_for_course(self, course_key, start=0, maxresults=-1, sort=None, filter_params=None):
+    def get_all_content_for_course(self, course_key, start=0, maxresults=-1, sort=None, filter_params=None,
+                                   after=None):
         return self._get_all_content_for_course(
-            course_key, start=start, maxresults=maxresults, get_thumbnails=False, sort=sort, filter_params=filter_params
+            course_key, start=start, maxresults=maxresults, get_thumbnails=False, sort=sort,
+            filter_params=filter_params, after=after
         )
 
     def remove_redundant_content_for_courses(self):
@@ -191,10 +344,14 @@ class MongoContentStore(ContentStore):
             ])
             items = self.fs_files.find(query)
             assets_to_delete = assets_to_delete + items.count()
+            changed_courses = set()
             for asset in items:
-                self.fs.delete(asset[prefix])
+                self._delete_asset(self.make_id_son(asset), asset)
+                changed_courses.add(_asset_index_id(asset[prefix]))
 
             self.fs_files.remove(query)
+            for index_id in changed_courses:
+                self._asset_index_changed(index_id)
         return assets_to_delete
 
     def _get_all_content_for_course(self,
@@ -203,7 +360,8 @@ class MongoContentStore(ContentStore):
                                     start=0,
                                     maxresults=-1,
                                     sort=None,
-                                    filter_params=None):
+                                    filter_params=None,
+                                    after=None):
         '''
         Returns a list of all static assets for a course. The return format is a list of asset data dictionary elements.
 
@@ -213,8 +371,29 @@ class MongoContentStore(ContentStore):
             uploadDate (datetime.datetime): The date and time that the file was uploadDate
             contentType: The mimetype string of the asset
             md5: An md5 hash of the asset content
+
+        The assets are listed from the in-memory index of the course (see _get_asset_index), unless filter_params
+        uses anything but equality, $in and $nin conditions on top-level attributes; the index compares contentType
+        values case-insensitively. If `after` is the key of an
+        asset in the listing, the listing continues after it rather than at `start`.
         '''
-        query = query_for_course(course_key, "asset" if not get_thumbnails else "thumbnail")
+        category = "asset" if not get_thumbnails else "thumbnail"
+        if _AssetIndex.supports_filter(filter_params):
+            index = self._get_asset_index(course_key)
+            with self._asset_indexes_lock:
+                assets = index.list(category, sort, filter_params)
+            count = len(assets)
+            if after is not None:
+                start = _AssetIndex.position_after(assets, after, start)
+            if maxresults > 0:
+                assets = assets[start:start + maxresults]
+            assets = [
+                dict(asset, asset_key=course_key.make_asset_key(*_AssetIndex.key(asset)))
+                for asset in assets
+            ]
+            return assets, count
+
+        query = query_for_course(course_key, category)
         find_args = {"sort": sort}
         if maxresults > 0:
             find_args.update({
@@ -231,10 +410,85 @@ class MongoContentStore(ContentStore):
         # We're constructing the asset key immediately after retrieval from the database so that
         # callers are insulated from knowing how our identifiers are stored.
         for asset in assets:
-            asset_id = asset.get('content_son', asset['_id'])
-            asset['asset_key'] = course_key.make_asset_key(asset_id['category'], asset_id['name'])
+            asset['asset_key'] = course_key.make_asset_key(*_AssetIndex.key(asset))
         return assets, count
 
+    def _get_asset_index(self, course_key):
+        """
+        Returns the index of the metadata of all the assets (and thumbnails) of the course, loading it if it isn't
+        kept in memory yet or is out of date.
+
+        Every change made through a content store increments the version of the assets of the course, so checking
+        whether an index is up to date is a single lookup by _id.
+        """
+        index_id = _asset_index_id(course_key)
+        version_doc = self.asset_versions.find_one({'_id': index_id})
+        version = version_doc['version'] if version_doc else 0
+
+        with self._asset_indexes_lock:
+            index = self._asset_indexes.get(index_id)
+            if index is not None and index.version == version:
+                # keep the most recently used indexes last
+                del self._asset_indexes[index_id]
+                self._asset_indexes[index_id] = index
+                return index
+
+        # Loaded without holding the lock, so that other courses' listings and changes don't wait on the query. The
+        # version is read first, so changes made while loading leave the index out of date.
+        loaded = _AssetIndex(version, self.fs_files.find(query_for_course(course_key)))
+
+        with self._asset_indexes_lock:
+            index = self._asset_indexes.pop(index_id, None)
+            # Another thread may have swapped in a newer index (or updated this one) in the meantime.
+            if index is None or index.version < loaded.version:
+                index = loaded
+            self._asset_indexes[index_id] = index
+            while len(self._asset_indexes) > ASSET_INDEX_MAX_COURSES:
+                self._asset_indexes.popitem(last=False)
+        return index
+
+    def _increment_asset_version(self, index_id):
+        """
+        Increments the version of the assets of the given course, and returns the new version.
+        """
+        return self.asset_versions.find_and_modify(
+            {'_id': index_id}, {'$inc': {'version': 1}}, upsert=True, new=True
+        )['version']
+
+    def _asset_changed(self, content_id, content_son, deleted=False):
+        """
+        Records a change to the given asset. Its entry in the index kept in memory is updated when that index holds
+        all of the previous changes, and the index is dropped otherwise.
+        """
+        index_id = _asset_index_id(content_son)
+        # The round trips are made without holding the lock. Versions are handed out in order, and an asset is read
+        # after its version is incremented, so applying the changes in version order leaves the latest one.
+        version = self._increment_asset_version(index_id)
+        asset = None if deleted else self.fs_files.find_one({'_id': content_id})
+        with self._asset_indexes_lock:
+            index = self._asset_indexes.get(index_id)
+            if index is None:
+                return
+            if index.version != version - 1:
+                del self._asset_indexes[index_id]
+                return
+            index.update(version, (content_son['category'], content_son['name']), asset)
+
+    def assets_changed(self, course_key):
+        """
+        Records changes to any number of the assets of the given course, e.g. made without going through a content
+        store, so that its listings are no longer served from an out of date index.
+        """
+        self._asset_index_changed(_asset_index_id(course_key))
+
+    def _asset_index_changed(self, index_id):
+        """
+        Records changes to any number of the assets of the course with the given index id.
+        """
+        self._increment_asset_version(index_id)
+        with self._asset_indexes_lock:
+            self._asset_indexes.pop(index_id, None)
+
     def set_attr(self, asset_key, attr, value=True):
         """
         Add/set the given attr on the asset at the given location. Does not allow overwriting gridFS built in
@@ -271,13 +525,14 @@ class MongoContentStore(ContentStore):
         :param location:  a c4x asset location
         """
         for attr in attr_dict.iterkeys():
-            if attr in ['_id', 'md5', 'uploadDate', 'length']:
+            if attr in ['_id', 'md5', 'uploadDate', 'length', 'blob_id']:
                 raise AttributeError("{} is a protected attribute.".format(attr))
-        asset_db_key, __ = self.asset_db_key(location)
+        asset_db_key, content_son = self.asset_db_key(location)
         # catch upsert error and raise NotFoundError if asset doesn't exist
         result = self.fs_files.update({'_id': asset_db_key}, {"$set": attr_dict}, upsert=False)
         if not result.get('updatedExisting', True):
             raise NotFoundError(asset_db_key)
+        self._asset_changed(asset_db_key, content_son)
 
     def get_attrs(self, location):
         """
@@ -299,14 +554,18 @@ class MongoContentStore(ContentStore):
         """
         See :meth:`.ContentStore.copy_all_course_assets`
 
-        This implementation fairly expensively copies all of the data
+        This implementation copies only the gridFS files of the assets, which reference the same blobs as the
+        source assets. Source assets which still hold their data in chunks of their own are moved to blobs first,
+        so copying them again copies nothing but their files.
         """
         source_query = query_for_course(source_course_key)
-        # it'd be great to figure out how to do all of this on the db server and not pull the bits over
+        converted_source = False
         for asset in self.fs_files.find(source_query):
             asset_key = self.make_id_son(asset)
-            # don't convert from string until fs access
-            source_content = self.fs.get(asset_key)
+            blob_id = asset.get('blob_id')
+            if blob_id is None:
+                blob_id = self._convert_to_blob(asset)
+                converted_source = True
             if isinstance(asset_key, basestring):
                 asset_key = AssetKey.from_string(asset_key)
                 __, asset_key = self.asset_db_key(asset_key)
@@ -322,17 +581,26 @@ class MongoContentStore(ContentStore):
                     dest_course_key.make_asset_key(asset_key['category'], asset_key['name']).for_branch(None)
                 )
 
-            self.fs.put(
-                source_content.read(),
-                _id=asset_id, filename=asset['filename'], content_type=asset['contentType'],
+            self.fs_files.update({'_id': blob_id}, {'$inc': {'references': 1}})
+            self._delete_asset(asset_id)
+            self._insert_asset(
+                {
+                    'length': asset['length'], 'chunkSize': asset['chunkSize'], 'md5': asset['md5'],
+                    'uploadDate': datetime.datetime.utcnow(), 'blob_id': blob_id,
+                },
+                _id=asset_id, filename=asset['filename'], contentType=asset['contentType'],
                 displayname=asset['displayname'], content_son=asset_key,
                 # thumbnail is not technically correct but will be functionally correct as the code
                 # only looks at the name which is not course relative.
                 thumbnail_location=asset['thumbnail_location'],
                 import_path=asset['import_path'],
                 # getattr b/c caching may mean some pickled instances don't have attr
-                locked=asset.get('locked', False)
+                locked=asset.get('locked', False),
+                thumbnail_variants=asset.get('thumbnail_variants')
             )
+        if converted_source:
+            self.assets_changed(source_course_key)
+        self.assets_changed(dest_course_key)
 
     def delete_all_course_assets(self, course_key):
         """
@@ -344,7 +612,8 @@ class MongoContentStore(ContentStore):
         matching_assets = self.fs_files.find(course_query)
         for asset in matching_assets:
             asset_key = self.make_id_son(asset)
-            self.fs.delete(asset_key)
+            self._delete_asset(asset_key, asset)
+        self.assets_changed(course_key)
 
     # codifying the original order which pymongo used for the dicts coming out of location_to_dict
     # stability of order is more important than sanity of order as any changes to order make things
@@ -412,6 +681,8 @@ class MongoContentStore(ContentStore):
             [('content_son.org', pymongo.ASCENDING), ('content_son.course', pymongo.ASCENDING), ('display_name', pymongo.ASCENDING)],
             sparse=True
         )
+        # Blobs are looked up by the SHA-256 digest of their data; at most one blob holds any given data.
+        self.fs_files.create_index('blob_sha256', unique=True, sparse=True)
 
 
 def query_for_course(course_key, category=None):
@@ -435,3 +706,123 @@ def query_for_course(course_key, category=None):
     else:
         dbkey['{}.run'.format(prefix)] = course_key.run
     return dbkey
+
+
+def _asset_index_id(course_key_or_son):
+    """
+    Returns the id under which the version and index of the assets of a course are kept, given the course key or
+    the son of one of its assets. Deprecated runs of a course share the assets of the course.
+    """
+    if isinstance(course_key_or_son, dict):
+        parts = [course_key_or_son['org'], course_key_or_son['course'], course_key_or_son.get('run')]
+    elif getattr(course_key_or_son, 'deprecated', False):
+        parts = [course_key_or_son.org, course_key_or_son.course, None]
+    else:
+        parts = [course_key_or_son.org, course_key_or_son.course, course_key_or_son.run]
+    return u'/'.join(part for part in parts if part is not None)
+
+
+class _AssetIndex(object):
+    """
+    The fs.files documents of all the assets and thumbnails of a course, keyed by (category, name), along with the
+    listings computed from them.
+    """
+    FILTER_OPERATORS = ('$in', '$nin')
+    # attributes whose values are compared case-insensitively, as MIME types are
+    CASE_INSENSITIVE_FIELDS = ('contentType',)
+
+    def __init__(self, version, assets):
+        self.version = version
+        self.assets = {self.key(asset): asset for asset in assets}
+        self._listings = {}
+
+    @staticmethod
+    def key(asset):
+        """
+        Returns the (category, name) of the given fs.files document.
+        """
+        asset_id = asset.get('content_son', asset['_id'])
+        return asset_id['category'], asset_id['name']
+
+    @classmethod
+    def supports_filter(cls, filter_params):
+        """
+        Returns whether listings of the index can be filtered with the given query.
+        """
+        for field, condition in (filter_params or {}).iteritems():
+            if field.startswith('$') or '.' in field:
+                return False
+            if isinstance(condition, dict) and not all(operator in cls.FILTER_OPERATORS for operator in condition):
+                return False
+        return True
+
+    @classmethod
+    def _matches(cls, asset, filter_params):
+        """
+        Returns whether the given document satisfies the given (supported) query.
+        """
+        for field, condition in filter_params.iteritems():
+            normalize = cls._normalize if field in cls.CASE_INSENSITIVE_FIELDS else lambda value: value
+            value = normalize(asset.get(field))
+            if not isinstance(condition, dict):
+                if value != normalize(condition):
+                    return False
+                continue
+            if '$in' in condition and value not in [normalize(item) for item in condition['$in']]:
+                return False
+            if '$nin' in condition and value in [normalize(item) for item in condition['$nin']]:
+                return False
+        return True
+
+    @staticmethod
+    def _normalize(value):
+        """
+        Returns the given value lowercased if it's a string.
+        """
+        return value.lower() if isinstance(value, basestring) else value
+
+    def update(self, version, key, asset):
+        """
+        Sets the document of the given asset, or removes it if `asset` is None, as of the given version.
+        """
+        if asset is None:
+            self.assets.pop(key, None)
+        else:
+            self.assets[key] = asset
+        self.version = version
+        self._listings = {}
+
+    def list(self, category, sort, filter_params):
+        """
+        Returns the documents of the given category which satisfy the filter, ordered like Mongo would by the
+        given list of (attribute, direction) pairs. Listings are kept until the index changes; callers must not
+        modify them.
+        """
+        listing_key = (category, repr(sort), repr(sorted((filter_params or {}).items())))
+        if listing_key not in self._listings:
+            assets = sorted(
+                (asset for key, asset in self.assets.iteritems() if key[0] == category),
+                key=self.key
+            )
+            if filter_params:
+                assets = [asset for asset in assets if self._matches(asset, filter_params)]
+            # Sort by each attribute in turn, starting with the least significant one; missing values come first
+            # in ascending order, as in Mongo.
+            for field, direction in reversed(sort or []):
+                assets.sort(
+                    key=lambda asset, field=field: (asset.get(field) is not None, asset.get(field)),
+                    reverse=direction == pymongo.DESCENDING
+                )
+            self._listings[listing_key] = assets
+        return self._listings[listing_key]
+
+    @classmethod
+    def position_after(cls, assets, after, default):
+        """
+        Returns the position following the asset with the given key in the listing, or `default` if it isn't
+        listed (anymore).
+        """
+        for position, asset in enumerate(assets):
+            if cls.key(asset) == (after.category, after.name):
+                return position + 1
+        return default
@@ -1130,6 +1130,14 @@ class ModuleStoreReadBase(BulkOperationsMixin, ModuleStoreRead):
                 return course
         return None
 
+    def get_course_keys(self, **kwargs):
+        """
+        Returns the keys of the courses in this modulestore, accepting the same optional 'org' filter as
+        get_courses. Default impl--the ids of the course list; stores which can list keys without loading
+        the courses override it.
+        """
+        return [course.id for course in self.get_courses(**kwargs)]
+
     def has_course(self, course_id, ignore_case=False, **kwargs):
         """
         Returns the course_id of the course if it was found, else None
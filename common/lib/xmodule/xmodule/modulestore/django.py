@@ -81,10 +81,13 @@ class SignalHandler(object):
     """
     course_published = django.dispatch.Signal(providing_args=["course_key"])
     library_updated = django.dispatch.Signal(providing_args=["library_key"])
+    # the cached metadata inheritance tree of an old Mongo course is stale and should be recomputed
+    metadata_inheritance_changed = django.dispatch.Signal(providing_args=["course_key"])
 
     _mapping = {
         "course_published": course_published,
-        "library_updated": library_updated
+        "library_updated": library_updated,
+        "metadata_inheritance_changed": metadata_inheritance_changed,
     }
 
     def __init__(self, modulestore_class):
@@ -100,6 +103,12 @@ class SignalHandler(object):
         for receiver, response in responses:
             log.info('Sent %s signal to %s with kwargs %s. Response was: %s', signal_name, receiver, kwargs, response)
 
+    def has_receivers(self, signal_name):
+        """
+        Whether anything listens for the signal.
+        """
+        return bool(self._mapping[signal_name].receivers)
+
 
 def load_function(path):
     """
@@ -280,6 +280,18 @@ class MixedModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase):
                     courses[course_id] = course
         return courses.values()
 
+    @strip_key
+    def get_course_keys(self, **kwargs):
+        """
+        Returns the keys of the courses in all of the modulestores, without loading the courses where the
+        modulestore allows it.
+        """
+        course_keys = {}
+        for store in self.modulestores:
+            for course_key in store.get_course_keys(**kwargs):
+                course_keys.setdefault(self._clean_locator_for_mapping(course_key), course_key)
+        return course_keys.values()
+
     @strip_key
     def get_libraries(self, **kwargs):
         """
@@ -715,6 +727,14 @@ class MixedModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase):
         store = self._verify_modulestore_support(dest_key.course_key, 'copy_from_template')
         return store.copy_from_template(source_keys, dest_key, user_id)
 
+    @strip_key
+    def write_blocks(self, user_id, course_key, creates=(), updates=(), moves=()):
+        """
+        See :py:meth `SplitMongoModuleStore.write_blocks`
+        """
+        store = self._verify_modulestore_support(course_key, 'write_blocks')
+        return store.write_blocks(user_id, course_key, creates=creates, updates=updates, moves=moves)
+
     @strip_key
     def update_item(self, xblock, user_id, allow_not_found=False, **kwargs):
         """
@@ -657,21 +657,23 @@ class MongoModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase, Mongo
         else:
             return ParentLocationCache()
 
-    def _compute_metadata_inheritance_tree(self, course_id):
-        '''
-        Find all inheritable fields from all xblocks in the course which may define inheritable data
-        '''
+    def _find_inheritance_records(self, course_id, query=None):
+        """
+        Find the containers of the course (matching query, if given) with their children and inheritable
+        metadata, by location url. The draft and published versions of a container are merged.
+        """
         # get all collections in the course, this query should not return any leaf nodes
-        course_id = self.fill_in_run(course_id)
-        query = SON([
+        course_query = SON([
             ('_id.tag', 'i4x'),
             ('_id.org', course_id.org),
             ('_id.course', course_id.course),
             ('_id.category', {'$in': BLOCK_TYPES_WITH_CHILDREN})
         ])
+        if query:
+            course_query.update(query)
         # if we're only dealing in the published branch, then only get published containers
         if self.get_branch_setting() == ModuleStoreEnum.Branch.published_only:
-            query['_id.revision'] = None
+            course_query['_id.revision'] = None
         # we just want the Location, children, and inheritable metadata
         record_filter = {'_id': 1, 'definition.children': 1}
 
@@ -681,12 +683,11 @@ class MongoModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase, Mongo
             record_filter['metadata.{0}'.format(field_name)] = 1
 
         # call out to the DB
-        resultset = self.collection.find(query, record_filter)
+        resultset = self.collection.find(course_query, record_filter)
 
         # it's ok to keep these as deprecated strings b/c the overall cache is indexed by course_key and this
         # is a dictionary relative to that course
         results_by_url = {}
-        root = None
 
         # now go through the results and order them by the location url
         for result in resultset:
@@ -705,42 +706,140 @@ class MongoModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase, Mongo
                 results_by_url[location_url].setdefault('definition', {})['children'] = set(total_children)
             else:
                 results_by_url[location_url] = result
-            if location.category == 'course':
-                root = location_url
+
+        return results_by_url
+
+    def _inherit_metadata(self, results_by_url, url, metadata_to_inherit):
+        """
+        Record in metadata_to_inherit what each descendant of the container url inherits, given that the
+        metadata of its record in results_by_url is everything url itself has (inherited or its own).
+        """
+        my_metadata = results_by_url[url].get('metadata', {})
+
+        # go through all the children and recurse, but only if we have
+        # in the result set. Remember results will not contain leaf nodes
+        for child in results_by_url[url].get('definition', {}).get('children', []):
+            if child in results_by_url:
+                new_child_metadata = copy.deepcopy(my_metadata)
+                new_child_metadata.update(results_by_url[child].get('metadata', {}))
+                results_by_url[child]['metadata'] = new_child_metadata
+                metadata_to_inherit[child] = new_child_metadata
+                self._inherit_metadata(results_by_url, child, metadata_to_inherit)
+            else:
+                # this is likely a leaf node, so let's record what metadata we need to inherit
+                metadata_to_inherit[child] = my_metadata.copy()
+            # WARNING: 'parent' is not part of inherited metadata, but
+            # we're piggybacking on this recursive traversal to grab
+            # and cache the child's parent, as a performance optimization.
+            # The 'parent' key will be popped out of the dictionary during
+            # CachingDescriptorSystem.load_item
+            metadata_to_inherit[child].setdefault('parent', {})[self.get_branch_setting()] = url
+
+    def _compute_metadata_inheritance_tree(self, course_id):
+        '''
+        Find all inheritable fields from all xblocks in the course which may define inheritable data
+        '''
+        course_id = self.fill_in_run(course_id)
+        results_by_url = self._find_inheritance_records(course_id)
 
         # now traverse the tree and compute down the inherited metadata
         metadata_to_inherit = {}
-
-        def _compute_inherited_metadata(url):
-            """
-            Helper method for computing inherited metadata for a specific location url
-            """
-            my_metadata = results_by_url[url].get('metadata', {})
-
-            # go through all the children and recurse, but only if we have
-            # in the result set. Remember results will not contain leaf nodes
-            for child in results_by_url[url].get('definition', {}).get('children', []):
-                if child in results_by_url:
-                    new_child_metadata = copy.deepcopy(my_metadata)
-                    new_child_metadata.update(results_by_url[child].get('metadata', {}))
-                    results_by_url[child]['metadata'] = new_child_metadata
-                    metadata_to_inherit[child] = new_child_metadata
-                    _compute_inherited_metadata(child)
-                else:
-                    # this is likely a leaf node, so let's record what metadata we need to inherit
-                    metadata_to_inherit[child] = my_metadata.copy()
-                # WARNING: 'parent' is not part of inherited metadata, but
-                # we're piggybacking on this recursive traversal to grab
-                # and cache the child's parent, as a performance optimization.
-                # The 'parent' key will be popped out of the dictionary during
-                # CachingDescriptorSystem.load_item
-                metadata_to_inherit[child].setdefault('parent', {})[self.get_branch_setting()] = url
-
-        if root is not None:
-            _compute_inherited_metadata(root)
+        for url, result in results_by_url.iteritems():
+            if result['_id']['category'] == 'course':
+                self._inherit_metadata(results_by_url, url, metadata_to_inherit)
+                break
 
         return metadata_to_inherit
 
+    def _compute_metadata_inheritance_subtree(self, course_id, location, tree):
+        """
+        Recompute what the container at location and its descendants inherit, given the course's cached
+        inheritance tree for the rest. Returns the updated copy of the tree, or None if the whole tree has to
+        be recomputed instead.
+        """
+        url = unicode(as_published(location))
+        # the container itself and its parent, which passes down what the container inherits
+        results_by_url = self._find_inheritance_records(
+            course_id, {'$or': [{'_id.name': location.name}, {'definition.children': url}]}
+        )
+        if url not in results_by_url:
+            return None
+        parent_urls = [
+            parent_url for parent_url, result in results_by_url.iteritems()
+            if url in result.get('definition', {}).get('children', [])
+        ]
+        if not parent_urls:
+            return None
+        parent_url = parent_urls[0]
+        parent_result = results_by_url[parent_url]
+        if parent_result['_id']['category'] == 'course':
+            # the course isn't anyone's child, so what it passes down isn't in the tree
+            parent_metadata = parent_result.get('metadata', {})
+        elif parent_url in tree:
+            parent_metadata = tree[parent_url]
+        else:
+            return None
+
+        # then the containers below it, a level at a time
+        subtree_urls = {url}
+        level = [url]
+        while level:
+            child_names = set()
+            for level_url in level:
+                for child in results_by_url[level_url].get('definition', {}).get('children', []):
+                    child_location = course_id.make_usage_key_from_deprecated_string(child)
+                    if child_location.category in BLOCK_TYPES_WITH_CHILDREN and child not in subtree_urls:
+                        child_names.add(child_location.name)
+            if not child_names:
+                break
+            children = self._find_inheritance_records(course_id, {'_id.name': {'$in': list(child_names)}})
+            level = [child for child in children if child not in subtree_urls]
+            subtree_urls.update(level)
+            results_by_url.update((child, children[child]) for child in level)
+
+        metadata = copy.deepcopy(parent_metadata)
+        metadata.update(results_by_url[url].get('metadata', {}))
+        metadata.setdefault('parent', {})[self.get_branch_setting()] = parent_url
+        results_by_url[url]['metadata'] = metadata
+        subtree = {url: metadata}
+        self._inherit_metadata(results_by_url, url, subtree)
+
+        tree = dict(tree)
+        tree.update(subtree)
+        return tree
+
+    def _get_stored_metadata_inheritance_tree(self, course_id):
+        """
+        Return the course's metadata inheritance tree from the caching subsystem (e.g. memcached), or {}.
+        """
+        if self.metadata_inheritance_cache_subsystem is None:
+            logging.warning(
+                'Running MongoModuleStore without a metadata_inheritance_cache_subsystem. This is \
+                OK in localdev and testing environment. Not OK in production.'
+            )
+            return {}
+        return self.metadata_inheritance_cache_subsystem.get(unicode(course_id), {})
+
+    def _set_cached_metadata_inheritance_tree(self, course_id, tree):
+        """
+        Write out the course's metadata inheritance tree to the caching subsystem and the request cache
+        """
+        # now write out computed tree to caching subsystem (e.g. memcached), if available
+        if self.metadata_inheritance_cache_subsystem is not None:
+            self.metadata_inheritance_cache_subsystem.set(unicode(course_id), tree)
+        self._set_request_cached_metadata_inheritance_tree(course_id, tree)
+
+    def _set_request_cached_metadata_inheritance_tree(self, course_id, tree):
+        """
+        Put the course's metadata inheritance tree into the request cache, if available.
+        """
+        if self.request_cache is not None:
+            # we can't assume the 'metadatat_inheritance' part of the request cache dict has been
+            # defined
+            if 'metadata_inheritance' not in self.request_cache.data:
+                self.request_cache.data['metadata_inheritance'] = {}
+            self.request_cache.data['metadata_inheritance'][unicode(course_id)] = tree
+
     def _get_cached_metadata_inheritance_tree(self, course_id, force_refresh=False):
         '''
         Compute the metadata inheritance for the course.
@@ -754,48 +853,67 @@ class MongoModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase, Mongo
                 return self.request_cache.data['metadata_inheritance'][unicode(course_id)]
 
             # then look in any caching subsystem (e.g. memcached)
-            if self.metadata_inheritance_cache_subsystem is not None:
-                tree = self.metadata_inheritance_cache_subsystem.get(unicode(course_id), {})
-            else:
-                logging.warning(
-                    'Running MongoModuleStore without a metadata_inheritance_cache_subsystem. This is \
-                    OK in localdev and testing environment. Not OK in production.'
-                )
+            tree = self._get_stored_metadata_inheritance_tree(course_id)
 
         if not tree:
             # if not in subsystem, or we are on force refresh, then we have to compute
             tree = self._compute_metadata_inheritance_tree(course_id)
-
-            # now write out computed tree to caching subsystem (e.g. memcached), if available
-            if self.metadata_inheritance_cache_subsystem is not None:
-                self.metadata_inheritance_cache_subsystem.set(unicode(course_id), tree)
-
-        # now populate a request_cache, if available. NOTE, we are outside of the
-        # scope of the above if: statement so that after a memcache hit, it'll get
-        # put into the request_cache
-        if self.request_cache is not None:
-            # we can't assume the 'metadatat_inheritance' part of the request cache dict has been
-            # defined
-            if 'metadata_inheritance' not in self.request_cache.data:
-                self.request_cache.data['metadata_inheritance'] = {}
-            self.request_cache.data['metadata_inheritance'][unicode(course_id)] = tree
+            self._set_cached_metadata_inheritance_tree(course_id, tree)
+        else:
+            # after a memcache hit, put it into the request_cache
+            self._set_request_cached_metadata_inheritance_tree(course_id, tree)
 
         return tree
 
-    def refresh_cached_metadata_inheritance_tree(self, course_id, runtime=None):
+    def refresh_cached_metadata_inheritance_tree(self, course_id, runtime=None, changed_location=None):
         """
         Refresh the cached metadata inheritance tree for the org/course combination
         for location
 
         If given a runtime, it replaces the cached_metadata in that runtime. NOTE: failure to provide
         a runtime may mean that some objects report old values for inherited data.
+
+        If given the location of a leaf block, nothing is recomputed, since what leaves inherit comes from their
+        ancestors.
+
+        Otherwise, if a tree is cached and something listens for the metadata_inheritance_changed signal (to
+        recompute the tree in the background), the stale tree keeps being used until then. If given the location
+        of the only block which changed, only what that block and its descendants inherit is patched into it in the
+        meantime. The patch is a read-modify-write of the shared tree, which a concurrent edit can undo, so it
+        doesn't replace the background recomputation. Course-level edits and deletions are not patched, so the
+        runtime's cached_metadata also keeps the values inherited before them until the runtime is recreated
+        from the recomputed tree.
         """
         course_id = course_id.for_branch(None)
-        if not self._is_in_bulk_operation(course_id):
-            # below is done for side effects when runtime is None
-            cached_metadata = self._get_cached_metadata_inheritance_tree(course_id, force_refresh=True)
-            if runtime:
-                runtime.cached_metadata = cached_metadata
+        if self._is_in_bulk_operation(course_id):
+            return
+
+        course_id = self.fill_in_run(course_id)
+        if changed_location is not None and changed_location.category not in BLOCK_TYPES_WITH_CHILDREN:
+            return
+
+        if self.signal_handler and self.signal_handler.has_receivers("metadata_inheritance_changed"):
+            tree = self._get_stored_metadata_inheritance_tree(course_id)
+            if tree:
+                if changed_location is not None and changed_location.category != 'course':
+                    cached_metadata = self._compute_metadata_inheritance_subtree(course_id, changed_location, tree)
+                    if cached_metadata:
+                        self._set_cached_metadata_inheritance_tree(course_id, cached_metadata)
+                        if runtime:
+                            runtime.cached_metadata = cached_metadata
+                self.signal_handler.send("metadata_inheritance_changed", course_key=course_id)
+                return
+
+        # below is done for side effects when runtime is None
+        cached_metadata = self._get_cached_metadata_inheritance_tree(course_id, force_refresh=True)
+        if runtime:
+            runtime.cached_metadata = cached_metadata
+
+    def recompute_metadata_inheritance_tree(self, course_id):
+        """
+        Recompute the whole metadata inheritance tree of the course and replace the cached one.
+        """
+        self._get_cached_metadata_inheritance_tree(course_id.for_branch(None), force_refresh=True)
 
     def _clean_item_data(self, item):
         """
@@ -985,6 +1103,20 @@ class MongoModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase, Mongo
         )
         return [course for course in base_list if not isinstance(course, ErrorDescriptor)]
 
+    def get_course_keys(self, **kwargs):
+        """
+        Returns the keys of the courses, without loading them. Accepts the same optional 'org' filter as
+        get_courses.
+        """
+        query = {'_id.category': 'course'}
+        if kwargs.get('org'):
+            query['_id.org'] = kwargs['org']
+        return [
+            SlashSeparatedCourseKey(course['_id']['org'], course['_id']['course'], course['_id']['name'])
+            for course in self.collection.find(query, {'_id': True})
+            if not (course['_id']['org'] == 'edx' and course['_id']['course'] == 'templates')
+        ]
+
     def _find_one(self, location):
         '''Look for a given location in the collection. If the item is not present, raise
         ItemNotFoundError.
@@ -1440,7 +1572,9 @@ class MongoModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase, Mongo
             xblock._edit_info = payload['edit_info']
 
             # recompute (and update) the metadata inheritance tree which is cached
-            self.refresh_cached_metadata_inheritance_tree(xblock.scope_ids.usage_id.course_key, xblock.runtime)
+            self.refresh_cached_metadata_inheritance_tree(
+                xblock.scope_ids.usage_id.course_key, xblock.runtime, changed_location=xblock.scope_ids.usage_id
+            )
             # fire signal that we've written to DB
         except ItemNotFoundError:
             if not allow_not_found:
@@ -21,3 +21,9 @@ class BlockKey(namedtuple('BlockKey', 'type id')):
 
 
 CourseEnvelope = namedtuple('CourseEnvelope', 'course_key structure')
+
+# A block to create by SplitMongoModuleStore.write_blocks, as create_child's arguments
+BlockCreate = namedtuple('BlockCreate', 'parent_usage_key block_type block_id fields')
+# A block to move under another parent by SplitMongoModuleStore.write_blocks. The position is the index of the
+# block among the children of its new parent; None appends it.
+BlockMove = namedtuple('BlockMove', 'usage_key parent_usage_key position')
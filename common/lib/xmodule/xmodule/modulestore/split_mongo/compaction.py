@@ -0,0 +1,142 @@
+"""
+Compaction of the history of split modulestore courses and libraries.
+
+Every edit in split writes a whole new structure, and none of them is ever removed by the modulestore itself.
+Compaction deletes the structures which aren't among the most recent versions of any course or library, and the
+definitions which no remaining structure points to.
+"""
+import datetime
+import logging
+import time
+from collections import namedtuple
+
+from pytz import UTC
+
+log = logging.getLogger(__name__)
+
+# How many versions of each branch of each course (or library), counting the head, compaction keeps by default.
+DEFAULT_KEEP_VERSIONS = 10
+# Structures and definitions created more recently than this are never deleted, which covers writes of bulk
+# operations that were under way when compaction started.
+DEFAULT_MIN_AGE = datetime.timedelta(days=1)
+DEFAULT_BATCH_SIZE = 1000
+
+CompactionResult = namedtuple('CompactionResult', 'structures_deleted definitions_deleted bytes_reclaimed')
+
+
+def compact_history(
+        db_connection, keep_versions=DEFAULT_KEEP_VERSIONS, min_age=DEFAULT_MIN_AGE,
+        batch_size=DEFAULT_BATCH_SIZE, pause=0, dry_run=False
+):
+    """
+    Deletes the structures which aren't among the keep_versions most recent versions of a branch of any course or
+    library, nor a library version that a library content block gets its children from, and then the definitions
+    which no remaining structure points to. Nothing created within min_age is deleted.
+
+    It runs online: deletions are made in batches of batch_size, pausing for pause seconds between them.
+
+    Args:
+        db_connection (MongoConnection): the connection to the split modulestore's collections
+        dry_run: if True, only count what would be deleted
+
+    Returns a :class:`CompactionResult`, where bytes_reclaimed is the decrease of the size of the data of the
+    collections (None for a dry run). Mongo only returns the space to the filesystem once the collections are
+    compacted or repaired.
+    """
+    if keep_versions < 1:
+        raise ValueError("Compaction must keep at least the head version of each branch")
+
+    created_before = datetime.datetime.now(UTC) - min_age
+    size_before = None if dry_run else db_connection.storage_size()
+
+    kept_structures = _structures_to_keep(db_connection, keep_versions, batch_size)
+    deleted_structures = set(
+        _id for _id in db_connection.iter_structure_ids(created_before) if _id not in kept_structures
+    )
+    # the snapshots which remaining deltas (such as those too recent to delete) are stored against
+    for structure_id, base_version in db_connection.iter_structure_bases():
+        if structure_id not in deleted_structures:
+            deleted_structures.discard(base_version)
+
+    def delete_structures(ids):
+        """ Deletes a batch of structures. """
+        if not dry_run:
+            db_connection.delete_structures(ids)
+
+    structures_deleted = _delete_in_batches(deleted_structures, delete_structures, batch_size, pause)
+    log.info("Compaction deleted %d structures", structures_deleted)
+
+    referenced_definitions = set()
+    for structure_id, definition_ids in db_connection.iter_structure_definitions():
+        if structure_id not in deleted_structures:
+            referenced_definitions.update(definition_ids)
+
+    def delete_definitions(ids):
+        """ Deletes a batch of definitions. """
+        if not dry_run:
+            db_connection.delete_definitions(ids)
+
+    definitions_deleted = _delete_in_batches(
+        (_id for _id in db_connection.iter_definition_ids(created_before) if _id not in referenced_definitions),
+        delete_definitions, batch_size, pause
+    )
+    log.info("Compaction deleted %d definitions", definitions_deleted)
+
+    bytes_reclaimed = None if dry_run else size_before - db_connection.storage_size()
+    return CompactionResult(structures_deleted, definitions_deleted, bytes_reclaimed)
+
+
+def _structures_to_keep(db_connection, keep_versions, batch_size):
+    """
+    Returns the ids of the keep_versions most recent structures of each branch of every course and library, and
+    of the library versions which library content blocks in those get their children from.
+    """
+    kept = set()
+    versions = set()
+    for index in db_connection.find_matching_course_indexes():
+        versions.update(index.get('versions', {}).itervalues())
+
+    for __ in xrange(keep_versions):
+        versions -= kept
+        if not versions:
+            break
+        kept.update(versions)
+        previous_versions = set()
+        for batch in _batches(versions, batch_size):
+            previous_versions.update(db_connection.find_previous_versions(batch).itervalues())
+        previous_versions.discard(None)
+        versions = previous_versions
+
+    # deltas only hold the blocks they changed, so the rest of their blocks are looked at in their snapshots
+    for batch in _batches(list(kept), batch_size):
+        kept.update(db_connection.find_base_versions(batch))
+    for batch in _batches(list(kept), batch_size):
+        kept.update(db_connection.find_source_library_versions(batch))
+    return kept
+
+
+def _delete_in_batches(ids, delete, batch_size, pause):
+    """
+    Calls delete with batches of the ids, pausing between them. Returns the number of ids.
+    """
+    count = 0
+    for batch in _batches(ids, batch_size):
+        if count and pause:
+            time.sleep(pause)
+        delete(batch)
+        count += len(batch)
+    return count
+
+
+def _batches(ids, batch_size):
+    """
+    Yields lists of up to batch_size of the ids.
+    """
+    batch = []
+    for _id in ids:
+        batch.append(_id)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
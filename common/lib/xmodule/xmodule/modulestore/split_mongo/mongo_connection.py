@@ -1,7 +1,11 @@
 """
 Segregation of pymongo functions from the data modeling mechanisms for split modulestore.
 """
+import copy
 import re
+import threading
+from collections import OrderedDict
+from bson.objectid import ObjectId
 from mongodb_proxy import autoretry_read, MongoProxy
 import pymongo
 
@@ -70,16 +74,47 @@ def structure_to_mongo(structure):
     return new_structure
 
 
+def _block_key(block):
+    """
+    The (block_type, block_id) of a block in the form it's stored in.
+    """
+    return block['block_type'], block['block_id']
+
+
+def _comparable(value):
+    """
+    Returns ``value`` in the form mongo would give it back in, so that blocks about to be stored can be compared
+    with stored ones: tuples (such as BlockKeys) become lists, and datetimes become UTC and lose their
+    sub-millisecond part.
+    """
+    if isinstance(value, dict):
+        return {key: _comparable(val) for key, val in value.iteritems()}
+    if isinstance(value, (list, tuple)):
+        return [_comparable(val) for val in value]
+    if isinstance(value, datetime.datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=pytz.utc)
+        return value.replace(microsecond=value.microsecond // 1000 * 1000)
+    return value
+
+
 class MongoConnection(object):
     """
     Segregation of pymongo functions from the data modeling mechanisms for split modulestore.
     """
+    # The number of structure snapshots (see structure_delta_ratio) to keep in memory
+    SNAPSHOT_CACHE_SIZE = 10
+
     def __init__(
         self, db, collection, host, port=27017, tz_aware=True, user=None, password=None,
-        asset_collection=None, retry_wait_time=0.1, **kwargs
+        asset_collection=None, retry_wait_time=0.1, structure_delta_ratio=None, **kwargs
     ):
         """
         Create & open the connection, authenticate, and provide pointers to the collections
+
+        :param structure_delta_ratio: if set, new structures are stored as the blocks in which they differ from
+            a full snapshot of an earlier version, as long as those are at most this fraction of their blocks.
+            Otherwise they're stored in full, and become the snapshot which later versions are stored against.
         """
         self.database = MongoProxy(
             pymongo.database.Database(
@@ -109,6 +144,11 @@ class MongoConnection(object):
         self.structures.write_concern = {'w': 1}
         self.definitions.write_concern = {'w': 1}
 
+        self.structure_delta_ratio = structure_delta_ratio
+        # shared by the threads using the connection
+        self._snapshot_cache = OrderedDict()
+        self._snapshot_cache_lock = threading.Lock()
+
     def heartbeat(self):
         """
         Check that the db is reachable.
@@ -122,7 +162,7 @@ class MongoConnection(object):
         """
         Get the structure from the persistence mechanism whose id is the given key
         """
-        return structure_from_mongo(self.structures.find_one({'_id': key}))
+        return structure_from_mongo(self._expand_structure(self.structures.find_one({'_id': key})))
 
     @autoretry_read()
     def find_structures_by_id(self, ids):
@@ -132,7 +172,10 @@ class MongoConnection(object):
         Arguments:
             ids (list): A list of structure ids
         """
-        return [structure_from_mongo(structure) for structure in self.structures.find({'_id': {'$in': ids}})]
+        return [
+            structure_from_mongo(self._expand_structure(structure))
+            for structure in self.structures.find({'_id': {'$in': ids}})
+        ]
 
     @autoretry_read()
     def find_structures_derived_from(self, ids):
@@ -142,7 +185,10 @@ class MongoConnection(object):
         Arguments:
             ids (list): A list of structure ids
         """
-        return [structure_from_mongo(structure) for structure in self.structures.find({'previous_version': {'$in': ids}})]
+        return [
+            structure_from_mongo(self._expand_structure(structure))
+            for structure in self.structures.find({'previous_version': {'$in': ids}})
+        ]
 
     @autoretry_read()
     def find_ancestor_structures(self, original_version, block_key):
@@ -153,27 +199,100 @@ class MongoConnection(object):
             original_version (str or ObjectID): The id of a structure
             block_key (BlockKey): The id of the block in question
         """
-        return [
-            structure_from_mongo(structure)
-            for structure in self.structures.find({
-                'original_version': original_version,
-                'blocks': {
-                    '$elemMatch': {
-                        'block_id': block_key.id,
-                        'block_type': block_key.type,
-                        'edit_info.update_version': {
-                            '$exists': True,
-                        },
-                    },
+        block_match = {'block_id': block_key.id, 'block_type': block_key.type}
+        edited_block_match = dict(block_match, **{'edit_info.update_version': {'$exists': True}})
+        structures = list(self.structures.find({
+            'original_version': original_version,
+            'blocks': {'$elemMatch': edited_block_match},
+        }))
+        # deltas which either changed the block, or left it as it is in one of the snapshots found above
+        structures.extend(self.structures.find({
+            'original_version': original_version,
+            '$or': [
+                {'changed_blocks': {'$elemMatch': edited_block_match}},
+                {
+                    'base_version': {'$in': [structure['_id'] for structure in structures]},
+                    'changed_blocks': {'$not': {'$elemMatch': block_match}},
+                    'deleted_blocks': {'$not': {'$elemMatch': block_match}},
                 },
-            })
-        ]
+            ],
+        }))
+        return [structure_from_mongo(self._expand_structure(structure)) for structure in structures]
 
     def insert_structure(self, structure):
         """
         Insert a new structure into the database.
         """
-        self.structures.insert(structure_to_mongo(structure))
+        self.structures.insert(self._delta_or_snapshot(structure_to_mongo(structure)))
+
+    def _delta_or_snapshot(self, structure):
+        """
+        Return the document to store the structure (in mongo form) as: if structure deltas are enabled and it
+        differs little enough from the snapshot its previous version is stored against, a delta against that
+        snapshot, and otherwise the structure itself.
+        """
+        if self.structure_delta_ratio is None or structure.get('previous_version') is None:
+            return structure
+        previous = self.structures.find_one({'_id': structure['previous_version']}, {'base_version': True})
+        if previous is None:
+            # the previous version is being written in the same bulk operation
+            return structure
+
+        base_version = previous.get('base_version', previous['_id'])
+        base_blocks = self._get_snapshot(base_version)
+        blocks = {_block_key(block): block for block in structure['blocks']}
+        changed_blocks = [
+            block for key, block in blocks.iteritems()
+            if _comparable(block) != base_blocks.get(key)
+        ]
+        deleted_blocks = [
+            {'block_type': block_type, 'block_id': block_id}
+            for block_type, block_id in base_blocks.viewkeys() - blocks.viewkeys()
+        ]
+        if len(changed_blocks) + len(deleted_blocks) > self.structure_delta_ratio * len(blocks):
+            return structure
+
+        delta = dict(structure)
+        del delta['blocks']
+        delta.update(base_version=base_version, changed_blocks=changed_blocks, deleted_blocks=deleted_blocks)
+        return delta
+
+    def _expand_structure(self, structure):
+        """
+        Turn a structure document into a full structure (still in mongo form): a delta gets the blocks of its
+        snapshot which it didn't change or delete.
+        """
+        if structure is None or 'base_version' not in structure:
+            return structure
+
+        base_blocks = self._get_snapshot(structure.pop('base_version'))
+        blocks = structure.pop('changed_blocks')
+        replaced = set(_block_key(block) for block in blocks)
+        replaced.update(_block_key(block) for block in structure.pop('deleted_blocks'))
+        blocks.extend(copy.deepcopy(block) for key, block in base_blocks.iteritems() if key not in replaced)
+        structure['blocks'] = blocks
+        return structure
+
+    def _get_snapshot(self, key):
+        """
+        Return the blocks of the full structure ``key``, in mongo form, by (block_type, block_id).
+        Structures never change, so the most recently used snapshots are kept in memory; callers mustn't
+        modify what's returned.
+        """
+        with self._snapshot_cache_lock:
+            blocks = self._snapshot_cache.pop(key, None)
+            if blocks is not None:
+                self._snapshot_cache[key] = blocks
+                return blocks
+
+        # Read without holding the lock; a snapshot read by two threads at once is simply cached twice.
+        snapshot = self.structures.find_one({'_id': key}, {'blocks': True})
+        blocks = {_block_key(block): block for block in snapshot['blocks']}
+        with self._snapshot_cache_lock:
+            self._snapshot_cache[key] = blocks
+            while len(self._snapshot_cache) > self.SNAPSHOT_CACHE_SIZE:
+                self._snapshot_cache.popitem(last=False)
+        return blocks
 
     def get_course_index(self, key, ignore_case=False):
         """
@@ -272,6 +391,112 @@ class MongoConnection(object):
         """
         self.definitions.insert(definition)
 
+    def insert_definitions(self, definitions):
+        """
+        Create all of the definitions in the db in one batch. The definitions which are in the db already are
+        skipped, and their DuplicateKeyError is raised once the others have been created.
+        """
+        self.definitions.insert(definitions, continue_on_error=True)
+
+    @autoretry_read()
+    def find_previous_versions(self, ids):
+        """
+        Return the previous_version of each of the structures listed in ``ids``, by structure id.
+        """
+        return {
+            structure['_id']: structure.get('previous_version')
+            for structure in self.structures.find({'_id': {'$in': ids}}, {'previous_version': True})
+        }
+
+    @autoretry_read()
+    def find_base_versions(self, ids):
+        """
+        Return the snapshots which the structures listed in ``ids`` that are stored as deltas are stored against.
+        """
+        return set(
+            structure['base_version']
+            for structure in self.structures.find(
+                {'_id': {'$in': ids}, 'base_version': {'$exists': True}}, {'base_version': True}
+            )
+        )
+
+    @autoretry_read()
+    def find_source_library_versions(self, ids):
+        """
+        Return the library versions which blocks of the structures listed in ``ids`` are set to get their
+        children from (the source_library_version of library content blocks). Deltas only contribute the blocks
+        they changed: the rest are in their snapshots.
+        """
+        versions = set()
+        for structure in self.structures.find(
+                {
+                    '_id': {'$in': ids},
+                    '$or': [
+                        {'blocks.fields.source_library_version': {'$exists': True}},
+                        {'changed_blocks.fields.source_library_version': {'$exists': True}},
+                    ],
+                },
+                {'blocks.fields.source_library_version': True, 'changed_blocks.fields.source_library_version': True}
+        ):
+            for block in structure.get('blocks', structure.get('changed_blocks')):
+                version = block.get('fields', {}).get('source_library_version')
+                if version and ObjectId.is_valid(version):
+                    versions.add(ObjectId(version))
+        return versions
+
+    def iter_structure_definitions(self):
+        """
+        Yield the _id of each structure along with the ids of the definitions its blocks point to (for deltas,
+        only the blocks they changed).
+        """
+        for structure in self.structures.find({}, {'blocks.definition': True, 'changed_blocks.definition': True}):
+            blocks = structure.get('blocks', structure.get('changed_blocks'))
+            yield structure['_id'], [block['definition'] for block in blocks if 'definition' in block]
+
+    def iter_structure_bases(self):
+        """
+        Yield the _id of each structure stored as a delta along with the id of the snapshot it's stored against.
+        """
+        for structure in self.structures.find({'base_version': {'$exists': True}}, {'base_version': True}):
+            yield structure['_id'], structure['base_version']
+
+    def iter_structure_ids(self, created_before):
+        """
+        Yield the ids of the structures which were created before the given datetime.
+        """
+        for structure in self.structures.find({'_id': {'$lt': ObjectId.from_datetime(created_before)}}, {'_id': True}):
+            yield structure['_id']
+
+    def iter_definition_ids(self, created_before):
+        """
+        Yield the ids of the definitions which were created before the given datetime.
+        """
+        for definition in self.definitions.find(
+                {'_id': {'$lt': ObjectId.from_datetime(created_before)}}, {'_id': True}
+        ):
+            yield definition['_id']
+
+    def delete_structures(self, ids):
+        """
+        Delete the structures listed in ``ids``.
+        """
+        self.structures.remove({'_id': {'$in': ids}})
+
+    def delete_definitions(self, ids):
+        """
+        Delete the definitions listed in ``ids``.
+        """
+        self.definitions.remove({'_id': {'$in': ids}})
+
+    def storage_size(self):
+        """
+        Return the size in bytes of the data of the structures and definitions.
+        """
+        return sum(
+            self.database.command('collstats', collection.name)['size']
+            for collection in (self.structures, self.definitions)
+        )
+
     def ensure_indexes(self):
         """
         Ensure that all appropriate indexes are created that are needed by this modulestore, or raise
@@ -71,7 +71,7 @@ from opaque_keys.edx.locator import (
     BlockUsageLocator, DefinitionLocator, CourseLocator, LibraryLocator, VersionTree, LocalId,
 )
 from xmodule.modulestore.exceptions import InsufficientSpecificationError, VersionConflictError, DuplicateItemError, \
-    DuplicateCourseError
+    DuplicateCourseError, InvalidLocationError
 from xmodule.modulestore import (
     inheritance, ModuleStoreWriteBase, ModuleStoreEnum,
     BulkOpsRecord, BulkOperationsMixin, SortedAssetList, BlockData
@@ -80,7 +80,7 @@ from xmodule.modulestore import (
 from ..exceptions import ItemNotFoundError
 from .caching_descriptor_system import CachingDescriptorSystem
 from xmodule.modulestore.split_mongo.mongo_connection import MongoConnection, DuplicateKeyError
-from xmodule.modulestore.split_mongo import BlockKey, CourseEnvelope
+from xmodule.modulestore.split_mongo import BlockKey, CourseEnvelope, compaction
 from xmodule.error_module import ErrorDescriptor
 from collections import defaultdict
 from types import NoneType
@@ -248,16 +248,19 @@ class SplitBulkWriteMixin(BulkOperationsMixin):
                 # append only, so if it's already been written, we can just keep going.
                 log.debug("Attempted to insert duplicate structure %s", _id)
 
-        for _id in bulk_write_record.definitions.viewkeys() - bulk_write_record.definitions_in_db:
+        new_definition_ids = bulk_write_record.definitions.viewkeys() - bulk_write_record.definitions_in_db
+        if new_definition_ids:
             dirty = True
 
             try:
-                self.db_connection.insert_definition(bulk_write_record.definitions[_id])
+                self.db_connection.insert_definitions(
+                    [bulk_write_record.definitions[_id] for _id in new_definition_ids]
+                )
             except DuplicateKeyError:
-                # We may not have looked up this definition inside this bulk operation, and thus
-                # didn't realize that it was already in the database. That's OK, the store is
-                # append only, so if it's already been written, we can just keep going.
-                log.debug("Attempted to insert duplicate definition %s", _id)
+                # We may not have looked up some of these definitions inside this bulk operation, and thus
+                # didn't realize that they were already in the database. That's OK, the store is
+                # append only, so if they've already been written, we can just keep going.
+                log.debug("Attempted to insert duplicate definitions among %s", new_definition_ids)
 
         if bulk_write_record.index is not None and bulk_write_record.index != bulk_write_record.initial_index:
             dirty = True
@@ -636,14 +639,16 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
                  default_class=None,
                  error_tracker=null_error_tracker,
                  i18n_service=None, fs_service=None, user_service=None,
-                 services=None, signal_handler=None, **kwargs):
+                 services=None, signal_handler=None, structure_delta_ratio=None, **kwargs):
         """
         :param doc_store_config: must have a host, db, and collection entries. Other common entries: port, tz_aware.
+        :param structure_delta_ratio: if set, store new structures as deltas against earlier snapshots
+            (see :class:`MongoConnection`)
         """
 
         super(SplitMongoModuleStore, self).__init__(contentstore, **kwargs)
 
-        self.db_connection = MongoConnection(**doc_store_config)
+        self.db_connection = MongoConnection(structure_delta_ratio=structure_delta_ratio, **doc_store_config)
         self.db = self.db_connection.database
 
         if default_class is not None:
@@ -1599,6 +1604,125 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
         # don't need to update the index b/c create_item did it for this version
         return xblock
 
+    def write_blocks(self, user_id, course_key, creates=(), updates=(), moves=()):
+        """
+        Writes a batch of changes to the blocks of a course as a single new version of its structure (per branch),
+        with all of the new definitions inserted at once and the course index updated once.
+
+        All of the changes are validated before any of them is made; so, a batch which doesn't fit the course
+        changes nothing. Nor does a batch whose writes fail part-way, unless it's written within a bulk operation on
+        the course begun by the caller: what it wrote so far is then left to that bulk operation.
+
+        Args:
+            user_id: ID of the user making the changes
+            course_key: the course to change
+            creates: :class:`.BlockCreate`s of the blocks to create, in order. A block can be created under a
+                block created before it in the batch.
+            updates: xblocks to save, as :meth:`update_item` does
+            moves: :class:`.BlockMove`s of the blocks to move under other parents, in order
+
+        Returns the created xblocks, in order.
+
+        Raises:
+            ItemNotFoundError: if a parent, updated or moved block doesn't exist
+            VersionConflictError: if an xblock to save isn't of the head version of the course
+            DuplicateItemError: if a block to create already exists
+            InvalidLocationError: if a block would be moved under itself or one of its descendants
+        """
+        def usage_key_for(block_key):
+            """
+            The usage key of the block at the head of the course, whatever the version of the key it was given by.
+            """
+            return course_key.version_agnostic().make_usage_key(block_key.type, block_key.id)
+
+        outermost = not self._is_in_bulk_operation(course_key)
+        with self.bulk_operations(course_key):
+            # Validated within the bulk operation, so that the course index and structure are only read once.
+            # The parents of the blocks created or moved by the batch, as they will be once it's written:
+            new_parents = {}
+            for create in creates:
+                if create.block_id is not None:
+                    block_key = BlockKey(create.block_type, create.block_id)
+                    if block_key in new_parents or self.has_item(usage_key_for(block_key)):
+                        raise DuplicateItemError(create.block_id, self, 'structures')
+                parent_key = BlockKey.from_usage_key(create.parent_usage_key)
+                if parent_key not in new_parents and not self.has_item(usage_key_for(parent_key)):
+                    raise ItemNotFoundError(create.parent_usage_key)
+                if create.block_id is not None:
+                    new_parents[block_key] = parent_key
+
+            for xblock in updates:
+                if not self.has_item(xblock.location):
+                    raise ItemNotFoundError(xblock.location)
+                self._get_index_if_valid(xblock.location.course_key)
+
+            def ancestors(block_key):
+                """
+                The block keys of the ancestors of the block, as they will be once the batch is written.
+                """
+                while True:
+                    if block_key in new_parents:
+                        block_key = new_parents[block_key]
+                    else:
+                        parent = self.get_parent_location(usage_key_for(block_key))
+                        if parent is None:
+                            return
+                        block_key = BlockKey.from_usage_key(parent)
+                    yield block_key
+
+            for move in moves:
+                block_key = BlockKey.from_usage_key(move.usage_key)
+                parent_key = BlockKey.from_usage_key(move.parent_usage_key)
+                if block_key not in new_parents and not self.has_item(usage_key_for(block_key)):
+                    raise ItemNotFoundError(move.usage_key)
+                if parent_key not in new_parents and not self.has_item(usage_key_for(parent_key)):
+                    raise ItemNotFoundError(move.parent_usage_key)
+                # which also rules out moving the root, as it's an ancestor of every other block
+                if parent_key == block_key or block_key in ancestors(parent_key):
+                    raise InvalidLocationError(
+                        u"Cannot move {} under its descendant {}".format(move.usage_key, move.parent_usage_key)
+                    )
+                new_parents[block_key] = parent_key
+
+            # Each of the writes moves the head of the course, which was validated against for the whole batch.
+            try:
+                created = [
+                    self.create_child(
+                        user_id, usage_key_for(BlockKey.from_usage_key(create.parent_usage_key)), create.block_type,
+                        block_id=create.block_id, fields=create.fields
+                    )
+                    for create in creates
+                ]
+
+                for xblock in updates:
+                    old_xblock_locn = xblock.location
+                    xblock.location = old_xblock_locn.version_agnostic()
+                    self.update_item(xblock, user_id)
+                    xblock.location = old_xblock_locn
+
+                for move in moves:
+                    block_key = BlockKey.from_usage_key(move.usage_key)
+                    old_parent_location = self.get_parent_location(usage_key_for(block_key))
+                    if old_parent_location is not None:
+                        old_parent = self.get_item(old_parent_location)
+                        old_parent.children = [
+                            child for child in old_parent.children if BlockKey.from_usage_key(child) != block_key
+                        ]
+                        self.update_item(old_parent, user_id)
+
+                    new_parent = self.get_item(usage_key_for(BlockKey.from_usage_key(move.parent_usage_key)))
+                    children = list(new_parent.children)
+                    children.insert(len(children) if move.position is None else move.position, move.usage_key)
+                    new_parent.children = children
+                    self.update_item(new_parent, user_id)
+            except Exception:
+                if outermost:
+                    # Discard the pending writes, so that ending the bulk operation doesn't flush them.
+                    self._clear_bulk_ops_record(course_key)
+                raise
+
+        return created
+
     def clone_course(self, source_course_id, dest_course_id, user_id, fields=None, **kwargs):
         """
         See :meth: `.ModuleStoreWrite.clone_course` for documentation.
@@ -3068,6 +3192,13 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
         """
         return {ModuleStoreEnum.Type.split: self.db_connection.heartbeat()}
 
+    def compact_history(self, **kwargs):
+        """
+        Delete the old versions of all courses and libraries, and the definitions only they used.
+        See :func:`xmodule.modulestore.split_mongo.compaction.compact_history` for the arguments.
+        """
+        return compaction.compact_history(self.db_connection, **kwargs)
+
     def create_runtime(self, course_entry, lazy):
         """
         Create the proper runtime for this course
@@ -86,6 +86,23 @@ class DraftVersioningModuleStore(SplitMongoModuleStore, ModuleStoreDraftAndPubli
         else:
             raise InsufficientSpecificationError()
 
+    def get_course_keys(self, **kwargs):
+        """
+        Returns the keys of the courses on the Draft or Published branch depending on the branch setting,
+        from the course indexes alone.
+        """
+        branch_setting = self.get_branch_setting()
+        if branch_setting == ModuleStoreEnum.Branch.draft_preferred:
+            branch = ModuleStoreEnum.BranchName.draft
+        elif branch_setting == ModuleStoreEnum.Branch.published_only:
+            branch = ModuleStoreEnum.BranchName.published
+        else:
+            raise InsufficientSpecificationError()
+        return [
+            CourseLocator(course_index['org'], course_index['course'], course_index['run'])
+            for course_index in self.find_matching_course_indexes(branch, org_target=kwargs.get('org'))
+        ]
+
     def _auto_publish_no_children(self, location, category, user_id, **kwargs):
         """
         Publishes item if the category is DIRECT_ONLY. This assumes another method has checked that
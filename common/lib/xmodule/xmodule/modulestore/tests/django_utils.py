@@ -11,6 +11,7 @@ from mock import patch
 
 from django.conf import settings
 from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.test import TestCase
 from django.test.utils import override_settings
 from request_cache.middleware import RequestCache
@@ -257,6 +258,9 @@ class ModuleStoreTestCase(TestCase):
 
         self.addCleanup(RequestCache().clear_request_cache)
 
+        # Values cached by earlier tests, e.g. for users or courses whose ids get reused, must not leak into this one.
+        cache.clear()
+
         # Enable XModuleFactories for the space of this test (and its setUp).
         self.addCleanup(XMODULE_FACTORY_LOCK.disable)
         XMODULE_FACTORY_LOCK.enable()
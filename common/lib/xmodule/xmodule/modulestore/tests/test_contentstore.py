@@ -16,6 +16,8 @@ from xmodule.contentstore.mongo import MongoContentStore
 from xmodule.contentstore.content import StaticContent
 from xmodule.exceptions import NotFoundError
 import ddt
+from mock import patch
+import pymongo
 from __builtin__ import delattr
 from xmodule.modulestore.tests.mongo_connection import MONGO_PORT_NUM, MONGO_HOST
 
@@ -166,6 +168,58 @@ class TestContentstore(unittest.TestCase):
         self.assertEqual(count, 0)
         self.assertEqual(course_assets, [])
 
+    @ddt.data(True, False)
+    def test_asset_index(self, deprecated):
+        """
+        Test that listings come from the index kept in memory, which follows changes made through any content store
+        """
+        self.set_up_assets(deprecated)
+        other_store = MongoContentStore(HOST, DB, port=PORT)
+        self.contentstore.get_all_content_for_course(self.course1_key)
+
+        with patch.object(self.contentstore.fs_files, 'find', side_effect=AssertionError):
+            sort = [('displayname', pymongo.DESCENDING)]
+            course1_assets, count = self.contentstore.get_all_content_for_course(self.course1_key, 1, 1, sort=sort)
+            self.assertEqual(count, len(self.course1_files))
+            self.assertEqual([asset['displayname'] for asset in course1_assets], ['picture1.jpg'])
+            self.assertEqual(course1_assets[0]['asset_key'], self.course1_key.make_asset_key('asset', 'picture1.jpg'))
+
+            # keyset pagination
+            course1_assets, __ = self.contentstore.get_all_content_for_course(
+                self.course1_key, maxresults=1, sort=sort, after=course1_assets[0]['asset_key']
+            )
+            self.assertEqual([asset['displayname'] for asset in course1_assets], ['contains.sh'])
+
+            course1_assets, count = self.contentstore.get_all_content_for_course(
+                self.course1_key, filter_params={'contentType': {'$in': ['image/jpeg']}}
+            )
+            self.assertEqual(count, 2)
+
+            # content types are matched case-insensitively
+            __, count = self.contentstore.get_all_content_for_course(
+                self.course1_key, filter_params={'contentType': {'$in': ['IMAGE/JPEG']}}
+            )
+            self.assertEqual(count, 2)
+            __, count = self.contentstore.get_all_content_for_course(
+                self.course1_key, filter_params={'contentType': {'$nin': ['Image/Jpeg']}}
+            )
+            self.assertEqual(count, 1)
+
+            # changes made through this store are applied to the index
+            self.save_asset('picture3.jpg', self.course1_key.make_asset_key('asset', 'picture3.jpg'), 'new', False)
+            self.contentstore.set_attr(self.course1_key.make_asset_key('asset', 'picture2.jpg'), 'locked', True)
+            course1_assets, count = self.contentstore.get_all_content_for_course(self.course1_key, sort=sort)
+            self.assertEqual(count, len(self.course1_files) + 1)
+            self.assertEqual(
+                [(asset['displayname'], asset.get('locked')) for asset in course1_assets],
+                [('picture2.jpg', True), ('picture1.jpg', True), ('new', False), ('contains.sh', False)]
+            )
+
+        # changes made through another store invalidate it
+        other_store.delete(self.course1_key.make_asset_key('asset', 'picture3.jpg'))
+        __, count = self.contentstore.get_all_content_for_course(self.course1_key)
+        self.assertEqual(count, len(self.course1_files))
+
     @ddt.data(True, False)
     def test_attrs(self, deprecated):
         """
@@ -197,6 +251,56 @@ class TestContentstore(unittest.TestCase):
         __, count = self.contentstore.get_all_content_for_course(dest_course)
         self.assertEqual(count, len(self.course1_files))
 
+    @ddt.data(True, False)
+    def test_shared_data(self, deprecated):
+        """
+        Assets with the same content share its data, which copying assets doesn't duplicate and which is only
+        removed along with the last asset referencing it.
+        """
+        self.set_up_assets(deprecated)
+        # picture1.jpg is in both courses
+        self.assertEqual(
+            self.contentstore.fs_files.find({'blob_sha256': {'$exists': True}}).count(),
+            len(set(self.course1_files + self.course2_files))
+        )
+        chunk_count = self.contentstore.fs_chunks.count()
+
+        dest_course = CourseLocator('test', 'destination', 'copy')
+        self.contentstore.copy_all_course_assets(self.course1_key, dest_course)
+        self.assertEqual(self.contentstore.fs_chunks.count(), chunk_count)
+
+        self.contentstore.delete_all_course_assets(self.course1_key)
+        for filename in self.course1_files:
+            copied = self.contentstore.find(dest_course.make_asset_key('asset', filename))
+            with open("{}/static/{}".format(DATA_DIR, filename), "rb") as f:
+                self.assertEqual(copied.data, f.read())
+
+        self.contentstore.delete_all_course_assets(dest_course)
+        self.contentstore.delete_all_course_assets(self.course2_key)
+        self.assertEqual(self.contentstore.fs_files.count(), 0)
+        self.assertEqual(self.contentstore.fs_chunks.count(), 0)
+
+    @ddt.data(True, False)
+    def test_copy_unshared_assets(self, deprecated):
+        """
+        Assets saved with data of their own are moved to shared data when they are first copied.
+        """
+        self.set_up_assets(deprecated)
+        asset_key = self.course1_key.make_asset_key('asset', 'unshared.txt')
+        content_id, content_son = self.contentstore.asset_db_key(asset_key)
+        self.contentstore.fs.put(
+            'unshared data', _id=content_id, filename=unicode(asset_key), content_type='text/plain',
+            displayname='unshared.txt', content_son=content_son, thumbnail_location=None, import_path=None,
+            locked=False
+        )
+        self.contentstore.assets_changed(self.course1_key)
+
+        dest_course = CourseLocator('test', 'destination', 'copy')
+        self.contentstore.copy_all_course_assets(self.course1_key, dest_course)
+        for key in (asset_key, dest_course.make_asset_key('asset', 'unshared.txt')):
+            self.assertEqual(self.contentstore.find(key).data, 'unshared data')
+        self.assertEqual(self.contentstore.fs_chunks.find({'files_id': content_id}).count(), 0)
+
     @ddt.data(True, False)
     def test_delete_assets(self, deprecated):
         """
@@ -17,6 +17,7 @@ from uuid import uuid4
 from datetime import datetime
 from pytz import UTC
 import unittest
+from mock import Mock, call, patch
 from xblock.core import XBlock
 
 from xblock.fields import Scope, Reference, ReferenceList, ReferenceValueDict
@@ -45,6 +46,7 @@ from xmodule.modulestore.tests.utils import LocationMixin
 from xmodule.modulestore.edit_info import EditInfoMixin
 from xmodule.modulestore.exceptions import ItemNotFoundError
 from xmodule.modulestore.inheritance import InheritanceMixin
+from xmodule.modulestore.tests.test_cross_modulestore_import_export import MemoryCache
 
 
 log = logging.getLogger(__name__)
@@ -778,6 +780,54 @@ class TestMongoModuleStore(TestMongoModuleStoreBase):
         # Clean up the data so we don't break other tests which apparently expect a particular state
         self.draft_store.delete_course(course.id, self.dummy_user)
 
+    def test_metadata_inheritance_refresh(self):
+        """
+        Editing a block should only patch what its subtree inherits into the cached tree, with the same result as
+        recomputing the whole tree, and leave the full recomputation to the background.
+        """
+        store = self.draft_store
+        store.metadata_inheritance_cache_subsystem = MemoryCache()
+        self.addCleanup(setattr, store, 'metadata_inheritance_cache_subsystem', None)
+
+        course = store.create_course("TestX", "Inheritance", "2015_T1", self.dummy_user)
+        self.addCleanup(store.delete_course, course.id, self.dummy_user)
+        chapter = store.create_child(self.dummy_user, course.location, 'chapter', block_id='chapter')
+        sequential = store.create_child(self.dummy_user, chapter.location, 'sequential', block_id='sequential')
+        vertical = store.create_child(self.dummy_user, sequential.location, 'vertical', block_id='vertical')
+        html = store.create_child(self.dummy_user, vertical.location, 'html', block_id='html')
+        store.refresh_cached_metadata_inheritance_tree(course.id)
+
+        # something recomputes the tree in the background
+        inheritance_changed = call('metadata_inheritance_changed', course_key=course.id)
+        store.signal_handler = Mock()
+        store.signal_handler.has_receivers.return_value = True
+        self.addCleanup(setattr, store, 'signal_handler', None)
+
+        with patch.object(store, '_compute_metadata_inheritance_tree') as compute:
+            # leaves don't pass anything down
+            html = store.get_item(html.location)
+            html.display_name = 'Leaf'
+            store.update_item(html, self.dummy_user)
+            self.assertNotIn(inheritance_changed, store.signal_handler.send.call_args_list)
+
+            sequential = store.get_item(sequential.location)
+            sequential.showanswer = 'never'
+            store.update_item(sequential, self.dummy_user)
+            self.assertFalse(compute.called)
+        self.assertIn(inheritance_changed, store.signal_handler.send.call_args_list)
+
+        tree = store.metadata_inheritance_cache_subsystem.get(unicode(course.id))
+        self.assertEqual(tree[unicode(html.location.replace(revision=None))]['showanswer'], 'never')
+        self.assertEqual(tree, store._compute_metadata_inheritance_tree(course.id))  # pylint: disable=protected-access
+
+        # a full refresh leaves the stale tree in place until then
+        store.signal_handler.send.reset_mock()
+        course = store.get_course(course.id)
+        course.showanswer = 'always'
+        store.update_item(course, self.dummy_user)
+        self.assertIn(inheritance_changed, store.signal_handler.send.call_args_list)
+        self.assertEqual(store.metadata_inheritance_cache_subsystem.get(unicode(course.id)), tree)
+
 
 class TestMongoModuleStoreWithNoAssetCollection(TestMongoModuleStore):
     '''
@@ -11,6 +11,7 @@ import uuid
 
 from contracts import contract
 from nose.plugins.attrib import attr
+from mock import patch
 
 from openedx.core.lib import tempdir
 from xblock.fields import Reference, ReferenceList, ReferenceValueDict
@@ -19,7 +20,7 @@ from xmodule.modulestore import ModuleStoreEnum
 from xmodule.modulestore.exceptions import (
     ItemNotFoundError, VersionConflictError,
     DuplicateItemError, DuplicateCourseError,
-    InsufficientSpecificationError
+    InsufficientSpecificationError, InvalidLocationError
 )
 from opaque_keys.edx.locator import CourseLocator, BlockUsageLocator, VersionTree, LocalId
 from xmodule.modulestore.inheritance import InheritanceMixin
@@ -27,7 +28,7 @@ from xmodule.x_module import XModuleMixin
 from xmodule.fields import Date, Timedelta
 from xmodule.modulestore.split_mongo.split import SplitMongoModuleStore
 from xmodule.modulestore.tests.test_modulestore import check_has_course_method
-from xmodule.modulestore.split_mongo import BlockKey
+from xmodule.modulestore.split_mongo import BlockKey, BlockCreate, BlockMove
 from xmodule.modulestore.tests.mongo_connection import MONGO_PORT_NUM, MONGO_HOST
 from xmodule.modulestore.edit_info import EditInfoMixin
 
@@ -1408,6 +1409,78 @@ class TestItemCrud(SplitModuleTest):
         self.assertEqual(updated_block.children[0].version_agnostic(), block.children[0].version_agnostic())
         self.assertEqual(updated_block.advertised_start, "Soon")
 
+    def test_write_blocks(self):
+        """
+        Test that write_blocks writes a batch of changes as one new version of the course
+        """
+        course = modulestore().create_course('test_org', 'test_batch', 'test_run', self.user_id, BRANCH_NAME_DRAFT)
+        course_key = course.id.version_agnostic()
+        chapter = modulestore().create_child(self.user_id, course.location, 'chapter', block_id='chapter1')
+        pre_version_guid = chapter.location.version_guid
+
+        chapter.display_name = 'Renamed'
+        chapter2_key = course_key.make_usage_key('chapter', 'chapter2')
+        sequential_key = course_key.make_usage_key('sequential', 'seq1')
+        created = modulestore().write_blocks(
+            self.user_id, course_key,
+            creates=[
+                BlockCreate(course.location, 'chapter', 'chapter2', {'display_name': 'chapter 2'}),
+                BlockCreate(chapter2_key, 'sequential', 'seq1', None),
+                BlockCreate(sequential_key, 'vertical', None, None),
+            ],
+            updates=[chapter],
+            moves=[BlockMove(sequential_key, chapter.location, None)],
+        )
+        self.assertEqual([xblock.location.block_type for xblock in created], ['chapter', 'sequential', 'vertical'])
+
+        # all of the changes are in a single new version
+        course = modulestore().get_course(course_key)
+        self.assertEqual(
+            modulestore().get_course_history_info(course_key)['previous_version'], pre_version_guid
+        )
+        chapter = modulestore().get_item(course_key.make_usage_key('chapter', 'chapter1'))
+        self.assertEqual(chapter.display_name, 'Renamed')
+        self.assertEqual(version_agnostic(chapter.children), [sequential_key])
+        self.assertEqual(modulestore().get_item(chapter2_key).children, [])
+        self.assertEqual(len(modulestore().get_item(sequential_key).children), 1)
+
+        # invalid batches change nothing
+        version_guid = course.location.version_guid
+        invalid_batches = [
+            (DuplicateItemError, {'creates': [BlockCreate(course.location, 'chapter', 'chapter2', None)]}),
+            (ItemNotFoundError, {
+                'creates': [BlockCreate(course.location, 'chapter', 'chapter3', None)],
+                'moves': [BlockMove(course_key.make_usage_key('chapter', 'nope'), course.location, None)],
+            }),
+            (InvalidLocationError, {'moves': [BlockMove(chapter.location, sequential_key, 0)]}),
+            (InvalidLocationError, {'moves': [BlockMove(course.location, chapter2_key, 0)]}),
+        ]
+        for error, batch in invalid_batches:
+            with self.assertRaises(error):
+                modulestore().write_blocks(self.user_id, course_key, **batch)
+            self.assertEqual(modulestore().get_course(course_key).location.version_guid, version_guid)
+
+        # nor do batches whose writes fail part-way
+        with patch.object(modulestore(), 'update_item', side_effect=IOError):
+            with self.assertRaises(IOError):
+                modulestore().write_blocks(
+                    self.user_id, course_key,
+                    creates=[BlockCreate(course.location, 'chapter', 'chapter3', None)],
+                    updates=[chapter],
+                )
+        self.assertEqual(modulestore().get_course(course_key).location.version_guid, version_guid)
+        self.assertFalse(modulestore().has_item(course_key.make_usage_key('chapter', 'chapter3')))
+
+        # the batch is validated within a single bulk operation
+        db_connection = modulestore().db_connection
+        with patch.object(db_connection, 'get_course_index', wraps=db_connection.get_course_index) as get_index:
+            with self.assertRaises(InvalidLocationError):
+                modulestore().write_blocks(self.user_id, course_key, moves=[
+                    BlockMove(chapter2_key, course.location, None),
+                    BlockMove(course.location, sequential_key, 0),
+                ])
+        self.assertEqual(get_index.call_count, 1)
+
     def test_delete_item(self):
         course = self.create_course_for_deletion()
         with self.assertRaises(ValueError):
@@ -1956,6 +2029,71 @@ class TestPublish(SplitModuleTest):
         self.assertEqual(source_block_keys, dest_block_keys)
 
 
+class TestStructureDeltas(SplitModuleTest):
+    """
+    Test storing structures as deltas against snapshots
+    """
+    def setUp(self):
+        super(TestStructureDeltas, self).setUp()
+        self.db_connection = modulestore().db_connection
+        self.db_connection.structure_delta_ratio = 0.5
+        self.course_key = CourseLocator(org='testx', course='GreekHero', run='run', branch=BRANCH_NAME_DRAFT)
+        self.snapshot_version = modulestore().get_course(self.course_key).location.version_guid
+
+    def update_problem(self, block_id, max_attempts):
+        """
+        Update a problem's max_attempts and return the new version of the course
+        """
+        problem = modulestore().get_item(self.course_key.make_usage_key('problem', block_id))
+        problem.max_attempts = max_attempts
+        problem.save()
+        return modulestore().update_item(problem, self.user_id).location.version_guid
+
+    def test_deltas(self):
+        first_version = self.update_problem('problem3_2', 4)
+        second_version = self.update_problem('problem1', 5)
+
+        for version in (first_version, second_version):
+            stored = self.db_connection.structures.find_one({'_id': version})
+            self.assertNotIn('blocks', stored)
+            self.assertEqual(stored['base_version'], self.snapshot_version)
+        stored = self.db_connection.structures.find_one({'_id': second_version})
+        self.assertItemsEqual(
+            [(block['block_type'], block['block_id']) for block in stored['changed_blocks']],
+            [('problem', 'problem3_2'), ('problem', 'problem1')]
+        )
+
+        snapshot = self.db_connection.get_structure(self.snapshot_version)
+        structure = self.db_connection.get_structure(second_version)
+        self.assertEqual(structure['previous_version'], first_version)
+        self.assertEqual(structure['blocks'].viewkeys(), snapshot['blocks'].viewkeys())
+        chapter_key = BlockKey('chapter', 'chapter1')
+        self.assertEqual(
+            structure['blocks'][chapter_key].to_storable(), snapshot['blocks'][chapter_key].to_storable()
+        )
+        self.assertEqual(structure['blocks'][BlockKey('problem', 'problem3_2')].fields['max_attempts'], 4)
+        self.assertEqual(modulestore().get_item(self.course_key.make_usage_key('problem', 'problem1')).max_attempts, 5)
+
+        # the delta which didn't change problem3_2 still counts among the versions containing it
+        ancestors = self.db_connection.find_ancestor_structures(
+            snapshot['original_version'], BlockKey('problem', 'problem3_2')
+        )
+        self.assertTrue({self.snapshot_version, first_version, second_version} <= {s['_id'] for s in ancestors})
+
+    def test_deleted_blocks(self):
+        modulestore().delete_item(self.course_key.make_usage_key('problem', 'problem1'), self.user_id)
+        version = modulestore().get_course(self.course_key).location.version_guid
+
+        stored = self.db_connection.structures.find_one({'_id': version})
+        self.assertIn({'block_type': 'problem', 'block_id': 'problem1'}, stored['deleted_blocks'])
+        self.assertNotIn(BlockKey('problem', 'problem1'), self.db_connection.get_structure(version)['blocks'])
+
+    def test_snapshot(self):
+        self.db_connection.structure_delta_ratio = 0
+        version = self.update_problem('problem3_2', 4)
+        self.assertIn('blocks', self.db_connection.structures.find_one({'_id': version}))
+
+
 class TestSchema(SplitModuleTest):
     """
     Test the db schema (and possibly eventually migrations?)
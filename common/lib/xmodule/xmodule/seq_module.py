@@ -1,3 +1,4 @@
+import hashlib
 import json
 import logging
 import warnings
@@ -25,6 +26,16 @@ class_priority = ['video', 'problem']
 _ = lambda text: text
 
 
+def hash_resource(resource):
+    """
+    Hash a :class:`xblock.fragment.FragmentResource`, so that the client loads each resource only once.
+    """
+    md5 = hashlib.md5()
+    for data in resource:
+        md5.update(repr(data))
+    return md5.hexdigest()
+
+
 class SequenceFields(object):
     has_children = True
 
@@ -47,6 +58,25 @@ class SequenceFields(object):
         scope=Scope.content,
     )
 
+    render_units_on_demand = Boolean(
+        display_name=_("Load Units on Demand"),
+        help=_(
+            "Render only the current unit of this subsection when the page loads, "
+            "and load the other units as learners navigate to them."
+        ),
+        default=False,
+        scope=Scope.settings,
+    )
+    prefetch_next_unit = Boolean(
+        display_name=_("Prefetch Next Unit"),
+        help=_(
+            "When units are loaded on demand, load the next unit in the background "
+            "once a unit has been displayed."
+        ),
+        default=True,
+        scope=Scope.settings,
+    )
+
 
 class SequenceModule(SequenceFields, XModule):
     ''' Layout module which lays out content in a temporal sequence
@@ -98,8 +128,29 @@ class SequenceModule(SequenceFields, XModule):
             else:
                 self.position = 1
             return json.dumps({'success': True})
+        elif dispatch == 'render_unit':
+            return json.dumps(self._render_unit(data.get('position', u'')))
         raise NotFoundError('Unexpected dispatch type')
 
+    def _render_unit(self, position):
+        """
+        Renders the child at the given (1-indexed) position, for sequences that render units on demand.
+
+        Returns a dict with the rendered 'html' of the child, and the 'resources' it depends on, as a list
+        of (hash, resource) pairs.
+        """
+        display_items = self.get_display_items()
+        if not position.isdigit() or not 0 < int(position) <= len(display_items):
+            raise NotFoundError('Invalid unit position')
+
+        rendered_child = display_items[int(position) - 1].render(STUDENT_VIEW, {})
+        return {
+            'html': rendered_child.content,
+            'resources': [
+                (hash_resource(resource), resource._asdict()) for resource in rendered_child.resources
+            ],
+        }
+
     def student_view(self, context):
         # If we're rendering this sequence, but no position is set yet,
         # default the position to the first element
@@ -111,14 +162,21 @@ class SequenceModule(SequenceFields, XModule):
 
         fragment = Fragment()
 
-        for child in self.get_display_items():
+        for index, child in enumerate(self.get_display_items()):
             progress = child.get_progress()
-            rendered_child = child.render(STUDENT_VIEW, context)
-            fragment.add_frag_resources(rendered_child)
+
+            # When rendering on demand, only the current unit is rendered now, and the others are
+            # fetched through the 'render_unit' dispatch when they are displayed.
+            if self.render_units_on_demand and index + 1 != self.position:
+                content = None
+            else:
+                rendered_child = child.render(STUDENT_VIEW, context)
+                fragment.add_frag_resources(rendered_child)
+                content = rendered_child.content
 
             titles = child.get_content_titles()
             childinfo = {
-                'content': rendered_child.content,
+                'content': content,
                 'title': "\n".join(titles),
                 'page_title': titles[0] if titles else '',
                 'progress_status': Progress.to_js_status_str(progress),
@@ -136,6 +194,7 @@ class SequenceModule(SequenceFields, XModule):
                   'position': self.position,
                   'tag': self.location.category,
                   'ajax_url': self.system.ajax_url,
+                  'prefetch_next_unit': self.render_units_on_demand and self.prefetch_next_unit,
                   }
 
         fragment.add_content(self.system.render_template('seq_module.html', params))
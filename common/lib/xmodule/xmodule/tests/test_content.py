@@ -5,7 +5,7 @@ import unittest
 import ddt
 from path import path
 from xmodule.contentstore.content import StaticContent, StaticContentStream
-from xmodule.contentstore.content import ContentStore
+from xmodule.contentstore.content import ContentStore, DEFAULT_THUMBNAIL_VARIANT
 from opaque_keys.edx.locations import SlashSeparatedCourseKey, AssetLocation
 from xmodule.static_content import _write_js, _list_descriptors
 
@@ -113,6 +113,17 @@ class ContentTest(unittest.TestCase):
         self.assertIsNone(thumbnail_content)
         self.assertEqual(AssetLocation(u'mitX', u'800', u'ignore_run', u'thumbnail', thumbnail_filename), thumbnail_file_location)
 
+    @ddt.data(
+        (u"monsters.jpg", DEFAULT_THUMBNAIL_VARIANT, u"monsters.jpg"),
+        (u"monsters.jpg", u"mobile", u"monsters__mobile.jpeg"),
+        (u"monsters.png", u"course_card", u"monsters-png__course_card.jpeg"),
+        # doesn't collide with the thumbnail of an asset named like a variant thumbnail
+        (u"monsters__mobile.jpg", DEFAULT_THUMBNAIL_VARIANT, u"monsters__mobile.jpg"),
+    )
+    @ddt.unpack
+    def test_generate_thumbnail_name_variants(self, original_filename, variant, thumbnail_filename):
+        self.assertEqual(StaticContent.generate_thumbnail_name(original_filename, variant), thumbnail_filename)
+
     def test_compute_location(self):
         # We had a bug that __ got converted into a single _. Make sure that substitution of INVALID_CHARS (like space)
         # still happen.
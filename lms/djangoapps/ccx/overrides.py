@@ -11,10 +11,15 @@ from django.db import transaction, IntegrityError
 
 from courseware.field_overrides import FieldOverrideProvider  # pylint: disable=import-error
 from ccx import ACTIVE_CCX_KEY  # pylint: disable=import-error
+from request_cache.middleware import RequestCache  # pylint: disable=import-error
 
 from .models import CcxMembership, CcxFieldOverride
 
 
+# The request cache entry holding the overrides of each CCX, keyed by CCX id, see _get_ccx_overrides.
+REQUEST_CACHE_KEY = 'ccx.overrides'
+
+
 class CustomCoursesForEdxOverrideProvider(FieldOverrideProvider):
     """
     A concrete implementation of
@@ -30,6 +35,13 @@ class CustomCoursesForEdxOverrideProvider(FieldOverrideProvider):
             return get_override_for_ccx(ccx, block, name, default)
         return default
 
+    def overrides_field(self, block, name):
+        """
+        Only fields overridden somewhere in the current ccx need to be looked up on the block's ancestors.
+        """
+        ccx = get_current_ccx()
+        return bool(ccx) and name in _get_ccx_overrides(ccx)['fields']
+
 
 class _CcxContext(threading.local):
     """
@@ -93,18 +105,41 @@ def _get_overrides_for_ccx(ccx, block):
     Returns a dictionary mapping field name to overriden value for any
     overrides set on this block for this CCX.
     """
+    ccx_overrides = _get_ccx_overrides(ccx)
+    location = CcxFieldOverride._meta.get_field('location').get_prep_value(block.location)
     overrides = {}
-    query = CcxFieldOverride.objects.filter(
-        ccx=ccx,
-        location=block.location
-    )
-    for override in query:
-        field = block.fields[override.field]
-        value = field.from_json(json.loads(override.value))
-        overrides[override.field] = value
+    for field_name, value in ccx_overrides['blocks'].get(location, {}).iteritems():
+        field = block.fields[field_name]
+        overrides[field_name] = field.from_json(json.loads(value))
     return overrides
 
 
+def _get_ccx_overrides(ccx):
+    """
+    Returns all of the overrides set for this CCX, loaded with a single query
+    and kept for the rest of the request: the JSON override values keyed by
+    block location (as stored) and field name under 'blocks', and the set of
+    overridden field names under 'fields'.
+    """
+    cache = RequestCache.get_request_cache().data.setdefault(REQUEST_CACHE_KEY, {})
+    if ccx.id not in cache:
+        ccx_overrides = {'blocks': {}, 'fields': set()}
+        query = CcxFieldOverride.objects.filter(ccx=ccx)
+        for location, field_name, value in query.values_list('location', 'field', 'value'):
+            ccx_overrides['blocks'].setdefault(location, {})[field_name] = value
+            ccx_overrides['fields'].add(field_name)
+        cache[ccx.id] = ccx_overrides
+    return cache[ccx.id]
+
+
+def _clear_ccx_overrides(ccx):
+    """
+    Discards the overrides of the CCX that were loaded during this request,
+    after changing them.
+    """
+    RequestCache.get_request_cache().data.get(REQUEST_CACHE_KEY, {}).pop(ccx.id, None)
+
+
 @transaction.commit_on_success
 def override_field_for_ccx(ccx, block, name, value):
     """
@@ -128,6 +163,7 @@ def override_field_for_ccx(ccx, block, name, value):
             field=name)
         override.value = value
     override.save()
+    _clear_ccx_overrides(ccx)
     if hasattr(block, '_ccx_overrides'):
         del block._ccx_overrides[ccx.id]  # pylint: disable=protected-access
 
@@ -145,6 +181,7 @@ def clear_override_for_ccx(ccx, block, name):
             location=block.location,
             field=name).delete()
 
+        _clear_ccx_overrides(ccx)
         if hasattr(block, '_ccx_overrides'):
             del block._ccx_overrides[ccx.id]  # pylint: disable=protected-access
 
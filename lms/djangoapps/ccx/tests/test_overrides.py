@@ -127,3 +127,17 @@ class TestFieldOverrides(ModuleStoreTestCase):
         override_field_for_ccx(self.ccx, chapter, 'due', ccx_due)
         vertical = chapter.get_children()[0].get_children()[0]
         self.assertEqual(vertical.due, ccx_due)
+
+    def test_overrides_loaded_with_one_query(self):
+        """
+        Test that the overrides of every block in the ccx, including inherited
+        ones, are looked up with a single query.
+        """
+        ccx_start = datetime.datetime(2014, 12, 25, 00, 00, tzinfo=pytz.UTC)
+        for chapter in self.course.get_children():
+            override_field_for_ccx(self.ccx, chapter, 'start', ccx_start)
+
+        blocks = list(iter_blocks(self.course))[1:]
+        with self.assertNumQueries(1):
+            starts = [block.start for block in blocks]
+        self.assertEqual(starts, [ccx_start] * len(blocks))
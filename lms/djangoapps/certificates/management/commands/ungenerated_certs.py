@@ -6,7 +6,7 @@ import logging
 import datetime
 from pytz import UTC
 from django.core.management.base import BaseCommand, CommandError
-from certificates.models import certificate_status_for_student
+from certificates.models import certificate_statuses_for_students
 from certificates.queue import XQueueCertInterface
 from django.contrib.auth.models import User
 from optparse import make_option
@@ -57,6 +57,13 @@ class Command(BaseCommand):
                     'whose entry in the certificate table matches STATUS. '
                     'STATUS can be generating, unavailable, deleted, error '
                     'or notpassing.'),
+        make_option('-b', '--batch-size',
+                    metavar='SIZE',
+                    dest='batch_size',
+                    type='int',
+                    default=500,
+                    help='Number of students whose certificates are '
+                    'generated together (default 500)'),
     )
 
     def handle(self, *args, **options):
@@ -83,6 +90,10 @@ class Command(BaseCommand):
 
         STATUS_INTERVAL = 500
 
+        # Look up, grade and queue this many students at a time
+
+        BATCH_SIZE = options['batch_size']
+
         if options['course']:
             # try to parse out the course from the serialized form
             try:
@@ -115,70 +126,88 @@ class Command(BaseCommand):
             count = 0
             start = datetime.datetime.now(UTC)
 
-            for student in enrolled_students:
-                count += 1
-                if count % STATUS_INTERVAL == 0:
+            # Students are processed in batches, so that their certificates can
+            # be looked up, graded and queued together.
+            last_student_id = 0
+            while True:
+                students = list(enrolled_students.filter(id__gt=last_student_id).order_by('id')[:BATCH_SIZE])
+                if not students:
+                    break
+                last_student_id = students[-1].id
+
+                previous_count = count
+                count += len(students)
+                if count // STATUS_INTERVAL > previous_count // STATUS_INTERVAL:
                     # Print a status update with an approximation of
                     # how much time is left based on how long the last
-                    # interval took
+                    # batch took
                     diff = datetime.datetime.now(UTC) - start
-                    timeleft = diff * (total - count) / STATUS_INTERVAL
+                    timeleft = diff * (total - count) / len(students)
                     hours, remainder = divmod(timeleft.seconds, 3600)
                     minutes, _seconds = divmod(remainder, 60)
                     print "{0}/{1} completed ~{2:02}:{3:02}m remaining".format(
                         count, total, hours, minutes)
-                    start = datetime.datetime.now(UTC)
+                start = datetime.datetime.now(UTC)
 
-                cert_status = certificate_status_for_student(student, course_key)['status']
-                LOGGER.info(
-                    (
-                        u"Student %s has certificate status '%s' "
-                        u"in course '%s'"
-                    ),
-                    student.id,
-                    cert_status,
-                    unicode(course_key)
-                )
+                cert_statuses = certificate_statuses_for_students(students, course_key)
+                students_to_certify = []
+                for student in students:
+                    cert_status = cert_statuses[student.id]
+                    LOGGER.info(
+                        (
+                            u"Student %s has certificate status '%s' "
+                            u"in course '%s'"
+                        ),
+                        student.id,
+                        cert_status,
+                        unicode(course_key)
+                    )
 
-                if cert_status in valid_statuses:
+                    if cert_status in valid_statuses:
 
-                    if not options['noop']:
-                        # Add the certificate request to the queue
-                        ret = xq.add_cert(student, course_key, course=course)
+                        if not options['noop']:
+                            students_to_certify.append(student)
 
-                        if ret == 'generating':
+                        else:
                             LOGGER.info(
                                 (
-                                    u"Added a certificate generation task to the XQueue "
-                                    u"for student %s in course '%s'. "
-                                    u"The new certificate status is '%s'."
+                                    u"Skipping certificate generation for "
+                                    u"student %s in course '%s' "
+                                    u"because the noop flag is set."
                                 ),
                                 student.id,
-                                unicode(course_key),
-                                ret
+                                unicode(course_key)
                             )
 
                     else:
                         LOGGER.info(
                             (
-                                u"Skipping certificate generation for "
-                                u"student %s in course '%s' "
-                                u"because the noop flag is set."
+                                u"Skipped student %s because "
+                                u"certificate status '%s' is not in %s"
                             ),
                             student.id,
-                            unicode(course_key)
+                            cert_status,
+                            unicode(valid_statuses)
                         )
 
-                else:
-                    LOGGER.info(
-                        (
-                            u"Skipped student %s because "
-                            u"certificate status '%s' is not in %s"
-                        ),
-                        student.id,
-                        cert_status,
-                        unicode(valid_statuses)
-                    )
+                if not students_to_certify:
+                    continue
+
+                # Add the certificate requests to the queue
+                new_statuses = xq.add_certs(course_key, students_to_certify, course=course)
+                for student in students_to_certify:
+                    ret = new_statuses[student.id]
+                    if ret == 'generating':
+                        LOGGER.info(
+                            (
+                                u"Added a certificate generation task to the XQueue "
+                                u"for student %s in course '%s'. "
+                                u"The new certificate status is '%s'."
+                            ),
+                            student.id,
+                            unicode(course_key),
+                            ret
+                        )
 
             LOGGER.info(
                 (
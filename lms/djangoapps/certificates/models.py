@@ -187,6 +187,23 @@ def certificate_status_for_student(student, course_id):
     return {'status': CertificateStatuses.unavailable, 'mode': GeneratedCertificate.MODES.honor}
 
 
+def certificate_statuses_for_students(students, course_id):
+    '''
+    Returns a dictionary from user id to the certificate status of each of the
+    given students in the course, as returned by certificate_status_for_student,
+    using a single query.
+    '''
+    statuses = dict(
+        GeneratedCertificate.objects.filter(
+            user__in=students, course_id=course_id
+        ).values_list('user_id', 'status')
+    )
+    return {
+        student.id: statuses.get(student.id, CertificateStatuses.unavailable)
+        for student in students
+    }
+
+
 class ExampleCertificateSet(TimeStampedModel):
     """A set of example certificates.
 
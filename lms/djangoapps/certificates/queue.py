@@ -8,6 +8,7 @@ from lxml.etree import XMLSyntaxError, ParserError  # pylint:disable=no-name-in-
 from django.test.client import RequestFactory
 from django.conf import settings
 from django.core.urlresolvers import reverse
+from django.db import transaction
 from requests.auth import HTTPBasicAuth
 
 from courseware import grades
@@ -66,6 +67,10 @@ class XQueueCertInterface(object):
                    view which will save the certificate
                    download URL.
 
+       add_certs:  Add new certificates for a group of
+                   students in a course, looking up and
+                   grading all of them at once.
+
        regen_cert: Regenerate an existing certificate.
                    For a user that already has a certificate
                    this will delete the existing one and
@@ -78,6 +83,15 @@ class XQueueCertInterface(object):
 
     """
 
+    # Certificates can only be (re-)generated from these states
+    VALID_STATUSES_FOR_GENERATION = [
+        status.generating,
+        status.unavailable,
+        status.deleted,
+        status.error,
+        status.notpassing
+    ]
+
     def __init__(self, request=None):
 
         # Get basic auth (username/password) for
@@ -201,18 +215,10 @@ class XQueueCertInterface(object):
         Returns the student's status
         """
 
-        valid_statuses = [
-            status.generating,
-            status.unavailable,
-            status.deleted,
-            status.error,
-            status.notpassing
-        ]
-
         cert_status = certificate_status_for_student(student, course_id)['status']
         new_status = cert_status
 
-        if cert_status not in valid_statuses:
+        if cert_status not in self.VALID_STATUSES_FOR_GENERATION:
             LOGGER.warning(
                 (
                     u"Cannot create certificate generation task for user %s "
@@ -222,7 +228,7 @@ class XQueueCertInterface(object):
                 student.id,
                 unicode(course_id),
                 cert_status,
-                unicode(valid_statuses)
+                unicode(self.VALID_STATUSES_FOR_GENERATION)
             )
         else:
             # grade the student
@@ -232,149 +238,307 @@ class XQueueCertInterface(object):
             if course is None:
                 course = modulestore().get_course(course_id, depth=0)
             profile = UserProfile.objects.get(user=student)
-            profile_name = profile.name
 
             # Needed
             self.request.user = student
             self.request.session = {}
 
-            course_name = course.display_name or unicode(course_id)
             is_whitelisted = self.whitelist.filter(user=student, course_id=course_id, whitelist=True).exists()
             grade = grades.grade(student, self.request, course)
             enrollment_mode, __ = CourseEnrollment.enrollment_mode_for_user(student, course_id)
-            mode_is_verified = (enrollment_mode == GeneratedCertificate.MODES.verified)
             user_is_verified = SoftwareSecurePhotoVerification.user_is_verified(student)
             user_is_reverified = SoftwareSecurePhotoVerification.user_is_reverified_for_all(course_id, student)
-            cert_mode = enrollment_mode
-            if (mode_is_verified and user_is_verified and user_is_reverified):
-                template_pdf = "certificate-template-{id.org}-{id.course}-verified.pdf".format(id=course_id)
-            elif (mode_is_verified and not (user_is_verified and user_is_reverified)):
-                template_pdf = "certificate-template-{id.org}-{id.course}.pdf".format(id=course_id)
-                cert_mode = GeneratedCertificate.MODES.honor
-            else:
-                # honor code and audit students
-                template_pdf = "certificate-template-{id.org}-{id.course}.pdf".format(id=course_id)
-            if forced_grade:
-                grade['grade'] = forced_grade
 
             cert, __ = GeneratedCertificate.objects.get_or_create(user=student, course_id=course_id)
+            new_status, task = self._update_cert(
+                cert,
+                student,
+                course_id,
+                course,
+                grade,
+                profile_name=profile.name,
+                enrollment_mode=enrollment_mode,
+                is_whitelisted=is_whitelisted,
+                is_restricted=self.restricted.filter(user=student).exists(),
+                user_is_verified=(user_is_verified and user_is_reverified),
+                forced_grade=forced_grade,
+                template_file=template_file,
+            )
+            if task is not None:
+                new_status = self._queue_cert_task(cert, *task)
 
-            cert.mode = cert_mode
-            cert.user = student
-            cert.grade = grade['percent']
-            cert.course_id = course_id
-            cert.name = profile_name
-            # Strip HTML from grade range label
-            grade_contents = grade.get('grade', None)
-            try:
-                grade_contents = lxml.html.fromstring(grade_contents).text_content()
-            except (TypeError, XMLSyntaxError, ParserError) as exc:
-                LOGGER.info(
+        return new_status
+
+    def add_certs(self, course_id, students, course=None, forced_grade=None, template_file=None):
+        """
+        Request new certificates for a group of students in a course.
+
+        This is the batch equivalent of calling add_cert for each student: the
+        whitelist, certificates, profiles, enrollment modes and verification
+        statuses of all the students are looked up at once, the students are
+        graded with grades.iterate_grades_for, and their certificates are saved
+        in a single transaction before the generation tasks are sent to the
+        XQueue over the interface's persistent session.
+
+        Students who could not be graded keep their current certificate status.
+
+        Arguments:
+          course_id - courseenrollment.course_id (CourseKey)
+          students - list of User.objects, enrolled in the course
+
+        Returns a dictionary from user id to the student's status
+        """
+        if course is None:
+            course = modulestore().get_course(course_id, depth=0)
+
+        student_ids = [student.id for student in students]
+        certs = {
+            cert.user_id: cert
+            for cert in GeneratedCertificate.objects.filter(user__in=student_ids, course_id=course_id)
+        }
+        new_statuses = {
+            student.id: certs[student.id].status if student.id in certs else status.unavailable
+            for student in students
+        }
+
+        students_to_grade = []
+        for student in students:
+            if new_statuses[student.id] in self.VALID_STATUSES_FOR_GENERATION:
+                students_to_grade.append(student)
+            else:
+                LOGGER.warning(
                     (
-                        u"Could not retrieve grade for student %s "
-                        u"in the course '%s' "
-                        u"because an exception occurred while parsing the "
-                        u"grade contents '%s' as HTML. "
-                        u"The exception was: '%s'"
+                        u"Cannot create certificate generation task for user %s "
+                        u"in the course '%s'; "
+                        u"the certificate status '%s' is not one of %s."
                     ),
                     student.id,
                     unicode(course_id),
-                    grade_contents,
-                    unicode(exc)
+                    new_statuses[student.id],
+                    unicode(self.VALID_STATUSES_FOR_GENERATION)
                 )
+        if not students_to_grade:
+            return new_statuses
+
+        student_ids = [student.id for student in students_to_grade]
+        profile_names = dict(UserProfile.objects.filter(user__in=student_ids).values_list('user_id', 'name'))
+        whitelisted = set(
+            self.whitelist.filter(user__in=student_ids, course_id=course_id, whitelist=True).values_list(
+                'user_id', flat=True
+            )
+        )
+        restricted = set(self.restricted.filter(user__in=student_ids).values_list('user_id', flat=True))
+        enrollment_modes = dict(
+            CourseEnrollment.objects.filter(user__in=student_ids, course_id=course_id).values_list('user_id', 'mode')
+        )
+        verified = (
+            SoftwareSecurePhotoVerification.verified_user_ids(student_ids) &
+            SoftwareSecurePhotoVerification.reverified_for_all_user_ids(course_id, student_ids)
+        )
 
-                #   Despite blowing up the xml parser, bad values here are fine
-                grade_contents = None
-
-            if is_whitelisted or grade_contents is not None:
-
-                if is_whitelisted:
-                    LOGGER.info(
-                        u"Student %s is whitelisted in '%s'",
-                        student.id,
-                        unicode(course_id)
-                    )
-
-                # check to see whether the student is on the
-                # the embargoed country restricted list
-                # otherwise, put a new certificate request
-                # on the queue
-
-                if self.restricted.filter(user=student).exists():
-                    new_status = status.restricted
-                    cert.status = new_status
-                    cert.save()
-
-                    LOGGER.info(
-                        (
-                            u"Student %s is in the embargoed country restricted "
-                            u"list, so their certificate status has been set to '%s' "
-                            u"for the course '%s'. "
-                            u"No certificate generation task was sent to the XQueue."
-                        ),
-                        student.id,
-                        new_status,
-                        unicode(course_id)
-                    )
-                else:
-                    key = make_hashkey(random.random())
-                    cert.key = key
-                    contents = {
-                        'action': 'create',
-                        'username': student.username,
-                        'course_id': unicode(course_id),
-                        'course_name': course_name,
-                        'name': profile_name,
-                        'grade': grade_contents,
-                        'template_pdf': template_pdf,
-                    }
-                    if template_file:
-                        contents['template_pdf'] = template_file
-                    new_status = status.generating
-                    cert.status = new_status
-                    cert.save()
-
-                    try:
-                        self._send_to_xqueue(contents, key)
-                    except XQueueAddToQueueError as exc:
-                        new_status = ExampleCertificate.STATUS_ERROR
-                        cert.status = new_status
-                        cert.error_reason = unicode(exc)
-                        cert.save()
-                        LOGGER.critical(
-                            (
-                                u"Could not add certificate task to XQueue.  "
-                                u"The course was '%s' and the student was '%s'."
-                                u"The certificate task status has been marked as 'error' "
-                                u"and can be re-submitted with a management command."
-                            ), student.id, course_id
-                        )
-                    else:
-                        LOGGER.info(
-                            (
-                                u"The certificate status has been set to '%s'.  "
-                                u"Sent a certificate grading task to the XQueue "
-                                u"with the key '%s'. "
-                            ),
-                            key,
-                            new_status
-                        )
+        # Grading manages its own transactions, so all the students are graded
+        # before any certificate is saved.
+        student_grades = []
+        for student, grade, err_msg in grades.iterate_grades_for(course, students_to_grade):
+            if err_msg:
+                LOGGER.error(
+                    (
+                        u"Could not grade student %s in the course '%s', "
+                        u"so no certificate generation task was created. "
+                        u"The error was: '%s'"
+                    ),
+                    student.id,
+                    unicode(course_id),
+                    err_msg
+                )
             else:
-                new_status = status.notpassing
+                student_grades.append((student, grade))
+
+        tasks = []
+        with transaction.commit_on_success():
+            for student, grade in student_grades:
+                cert = certs.get(student.id) or GeneratedCertificate(user=student, course_id=course_id)
+                new_statuses[student.id], task = self._update_cert(
+                    cert,
+                    student,
+                    course_id,
+                    course,
+                    grade,
+                    profile_name=profile_names.get(student.id, u''),
+                    enrollment_mode=enrollment_modes.get(student.id),
+                    is_whitelisted=(student.id in whitelisted),
+                    is_restricted=(student.id in restricted),
+                    user_is_verified=(student.id in verified),
+                    forced_grade=forced_grade,
+                    template_file=template_file,
+                )
+                if task is not None:
+                    tasks.append((cert, task))
+
+        # The tasks are only sent once the certificates, and their keys, are
+        # saved, since XQueue may call back as soon as a task is received.
+        for cert, task in tasks:
+            new_statuses[cert.user_id] = self._queue_cert_task(cert, *task)
+
+        return new_statuses
+
+    def _update_cert(self, cert, student, course_id, course, grade, profile_name, enrollment_mode, is_whitelisted,
+                     is_restricted, user_is_verified, forced_grade=None, template_file=None):
+        """
+        Updates and saves the certificate of a graded student.
+
+        Arguments:
+          user_is_verified - whether the student is verified and reverified for
+                             all windows of the course
+
+        If a generation task should be sent to the XQueue, the certificate is
+        saved in the 'generating' state, and the task is returned for
+        _queue_cert_task.
+
+        Returns a tuple (new_status, task), where task is None if no task should
+        be sent.
+        """
+        course_name = course.display_name or unicode(course_id)
+        mode_is_verified = (enrollment_mode == GeneratedCertificate.MODES.verified)
+        cert_mode = enrollment_mode
+        if mode_is_verified and user_is_verified:
+            template_pdf = "certificate-template-{id.org}-{id.course}-verified.pdf".format(id=course_id)
+        elif mode_is_verified and not user_is_verified:
+            template_pdf = "certificate-template-{id.org}-{id.course}.pdf".format(id=course_id)
+            cert_mode = GeneratedCertificate.MODES.honor
+        else:
+            # honor code and audit students
+            template_pdf = "certificate-template-{id.org}-{id.course}.pdf".format(id=course_id)
+        if forced_grade:
+            grade['grade'] = forced_grade
+
+        cert.mode = cert_mode
+        cert.user = student
+        cert.grade = grade['percent']
+        cert.course_id = course_id
+        cert.name = profile_name
+        # Strip HTML from grade range label
+        grade_contents = grade.get('grade', None)
+        try:
+            grade_contents = lxml.html.fromstring(grade_contents).text_content()
+        except (TypeError, XMLSyntaxError, ParserError) as exc:
+            LOGGER.info(
+                (
+                    u"Could not retrieve grade for student %s "
+                    u"in the course '%s' "
+                    u"because an exception occurred while parsing the "
+                    u"grade contents '%s' as HTML. "
+                    u"The exception was: '%s'"
+                ),
+                student.id,
+                unicode(course_id),
+                grade_contents,
+                unicode(exc)
+            )
+
+            #   Despite blowing up the xml parser, bad values here are fine
+            grade_contents = None
+
+        task = None
+        if is_whitelisted or grade_contents is not None:
+
+            if is_whitelisted:
+                LOGGER.info(
+                    u"Student %s is whitelisted in '%s'",
+                    student.id,
+                    unicode(course_id)
+                )
+
+            # check to see whether the student is on the
+            # the embargoed country restricted list
+            # otherwise, put a new certificate request
+            # on the queue
+
+            if is_restricted:
+                new_status = status.restricted
                 cert.status = new_status
                 cert.save()
 
                 LOGGER.info(
                     (
-                        u"Student %s does not have a grade for '%s', "
-                        u"so their certificate status has been set to '%s'. "
+                        u"Student %s is in the embargoed country restricted "
+                        u"list, so their certificate status has been set to '%s' "
+                        u"for the course '%s'. "
                         u"No certificate generation task was sent to the XQueue."
                     ),
                     student.id,
-                    unicode(course_id),
-                    new_status
+                    new_status,
+                    unicode(course_id)
                 )
+            else:
+                key = make_hashkey(random.random())
+                cert.key = key
+                contents = {
+                    'action': 'create',
+                    'username': student.username,
+                    'course_id': unicode(course_id),
+                    'course_name': course_name,
+                    'name': profile_name,
+                    'grade': grade_contents,
+                    'template_pdf': template_pdf,
+                }
+                if template_file:
+                    contents['template_pdf'] = template_file
+                new_status = status.generating
+                cert.status = new_status
+                cert.save()
+                task = (contents, key)
+        else:
+            new_status = status.notpassing
+            cert.status = new_status
+            cert.save()
 
+            LOGGER.info(
+                (
+                    u"Student %s does not have a grade for '%s', "
+                    u"so their certificate status has been set to '%s'. "
+                    u"No certificate generation task was sent to the XQueue."
+                ),
+                student.id,
+                unicode(course_id),
+                new_status
+            )
+
+        return new_status, task
+
+    def _queue_cert_task(self, cert, contents, key):
+        """
+        Sends a certificate generation task, as returned by _update_cert, to the
+        XQueue. If the task cannot be added, the certificate is marked as 'error'.
+
+        Returns the new status of the certificate
+        """
+        try:
+            self._send_to_xqueue(contents, key)
+        except XQueueAddToQueueError as exc:
+            new_status = ExampleCertificate.STATUS_ERROR
+            cert.status = new_status
+            cert.error_reason = unicode(exc)
+            cert.save()
+            LOGGER.critical(
+                (
+                    u"Could not add certificate task to XQueue.  "
+                    u"The course was '%s' and the student was '%s'."
+                    u"The certificate task status has been marked as 'error' "
+                    u"and can be re-submitted with a management command."
+                ), cert.user_id, cert.course_id
+            )
+        else:
+            new_status = cert.status
+            LOGGER.info(
+                (
+                    u"The certificate status has been set to '%s'.  "
+                    u"Sent a certificate grading task to the XQueue "
+                    u"with the key '%s'. "
+                ),
+                key,
+                new_status
+            )
         return new_status
 
     def add_example_cert(self, example_cert):
@@ -21,7 +21,12 @@ from xmodule.modulestore.tests.factories import CourseFactory
 from capa.xqueue_interface import XQueueInterface
 
 from certificates.queue import XQueueCertInterface
-from certificates.models import ExampleCertificateSet, ExampleCertificate
+from certificates.models import (
+    ExampleCertificateSet,
+    ExampleCertificate,
+    GeneratedCertificate,
+    CertificateStatuses,
+)
 
 
 @override_settings(CERT_QUEUE='certificates')
@@ -52,6 +57,46 @@ class XQueueCertInterfaceAddCertificateTest(ModuleStoreTestCase):
         actual_header = json.loads(kwargs['header'])
         self.assertIn('https://edx.org/update_certificate?key=', actual_header['lms_callback_url'])
 
+    def test_add_certs(self):
+        other_user = UserFactory.create()
+        CourseEnrollmentFactory(user=other_user, course_id=self.course.id, is_active=True, mode="verified")
+        downloadable_user = UserFactory.create()
+        CourseEnrollmentFactory(user=downloadable_user, course_id=self.course.id, is_active=True, mode="honor")
+        GeneratedCertificate.objects.create(
+            user=downloadable_user, course_id=self.course.id, status=CertificateStatuses.downloadable
+        )
+        students = [self.user, other_user, downloadable_user]
+
+        with patch('courseware.grades.grade', Mock(return_value={'grade': 'Pass', 'percent': 0.75})) as mock_grade:
+            with patch.object(XQueueInterface, 'send_to_queue') as mock_send:
+                mock_send.return_value = (0, None)
+                new_statuses = self.xqueue.add_certs(self.course.id, students)
+
+        self.assertEqual(new_statuses, {
+            self.user.id: CertificateStatuses.generating,
+            other_user.id: CertificateStatuses.generating,
+            downloadable_user.id: CertificateStatuses.downloadable,
+        })
+
+        # Students with a downloadable certificate are neither graded nor queued
+        self.assertEqual(mock_grade.call_count, 2)
+        self.assertEqual(mock_send.call_count, 2)
+
+        # The unverified student in the verified track receives an honor certificate
+        cert = GeneratedCertificate.objects.get(user=other_user, course_id=self.course.id)
+        self.assertEqual(cert.mode, GeneratedCertificate.MODES.honor)
+        self.assertEqual(cert.grade, '0.75')
+        self.assertNotEqual(cert.key, '')
+        self.assertEqual(GeneratedCertificate.objects.get(user=self.user, course_id=self.course.id).mode, 'honor')
+
+    def test_add_certs_not_passing(self):
+        with patch('courseware.grades.grade', Mock(return_value={'grade': None, 'percent': 0.25})):
+            with patch.object(XQueueInterface, 'send_to_queue') as mock_send:
+                new_statuses = self.xqueue.add_certs(self.course.id, [self.user])
+
+        self.assertEqual(new_statuses, {self.user.id: CertificateStatuses.notpassing})
+        self.assertFalse(mock_send.called)
+
 
 @override_settings(CERT_QUEUE='certificates')
 class XQueueCertInterfaceExampleCertificateTest(TestCase):
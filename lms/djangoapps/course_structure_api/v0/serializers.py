@@ -4,10 +4,11 @@ from django.core.urlresolvers import reverse
 from rest_framework import serializers
 
 from courseware.courses import course_image_url
+from openedx.core.djangoapps.content.course_overviews.models import CourseOverview
 
 
 class CourseSerializer(serializers.Serializer):
-    """ Serializer for Courses """
+    """ Serializer for Courses. Accepts either CourseDescriptors or CourseOverviews. """
     id = serializers.CharField()  # pylint: disable=invalid-name
     name = serializers.CharField(source='display_name')
     category = serializers.CharField()
@@ -39,6 +40,8 @@ class CourseSerializer(serializers.Serializer):
 
     def get_image_url(self, course):
         """ Get the course image URL """
+        if isinstance(course, CourseOverview):
+            return course.course_image_url
         return course_image_url(course)
 
 
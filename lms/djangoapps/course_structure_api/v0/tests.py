@@ -18,6 +18,9 @@ from xmodule.modulestore.xml import CourseLocationManager
 from xmodule.tests import get_test_system
 
 from courseware.tests.factories import GlobalStaffFactory, StaffFactory
+from student.roles import OrgStaffRole
+from student.tests.factories import UserFactory
+from openedx.core.djangoapps.content.course_overviews.models import CourseOverview
 from openedx.core.djangoapps.content.course_structures.models import CourseStructure
 from openedx.core.djangoapps.content.course_structures.tasks import update_course_structure
 
@@ -190,6 +193,13 @@ class CourseDetailMixin(object):
 class CourseListTests(CourseViewTestsMixin, ModuleStoreTestCase):
     view = 'course_structure_api:v0:list'
 
+    def create_test_data(self):
+        super(CourseListTests, self).create_test_data()
+
+        # The list is served from the course overview table, which is normally populated on publish.
+        for course in (self.course, self.empty_course):
+            CourseOverview.create_or_update_from_course(course)
+
     def test_get(self):
         """
         The view should return a list of all courses.
@@ -287,6 +297,36 @@ class CourseListTests(CourseViewTestsMixin, ModuleStoreTestCase):
         with patch('xmodule.modulestore.mixed.MixedModuleStore.get_courses', Mock(return_value=descriptors)):
             self.test_get()
 
+    def test_get_without_stored_overview(self):
+        """
+        Courses requested by id that have no stored overview yet should be loaded from the modulestore.
+        """
+        CourseOverview.objects.all().delete()
+
+        url = "{}?course_id={}".format(reverse(self.view), self.course_id)
+        response = self.http_get(url)
+        self.assertEqual(response.status_code, 200)
+
+        courses = response.data['results']
+        self.assertEqual(len(courses), 1)
+        self.assertValidResponseCourse(courses[0], self.course)
+        self.assertTrue(CourseOverview.objects.filter(course_id=self.course.id).exists())
+
+    def test_org_staff(self):
+        """
+        Org-wide staff should see every course in their org, and only those courses.
+        """
+        user = UserFactory.create()
+        OrgStaffRole(self.empty_course.id.org).add_users(user)
+        access_token = AccessTokenFactory.create(user=user, client=self.oauth_client).token
+
+        response = self.http_get(reverse(self.view), HTTP_AUTHORIZATION='Bearer ' + access_token)
+        self.assertEqual(response.status_code, 200)
+
+        courses = response.data['results']
+        self.assertEqual(len(courses), 1)
+        self.assertValidResponseCourse(courses[0], self.empty_course)
+
 
 class CourseDetailTests(CourseDetailMixin, CourseViewTestsMixin, ModuleStoreTestCase):
     view = 'course_structure_api:v0:detail'
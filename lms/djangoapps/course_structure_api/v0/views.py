@@ -3,21 +3,23 @@
 import logging
 
 from django.conf import settings
+from django.db.models import Q
 from django.http import Http404
 from rest_framework.authentication import OAuth2Authentication, SessionAuthentication
 from rest_framework.exceptions import PermissionDenied, AuthenticationFailed
 from rest_framework.generics import RetrieveAPIView, ListAPIView
 from rest_framework.response import Response
-from xmodule.modulestore.django import modulestore
 from opaque_keys.edx.keys import CourseKey
 
 from course_structure_api.v0 import serializers
 from courseware import courses
 from courseware.access import has_access
+from openedx.core.djangoapps.content.course_overviews.models import CourseOverview
 from openedx.core.djangoapps.content.course_structures import models, tasks
 from openedx.core.lib.api.permissions import IsAuthenticatedOrDebug
 from openedx.core.lib.api.serializers import PaginationSerializer
-from student.roles import CourseInstructorRole, CourseStaffRole
+from student.models import CourseAccessRole
+from student.roles import CourseInstructorRole, CourseStaffRole, GlobalStaff
 
 
 log = logging.getLogger(__name__)
@@ -132,24 +134,36 @@ class CourseList(CourseViewMixin, ListAPIView):
     def get_queryset(self):
         course_ids = self.request.QUERY_PARAMS.get('course_id', None)
 
-        results = []
         if course_ids:
-            course_ids = course_ids.split(',')
-            for course_id in course_ids:
-                course_key = CourseKey.from_string(course_id)
-                course_descriptor = courses.get_course(course_key)
-                results.append(course_descriptor)
+            course_keys = [CourseKey.from_string(course_id) for course_id in course_ids.split(',')]
+            queryset = CourseOverview.get_from_ids(course_keys)
         else:
-            results = modulestore().get_courses()
+            queryset = CourseOverview.objects.all()
 
-        # Ensure only course descriptors are returned.
-        results = (course for course in results if course.scope_ids.block_type == 'course')
+        # Ensure only courses accessible by the user are returned, and sort the results in a predictable manner.
+        return self.filter_accessible_courses(self.request.user, queryset).order_by('course_id')
 
-        # Ensure only courses accessible by the user are returned.
-        results = (course for course in results if self.user_can_access_course(self.request.user, course))
+    def filter_accessible_courses(self, user, queryset):
+        """
+        Restricts the given CourseOverview queryset to the courses for which the user is staff or an instructor.
+
+        This mirrors user_can_access_course, but is evaluated by the database so that the list does not require
+        loading every course.
+        """
+        if settings.DEBUG or GlobalStaff().has_user(user):
+            return queryset
+
+        if not user.is_active:
+            return queryset.none()
+
+        roles = CourseAccessRole.objects.filter(
+            user=user, role__in=(CourseStaffRole.ROLE, CourseInstructorRole.ROLE)
+        )
+        course_keys = [role.course_id for role in roles if role.course_id]
+        # Roles without a course_id apply to every course in the org.
+        orgs = [role.org for role in roles if not role.course_id and role.org]
 
-        # Sort the results in a predictable manner.
-        return sorted(results, key=lambda course: unicode(course.id))
+        return queryset.filter(Q(course_id__in=course_keys) | Q(org__in=orgs))
 
 
 class CourseDetail(CourseViewMixin, RetrieveAPIView):
@@ -4,6 +4,7 @@ Ideally, it will be the only place that needs to know about any special settings
 like DISABLE_START_DATES
 """
 import logging
+from collections import namedtuple
 from datetime import datetime, timedelta
 import pytz
 
@@ -19,12 +20,14 @@ from xmodule.course_module import (
     CourseDescriptor, CATALOG_VISIBILITY_CATALOG_AND_ABOUT,
     CATALOG_VISIBILITY_ABOUT)
 from xmodule.error_module import ErrorDescriptor
+from xmodule.modulestore.django import modulestore
 from xmodule.x_module import XModule, DEPRECATION_VSCOMPAT_EVENT
 from xmodule.split_test_module import get_split_user_partitions
-from xmodule.partitions.partitions import NoSuchUserPartitionError, NoSuchUserPartitionGroupError
+from xmodule.partitions.partitions import NoSuchUserPartitionGroupError
 
 from external_auth.models import ExternalAuthMap
 from courseware.masquerade import get_masquerade_role, is_masquerading_as_student
+from openedx.core.djangoapps.content.course_overviews.models import CourseOverview
 from student import auth
 from student.models import CourseEnrollment, CourseEnrollmentAllowed
 from student.roles import (
@@ -37,6 +40,9 @@ import dogstats_wrapper as dog_stats_api
 
 DEBUG_ACCESS = False
 
+# The settings of a block that the 'load' rule checks; see get_access_fields.
+AccessFields = namedtuple('AccessFields', 'visible_to_staff_only group_access start days_early_for_beta')
+
 log = logging.getLogger(__name__)
 
 
@@ -61,7 +67,7 @@ def has_access(user, action, obj, course_key=None):
     user: a Django user object. May be anonymous. If none is passed,
                     anonymous is assumed
 
-    obj: The object to check access for.  A module, descriptor, location, or
+    obj: The object to check access for.  A module, descriptor, CourseOverview, location, or
                     certain special strings (e.g. 'global')
 
     action: A string specifying the action that the client is trying to perform.
@@ -85,6 +91,9 @@ def has_access(user, action, obj, course_key=None):
     if isinstance(obj, CourseDescriptor):
         return _has_access_course_desc(user, action, obj)
 
+    if isinstance(obj, CourseOverview):
+        return _has_access_course_desc(user, action, obj)
+
     if isinstance(obj, ErrorDescriptor):
         return _has_access_error_desc(user, action, obj, course_key)
 
@@ -113,7 +122,7 @@ def has_access(user, action, obj, course_key=None):
 # ================ Implementation helpers ================================
 def _has_access_course_desc(user, action, course):
     """
-    Check if user has access to a course descriptor.
+    Check if user has access to a course descriptor, or to the course summarized by a CourseOverview.
 
     Valid actions:
 
@@ -134,6 +143,9 @@ def _has_access_course_desc(user, action, course):
 
         NOTE: this is not checking whether user is actually enrolled in the course.
         """
+        if isinstance(course, CourseOverview):
+            return _can_load_course_overview(user, course)
+
         # delegate to generic descriptor check to check start dates
         return _has_access_descriptor(user, 'load', course, course.id)
 
@@ -310,6 +322,21 @@ def _has_access_course_desc(user, action, course):
     return _dispatch(checkers, action, user, course)
 
 
+def _can_load_course_overview(user, course):
+    """
+    Can this user load the course summarized by the given CourseOverview?
+
+    Applies the same 'load' rule as _has_access_descriptor, to the access fields stored with the overview. The user
+    partitions which course-level group_access refers to are not summarized, so courses restricting access by group
+    are checked against their descriptor.
+    """
+    if course.group_access:
+        return _has_access_descriptor(user, 'load', modulestore().get_course(course.id, depth=0), course.id)
+    return can_load_with_access_fields(
+        user, course, course.id, [], lambda: _has_staff_access_to_descriptor(user, course, course.id)
+    )
+
+
 def _has_access_error_desc(user, action, descriptor, course_key):
     """
     Only staff should see error descriptors.
@@ -330,38 +357,103 @@ def _has_access_error_desc(user, action, descriptor, course_key):
     return _dispatch(checkers, action, user, descriptor)
 
 
-def _has_group_access(descriptor, user, course_key):
+def get_access_fields(descriptor):
     """
-    This function returns a boolean indicating whether or not `user` has
-    sufficient group memberships to "load" a block (the `descriptor`)
+    Returns the AccessFields of the descriptor: the settings that the 'load' rule checks, as
+    can_load_with_access_fields takes them. Callers may store them in place of the descriptor.
     """
     if len(descriptor.user_partitions) == len(get_split_user_partitions(descriptor.user_partitions)):
-        # Short-circuit the process, since there are no defined user partitions that are not
-        # user_partitions used by the split_test module. The split_test module handles its own access
-        # via updating the children of the split_test module.
+        # There are no defined user partitions that are not user_partitions used by the split_test module, which
+        # handles its own access via updating the children of the split_test module.
+        group_access = {}
+    else:
+        # merged_group_access takes group access on the block's parents / ancestors into account
+        group_access = descriptor.merged_group_access
+
+    return AccessFields(
+        visible_to_staff_only=descriptor.visible_to_staff_only,
+        group_access=group_access,
+        start=descriptor.start if 'detached' not in descriptor._class_tags else None,  # pylint: disable=protected-access
+        days_early_for_beta=descriptor.days_early_for_beta,
+    )
+
+
+def can_load_with_access_fields(user, access_fields, course_key, user_partitions, has_staff_access, user_groups=None):
+    """
+    The 'load' rule for a block, given its AccessFields (see get_access_fields) rather than the block itself.
+
+    NOTE: This does not check that the student is enrolled in the course
+    that contains this module.  We may or may not want to allow non-enrolled
+    students to see modules.  If not, views should check the course, so we
+    don't have to hit the enrollments table on every module load.
+
+    Arguments:
+        access_fields: the AccessFields of the block, or any object with the same attributes
+        user_partitions: the user partitions of the course, which group_access refers to
+        has_staff_access: a function returning whether the user has staff access to the block, only called if needed
+        user_groups: an optional dict in which the user's group in each partition is kept, for callers checking
+            many blocks for the same user
+    """
+    if access_fields.visible_to_staff_only and not has_staff_access():
+        return False
+
+    # enforce group access
+    if not _has_group_access(access_fields.group_access, user_partitions, user, course_key, user_groups):
+        # if group_access check failed, deny access unless the requestor is staff,
+        # in which case immediately grant access.
+        return has_staff_access()
+
+    # If start dates are off, can always load
+    if settings.FEATURES['DISABLE_START_DATES'] and not is_masquerading_as_student(user, course_key):
+        debug("Allow: DISABLE_START_DATES")
+        return True
+
+    # Check start date
+    if access_fields.start is not None:
+        now = datetime.now(UTC())
+        effective_start = _adjust_start_date_for_beta_testers(
+            user,
+            access_fields,
+            course_key=course_key
+        )
+        if now > effective_start:
+            # after start date, everyone can see it
+            debug("Allow: now > effective start date")
+            return True
+        # otherwise, need staff access
+        return has_staff_access()
+
+    # No start date, so can always load.
+    debug("Allow: no start date")
+    return True
+
+
+def _has_group_access(group_access, user_partitions, user, course_key, user_groups=None):
+    """
+    This function returns a boolean indicating whether or not `user` has
+    sufficient group memberships to "load" a block with the given (merged) `group_access`
+    """
+    if not group_access:
         return True
 
-    # use merged_group_access which takes group access on the block's
-    # parents / ancestors into account
-    merged_access = descriptor.merged_group_access
-    # check for False in merged_access, which indicates that at least one
+    # check for False in group_access, which indicates that at least one
     # partition's group list excludes all students.
-    if False in merged_access.values():
+    if False in group_access.values():
         log.warning("Group access check excludes all students, access will be denied.", exc_info=True)
         return False
 
     # resolve the partition IDs in group_access to actual
     # partition objects, skipping those which contain empty group directives.
     # if a referenced partition could not be found, access will be denied.
-    try:
-        partitions = [
-            descriptor._get_user_partition(partition_id)  # pylint:disable=protected-access
-            for partition_id, group_ids in merged_access.items()
-            if group_ids is not None
-        ]
-    except NoSuchUserPartitionError:
-        log.warning("Error looking up user partition, access will be denied.", exc_info=True)
-        return False
+    partitions_by_id = {partition.id: partition for partition in user_partitions}
+    partitions = []
+    for partition_id, group_ids in group_access.items():
+        if group_ids is None:
+            continue
+        if partition_id not in partitions_by_id:
+            log.warning("Error looking up user partition %s, access will be denied.", partition_id)
+            return False
+        partitions.append(partitions_by_id[partition_id])
 
     # next resolve the group IDs specified within each partition
     partition_groups = []
@@ -369,7 +461,7 @@ def _has_group_access(descriptor, user, course_key):
         for partition in partitions:
             groups = [
                 partition.get_group(group_id)
-                for group_id in merged_access[partition.id]
+                for group_id in group_access[partition.id]
             ]
             if groups:
                 partition_groups.append((partition, groups))
@@ -378,13 +470,15 @@ def _has_group_access(descriptor, user, course_key):
         return False
 
     # look up the user's group for each partition
-    user_groups = {}
+    if user_groups is None:
+        user_groups = {}
     for partition, groups in partition_groups:
-        user_groups[partition.id] = partition.scheme.get_group_for_user(
-            course_key,
-            user,
-            partition,
-        )
+        if partition.id not in user_groups:
+            user_groups[partition.id] = partition.scheme.get_group_for_user(
+                course_key,
+                user,
+                partition,
+            )
 
     # finally: check that the user has a satisfactory group assignment
     # for each partition.
@@ -410,42 +504,12 @@ def _has_access_descriptor(user, action, descriptor, course_key=None):
     def can_load():
         """
         NOTE: This does not check that the student is enrolled in the course
-        that contains this module.  We may or may not want to allow non-enrolled
-        students to see modules.  If not, views should check the course, so we
-        don't have to hit the enrollments table on every module load.
+        that contains this module; see can_load_with_access_fields.
         """
-        if descriptor.visible_to_staff_only and not _has_staff_access_to_descriptor(user, descriptor, course_key):
-            return False
-
-        # enforce group access
-        if not _has_group_access(descriptor, user, course_key):
-            # if group_access check failed, deny access unless the requestor is staff,
-            # in which case immediately grant access.
-            return _has_staff_access_to_descriptor(user, descriptor, course_key)
-
-        # If start dates are off, can always load
-        if settings.FEATURES['DISABLE_START_DATES'] and not is_masquerading_as_student(user, course_key):
-            debug("Allow: DISABLE_START_DATES")
-            return True
-
-        # Check start date
-        if 'detached' not in descriptor._class_tags and descriptor.start is not None:
-            now = datetime.now(UTC())
-            effective_start = _adjust_start_date_for_beta_testers(
-                user,
-                descriptor,
-                course_key=course_key
-            )
-            if now > effective_start:
-                # after start date, everyone can see it
-                debug("Allow: now > effective start date")
-                return True
-            # otherwise, need staff access
-            return _has_staff_access_to_descriptor(user, descriptor, course_key)
-
-        # No start date, so can always load.
-        debug("Allow: no start date")
-        return True
+        return can_load_with_access_fields(
+            user, get_access_fields(descriptor), course_key, descriptor.user_partitions,
+            lambda: _has_staff_access_to_descriptor(user, descriptor, course_key)
+        )
 
     checkers = {
         'load': can_load,
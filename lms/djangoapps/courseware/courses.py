@@ -22,12 +22,18 @@ from courseware.access import has_access
 from courseware.model_data import FieldDataCache
 from courseware.module_render import get_module
 from student.models import CourseEnrollment
+from openedx.core.djangoapps.content.course_overviews.models import CourseOverview
+from request_cache.middleware import RequestCache
+from util.cache import cache, fragment_cache_key, FRAGMENT_CACHE_TIMEOUT
 import branding
 
 from opaque_keys.edx.keys import UsageKey
 
 log = logging.getLogger(__name__)
 
+# Replaced with the anonymous id of the user when html modules are rendered.
+USER_ID_PLACEHOLDER = '%%USER_ID%%'
+
 
 def get_request_for_thread():
     """Walk up the stack, return the nearest first argument named "request"."""
@@ -122,6 +128,8 @@ def get_opt_course_with_access(user, action, course_key):
 def course_image_url(course):
     """Try to look up the image url for the course.  If it's not found,
     log an error and return the dead link"""
+    if isinstance(course, CourseOverview):
+        return course.course_image_url
     if course.static_asset_path or modulestore().get_modulestore_type(course.id) == ModuleStoreEnum.Type.xml:
         # If we are a static course with the course_image attribute
         # set different than the default, return that path so that
@@ -194,42 +202,11 @@ def get_course_about_section(course, section_key):
                        'number', 'instructors', 'overview',
                        'effort', 'end_date', 'prerequisites', 'ocw_links']:
 
-        try:
-
-            request = get_request_for_thread()
-
-            loc = course.location.replace(category='about', name=section_key)
-
-            # Use an empty cache
-            field_data_cache = FieldDataCache([], course.id, request.user)
-            about_module = get_module(
-                request.user,
-                request,
-                loc,
-                field_data_cache,
-                log_if_not_found=False,
-                wrap_xmodule_display=False,
-                static_asset_path=course.static_asset_path
-            )
+        return _get_cached_section(
+            get_request_for_thread().user, course, 'about', section_key,
+            lambda: _render_course_about_section(course, section_key)
+        )
 
-            html = ''
-
-            if about_module is not None:
-                try:
-                    html = about_module.render(STUDENT_VIEW).content
-                except Exception:  # pylint: disable=broad-except
-                    html = render_to_string('courseware/error-message.html', None)
-                    log.exception(
-                        u"Error rendering course={course}, section_key={section_key}".format(
-                            course=course, section_key=section_key
-                        ))
-            return html
-
-        except ItemNotFoundError:
-            log.warning(
-                u"Missing about section {key} in course {url}".format(key=section_key, url=course.location.to_deprecated_string())
-            )
-            return None
     elif section_key == "title":
         return course.display_name_with_default
     elif section_key == "university":
@@ -240,6 +217,122 @@ def get_course_about_section(course, section_key):
     raise KeyError("Invalid about key " + str(section_key))
 
 
+def _render_course_about_section(course, section_key):
+    """
+    Renders the about section of the course with the given key.
+
+    Returns the html, or None if the course has no such section, and whether the html may be shared with other
+    users.
+    """
+    try:
+
+        request = get_request_for_thread()
+
+        loc = course.location.replace(category='about', name=section_key)
+
+        # Use an empty cache
+        field_data_cache = FieldDataCache([], course.id, request.user)
+        about_module = get_module(
+            request.user,
+            request,
+            loc,
+            field_data_cache,
+            log_if_not_found=False,
+            wrap_xmodule_display=False,
+            static_asset_path=course.static_asset_path
+        )
+
+        html = ''
+        cacheable = True
+
+        if about_module is not None:
+            # Sections personalized with the user's anonymous id must not be shared with other users.
+            cacheable = USER_ID_PLACEHOLDER not in getattr(about_module, 'data', '')
+            try:
+                html = about_module.render(STUDENT_VIEW).content
+            except Exception:  # pylint: disable=broad-except
+                html = render_to_string('courseware/error-message.html', None)
+                cacheable = False
+                log.exception(
+                    u"Error rendering course={course}, section_key={section_key}".format(
+                        course=course, section_key=section_key
+                    ))
+        return html, cacheable
+
+    except ItemNotFoundError:
+        log.warning(
+            u"Missing about section {key} in course {url}".format(key=section_key, url=course.location.to_deprecated_string())
+        )
+        return None, True
+
+
+def _get_cached_section(user, course, category, section_key, render):
+    """
+    Returns the html of the given about or info section of the course, as seen by the given user.
+
+    Sections are the same for every user, so they are cached for the published version of the course. On a cache
+    miss, render() is called; it returns the html and whether that html may be shared with other users.
+    """
+    version = _course_fragment_version(course)
+    if version is None or _renders_staff_markup(user, course):
+        return render()[0]
+
+    cache_key = fragment_cache_key(category, course.id, section_key, course.static_asset_path, version)
+    cached = cache.get(cache_key)  # pylint: disable=maybe-no-member
+    if cached is not None:
+        return cached[0]
+
+    html, cacheable = render()
+    if cacheable:
+        # Missing sections are cached too, so store the result in a list to tell them apart from cache misses.
+        cache.set(cache_key, [html], FRAGMENT_CACHE_TIMEOUT)  # pylint: disable=maybe-no-member
+    return html
+
+
+def _renders_staff_markup(user, course):
+    """
+    Whether modules of the course rendered for the user are wrapped with the Staff Debug markup, which must be
+    neither shared with other users nor replaced with the shared html.
+    """
+    return settings.FEATURES.get('DISPLAY_DEBUG_INFO_TO_STAFF') and has_access(user, 'staff', course)
+
+
+def _course_fragment_version(course):
+    """
+    Returns a token that changes whenever the given course is republished, for use in fragment cache keys.
+
+    The token is the modification time of the course's overview, which is updated on every publish. Returns None
+    for courses without a stored overview (e.g. XML courses), whose fragments are not cached.
+    """
+    if isinstance(course, CourseOverview):
+        return course.modified if course.pk else None
+
+    # About pages look up many sections, so remember the version for the rest of the request.
+    versions = RequestCache.get_request_cache().data.setdefault('course_fragment_versions', {})
+    if course.id not in versions:
+        modified = CourseOverview.objects.filter(course_id=course.id).values_list('modified', flat=True)
+        versions[course.id] = modified[0] if modified else None
+    return versions[course.id]
+
+
+def get_course_tile(course):
+    """
+    Returns the html of the course catalog tile of the given course (or CourseOverview).
+
+    Tiles are the same for every user, so they are cached for the published version of the course.
+    """
+    version = _course_fragment_version(course)
+    if version is None:
+        return render_to_string('course.html', {'course': course})
+
+    cache_key = fragment_cache_key('course_tile', course.id, version)
+    html = cache.get(cache_key)  # pylint: disable=maybe-no-member
+    if html is None:
+        html = render_to_string('course.html', {'course': course})
+        cache.set(cache_key, html, FRAGMENT_CACHE_TIMEOUT)  # pylint: disable=maybe-no-member
+    return html
+
+
 def get_course_info_section_module(request, course, section_key):
     """
     This returns the course info module for a given section_key.
@@ -277,20 +370,36 @@ def get_course_info_section(request, course, section_key):
     - updates
     - guest_updates
     """
+    return _get_cached_section(
+        request.user, course, 'course_info', section_key,
+        lambda: _render_course_info_section(request, course, section_key)
+    )
+
+
+def _render_course_info_section(request, course, section_key):
+    """
+    Renders the course info section with the given key.
+
+    Returns the html, and whether it may be shared with other users.
+    """
     info_module = get_course_info_section_module(request, course, section_key)
 
     html = ''
+    cacheable = True
     if info_module is not None:
+        # Sections personalized with the user's anonymous id must not be shared with other users.
+        cacheable = USER_ID_PLACEHOLDER not in getattr(info_module, 'data', '')
         try:
             html = info_module.render(STUDENT_VIEW).content
         except Exception:  # pylint: disable=broad-except
             html = render_to_string('courseware/error-message.html', None)
+            cacheable = False
             log.exception(
                 u"Error rendering course={course}, section_key={section_key}".format(
                     course=course, section_key=section_key
                 ))
 
-    return html
+    return html, cacheable
 
 
 # TODO: Fix this such that these are pulled in as extra course-specific tabs.
@@ -350,7 +459,7 @@ def get_courses_by_university(user, domain=None):
 
 def get_courses(user, domain=None):
     '''
-    Returns a list of courses available, sorted by course.number
+    Returns a list of the CourseOverviews of the courses available, sorted by course.number
     '''
     courses = branding.get_visible_courses()
 
@@ -108,17 +108,34 @@ class OverrideFieldData(FieldData):
     def delete(self, block, name):
         self.fallback.delete(block, name)
 
+    def get_inherited_override(self, block, name):
+        """
+        Checks for an override for the inheritable field identified by `name`
+        on the ancestors of `block`, nearest first.  Returns the overridden
+        value or `NOTSET` if no override is found.
+
+        The ancestors are only walked if a provider may override this field
+        somewhere in the course, which providers can usually tell from the
+        overrides they have already loaded.
+        """
+        if overrides_disabled() or name not in InheritanceMixin.fields:
+            return NOTSET
+        if not any(provider.overrides_field(block, name) for provider in self.providers):
+            return NOTSET
+        for ancestor in _lineage(block):
+            value = self.get_override(ancestor, name)
+            if value is not NOTSET:
+                return value
+        return NOTSET
+
     def has(self, block, name):
         has = self.get_override(block, name)
         if has is NOTSET:
             # If this is an inheritable field and an override is set above,
             # then we want to return False here, so the field_data uses the
             # override and not the original value for this block.
-            inheritable = InheritanceMixin.fields.keys()
-            if name in inheritable:
-                for ancestor in _lineage(block):
-                    if self.get_override(ancestor, name) is not NOTSET:
-                        return False
+            if self.get_inherited_override(block, name) is not NOTSET:
+                return False
 
         return has is not NOTSET or self.fallback.has(block, name)
 
@@ -128,13 +145,9 @@ class OverrideFieldData(FieldData):
     def default(self, block, name):
         # The `default` method is overloaded by the field storage system to
         # also handle inheritance.
-        if not overrides_disabled():
-            inheritable = InheritanceMixin.fields.keys()
-            if name in inheritable:
-                for ancestor in _lineage(block):
-                    value = self.get_override(ancestor, name)
-                    if value is not NOTSET:
-                        return value
+        value = self.get_inherited_override(block, name)
+        if value is not NOTSET:
+            return value
         return self.fallback.default(block, name)
 
 
@@ -192,6 +205,16 @@ class FieldOverrideProvider(object):
         """
         raise NotImplementedError
 
+    def overrides_field(self, block, name):  # pylint: disable=unused-argument
+        """
+        Returns whether this provider may override the field named `name` on
+        any block in the course of `block`.  `OverrideFieldData` uses this to
+        skip looking for inherited overrides on the ancestors of `block`.
+        Providers that cannot tell cheaply should keep this default, which
+        always returns True.
+        """
+        return True
+
 
 def _lineage(block):
     """
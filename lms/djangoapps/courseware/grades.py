@@ -13,8 +13,8 @@ from django.test.client import RequestFactory
 import dogstats_wrapper as dog_stats_api
 
 from courseware import courses
-from courseware.model_data import FieldDataCache
-from student.models import anonymous_id_for_user
+from courseware.model_data import FieldDataCache, chunks
+from student.models import anonymous_id_for_user, anonymous_ids_for_users
 from util.module_utils import yield_dynamic_descriptor_descendents
 from xmodule import graders
 from xmodule.graders import Score
@@ -29,6 +29,9 @@ from opaque_keys.edx.keys import CourseKey
 
 log = logging.getLogger("edx.courseware")
 
+# Number of students whose anonymous ids iterate_grades_for looks up at once.
+ANONYMOUS_ID_PREFETCH_SIZE = 1000
+
 
 def answer_distributions(course_key):
     """
@@ -512,25 +515,30 @@ def iterate_grades_for(course_or_id, students):
     # grading that student.
     request = RequestFactory().get('/')
 
-    for student in students:
-        with dog_stats_api.timer('lms.grades.iterate_grades_for', tags=[u'action:{}'.format(course.id)]):
-            try:
-                request.user = student
-                # Grading calls problem rendering, which calls masquerading,
-                # which checks session vars -- thus the empty session dict below.
-                # It's not pretty, but untangling that is currently beyond the
-                # scope of this feature.
-                request.session = {}
-                gradeset = grade(student, request, course)
-                yield student, gradeset, ""
-            except Exception as exc:  # pylint: disable=broad-except
-                # Keep marching on even if this student couldn't be graded for
-                # some reason, but log it for future reference.
-                log.exception(
-                    'Cannot grade student %s (%s) in course %s because of exception: %s',
-                    student.username,
-                    student.id,
-                    course.id,
-                    exc.message
-                )
-                yield student, {}, exc.message
+    for student_chunk in chunks(students, ANONYMOUS_ID_PREFETCH_SIZE):
+        # Grading looks up the anonymous id of each student, so they are
+        # fetched for the whole chunk at once.
+        anonymous_ids_for_users(student_chunk, course.id)
+
+        for student in student_chunk:
+            with dog_stats_api.timer('lms.grades.iterate_grades_for', tags=[u'action:{}'.format(course.id)]):
+                try:
+                    request.user = student
+                    # Grading calls problem rendering, which calls masquerading,
+                    # which checks session vars -- thus the empty session dict below.
+                    # It's not pretty, but untangling that is currently beyond the
+                    # scope of this feature.
+                    request.session = {}
+                    gradeset = grade(student, request, course)
+                    yield student, gradeset, ""
+                except Exception as exc:  # pylint: disable=broad-except
+                    # Keep marching on even if this student couldn't be graded for
+                    # some reason, but log it for future reference.
+                    log.exception(
+                        'Cannot grade student %s (%s) in course %s because of exception: %s',
+                        student.username,
+                        student.id,
+                        course.id,
+                        exc.message
+                    )
+                    yield student, {}, exc.message
@@ -142,6 +142,26 @@ class FieldDataCache(object):
         cache.add_descriptor_descendents(descriptor, depth, descriptor_filter)
         return cache
 
+    @classmethod
+    def cache_for_student_module(cls, descriptor, student_module, asides=None):
+        """
+        Returns a FieldDataCache for `descriptor` alone (not its descendents), for the course and user of
+        `student_module`, which has already been loaded and is used for the user state instead of querying
+        for it again.
+
+        descriptor: An XModuleDescriptor, whose location is student_module.module_state_key
+        student_module: The StudentModule of the descriptor. Its `student` should already be loaded.
+        """
+        cache = FieldDataCache([], student_module.course_id, student_module.student, asides=asides)
+        for scope, fields in cache._fields_to_cache([descriptor]).items():
+            if scope == Scope.user_state and not cache.asides:
+                field_objects = [student_module]
+            else:
+                field_objects = cache._retrieve_fields(scope, fields, [descriptor])
+            for field_object in field_objects:
+                cache.cache[cache._cache_key_from_field_object(scope, field_object)] = field_object
+        return cache
+
     def _query(self, model_class, **kwargs):
         """
         Queries model_class with **kwargs, optionally adding select_for_update if
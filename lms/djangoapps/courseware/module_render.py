@@ -22,6 +22,7 @@ from django.core.cache import cache
 from django.core.context_processors import csrf
 from django.core.exceptions import PermissionDenied
 from django.core.urlresolvers import reverse
+from django.dispatch import receiver
 from django.http import Http404, HttpResponse
 from django.test.client import RequestFactory
 from django.views.decorators.csrf import csrf_exempt
@@ -29,6 +30,7 @@ from django.views.decorators.csrf import csrf_exempt
 from capa.xqueue_interface import XQueueInterface
 from courseware.access import has_access, get_user_role
 from courseware.masquerade import setup_masquerade
+from courseware.tasks import send_xqueue_submission, update_grade_histograms
 from courseware.model_data import FieldDataCache, DjangoKeyValueStore
 from courseware.entrance_exams import (
     get_entrance_exam_score,
@@ -60,7 +62,8 @@ from xmodule_modifiers import (
     replace_static_urls,
     add_staff_markup,
     wrap_xblock,
-    request_token
+    request_token,
+    grade_histograms_stale,
 )
 from xmodule.lti_module import LTIModule
 from xmodule.x_module import XModuleDescriptor
@@ -81,12 +84,27 @@ if settings.XQUEUE_INTERFACE.get('basic_auth') is not None:
 else:
     REQUESTS_AUTH = None
 
+# Learners' submissions can be sent to the xqueue by a celery task, so that
+# submitting does not wait on the xqueue server.
 XQUEUE_INTERFACE = XQueueInterface(
     settings.XQUEUE_INTERFACE['url'],
     settings.XQUEUE_INTERFACE['django_auth'],
     REQUESTS_AUTH,
+    background_sender=(
+        send_xqueue_submission.delay if settings.XQUEUE_INTERFACE.get('submit_in_background', False) else None
+    ),
 )
 
+
+@receiver(grade_histograms_stale)
+def schedule_grade_histograms_update(sender, course_key, **kwargs):  # pylint: disable=unused-argument
+    """
+    Recomputes the grade histograms shown in the staff markup of the blocks of a course in the background.
+    """
+    # The course key is passed as a string, since CourseLocator is not JSON-serializable.
+    update_grade_histograms.delay(unicode(course_key))
+
+
 # TODO: course_id and course_key are used interchangeably in this file, which is wrong.
 # Some brave person should make the variable names consistently someday, but the code's
 # coupled enough that it's kind of tricky--you've been warned!
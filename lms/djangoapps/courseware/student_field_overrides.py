@@ -4,10 +4,16 @@ by the individual due dates feature.
 """
 import json
 
+from request_cache.middleware import RequestCache
+
 from .field_overrides import FieldOverrideProvider
 from .models import StudentFieldOverride
 
 
+# The request cache entry holding the overrides of each (user id, course key) pair, see _get_course_overrides.
+REQUEST_CACHE_KEY = 'courseware.student_field_overrides'
+
+
 class IndividualStudentOverrideProvider(FieldOverrideProvider):
     """
     A concrete implementation of
@@ -17,6 +23,9 @@ class IndividualStudentOverrideProvider(FieldOverrideProvider):
     def get(self, block, name, default):
         return get_override_for_user(self.user, block, name, default)
 
+    def overrides_field(self, block, name):
+        return name in _get_course_overrides(self.user, block.runtime.course_id)['fields']
+
 
 def get_override_for_user(user, block, name, default=None):
     """
@@ -38,19 +47,45 @@ def _get_overrides_for_user(user, block):
     Gets all of the individual student overrides for given user and block.
     Returns a dictionary of field override values keyed by field name.
     """
-    query = StudentFieldOverride.objects.filter(
-        course_id=block.runtime.course_id,
-        location=block.location,
-        student_id=user.id,
-    )
+    course_overrides = _get_course_overrides(user, block.runtime.course_id)
+    location = StudentFieldOverride._meta.get_field('location').get_prep_value(block.location)
     overrides = {}
-    for override in query:
-        field = block.fields[override.field]
-        value = field.from_json(json.loads(override.value))
-        overrides[override.field] = value
+    for field_name, value in course_overrides['blocks'].get(location, {}).iteritems():
+        field = block.fields[field_name]
+        overrides[field_name] = field.from_json(json.loads(value))
     return overrides
 
 
+def _get_course_overrides(user, course_key):
+    """
+    Gets all of the individual student overrides for the given user in the given course, with a single query whose
+    results are kept for the rest of the request. Only the overrides of the last user are kept, so that requests and
+    tasks going through many students, such as grade reports, don't hold the overrides of all of them.
+
+    Returns a dictionary with the JSON override values keyed by block location (as stored) and field name under
+    'blocks', and the set of overridden field names under 'fields'.
+    """
+    cache = RequestCache.get_request_cache().data.setdefault(REQUEST_CACHE_KEY, {})
+    if (user.id, course_key) not in cache:
+        cache.clear()
+        course_overrides = {'blocks': {}, 'fields': set()}
+        query = StudentFieldOverride.objects.filter(course_id=course_key, student_id=user.id)
+        for location, field_name, value in query.values_list('location', 'field', 'value'):
+            course_overrides['blocks'].setdefault(location, {})[field_name] = value
+            course_overrides['fields'].add(field_name)
+        cache[(user.id, course_key)] = course_overrides
+    return cache[(user.id, course_key)]
+
+
+def _clear_cached_overrides(user, block):
+    """
+    Discards the overrides of the user that were loaded for the block and its course, after changing them.
+    """
+    RequestCache.get_request_cache().data.get(REQUEST_CACHE_KEY, {}).pop((user.id, block.runtime.course_id), None)
+    if hasattr(block, '_student_overrides'):
+        block._student_overrides.pop(user.id, None)  # pylint: disable=protected-access
+
+
 def override_field_for_user(user, block, name, value):
     """
     Overrides a field for the `user`.  `block` and `name` specify the block
@@ -65,6 +100,7 @@ def override_field_for_user(user, block, name, value):
     field = block.fields[name]
     override.value = json.dumps(field.to_json(value))
     override.save()
+    _clear_cached_overrides(user, block)
 
 
 def clear_override_for_user(user, block, name):
@@ -82,3 +118,4 @@ def clear_override_for_user(user, block, name):
             field=name).delete()
     except StudentFieldOverride.DoesNotExist:
         pass
+    _clear_cached_overrides(user, block)
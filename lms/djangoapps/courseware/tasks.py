@@ -0,0 +1,64 @@
+"""
+Asynchronous tasks for the courseware app.
+"""
+import json
+import logging
+
+from celery.task import task
+import dogstats_wrapper as dog_stats_api
+from opaque_keys.edx.keys import CourseKey
+
+from capa.xqueue_interface import XQUEUE_METRIC_NAME
+from xmodule_modifiers import compute_grade_histograms
+
+
+log = logging.getLogger(__name__)
+
+# Number of times sending a submission to the xqueue is retried, and the delay
+# before the first retry (doubled for each further retry).
+XQUEUE_SUBMISSION_MAX_RETRIES = 8
+XQUEUE_SUBMISSION_RETRY_DELAY = 2  # seconds
+
+
+@task()
+def update_grade_histograms(course_key):
+    """
+    Recomputes the grade histograms of the blocks of the given course shown to staff.
+
+    The course key is passed as a string, since CourseLocator is not JSON-serializable.
+    """
+    compute_grade_histograms(CourseKey.from_string(course_key))
+
+
+@task(max_retries=XQUEUE_SUBMISSION_MAX_RETRIES)
+def send_xqueue_submission(header, body):
+    """
+    Sends a learner's submission to the xqueue, for the XQueueInterface of module_render when it submits in the
+    background.
+
+    Failed sends are retried with an increasing delay. A submission which still can't be sent is logged with its
+    callback url (naming the user and problem) and its queuekey, so that it can be resubmitted.
+    """
+    from courseware.module_render import XQUEUE_INTERFACE  # avoid circular import
+
+    (error, msg) = XQUEUE_INTERFACE.send_now(header, body)
+    if not error:
+        return
+
+    retries = send_xqueue_submission.request.retries
+    if retries < send_xqueue_submission.max_retries:
+        log.warning(
+            "Failed to send submission to xqueue (attempt %d of %d): %s",
+            retries + 1, send_xqueue_submission.max_retries + 1, msg
+        )
+        raise send_xqueue_submission.retry(countdown=XQUEUE_SUBMISSION_RETRY_DELAY * 2 ** retries)
+
+    header_info = json.loads(header)
+    dog_stats_api.increment(XQUEUE_METRIC_NAME, tags=[
+        u'action:send_to_queue_failed',
+        u'queue:{}'.format(header_info.get('queue_name', u''))
+    ])
+    log.error(
+        "Gave up sending submission to xqueue (%s): callback %s, queuekey %s",
+        msg, header_info.get('lms_callback_url'), header_info.get('lms_key')
+    )
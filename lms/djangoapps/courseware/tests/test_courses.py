@@ -5,6 +5,8 @@ Tests for course access
 import ddt
 import itertools
 import mock
+from datetime import datetime, timedelta
+from pytz import UTC
 
 from django.conf import settings
 from django.test.utils import override_settings
@@ -18,6 +20,9 @@ from courseware.courses import (
 )
 from courseware.module_render import get_module_for_descriptor
 from courseware.tests.helpers import get_request_for_user
+from openedx.core.djangoapps.content.course_overviews.models import CourseOverview
+from request_cache.middleware import RequestCache
+from util.cache import cache
 from courseware.model_data import FieldDataCache
 from student.tests.factories import UserFactory
 from xmodule.modulestore.django import _get_modulestore_branch_setting, modulestore
@@ -172,6 +177,7 @@ class CoursesRenderTest(ModuleStoreTestCase):
         self.assertEqual(course_info, u"<a href='/c4x/edX/toy/asset/handouts_sample_handout.txt'>Sample</a>")
 
         # Test when render raises an exception
+        cache.clear()
         with mock.patch('courseware.courses.get_module') as mock_module_render:
             mock_module_render.return_value = mock.MagicMock(
                 render=mock.Mock(side_effect=Exception('Render failed!'))
@@ -188,6 +194,7 @@ class CoursesRenderTest(ModuleStoreTestCase):
         self.assertEqual(course_about, "A course about toys.")
 
         # Test when render raises an exception
+        cache.clear()
         with mock.patch('courseware.courses.get_module') as mock_module_render:
             mock_module_render.return_value = mock.MagicMock(
                 render=mock.Mock(side_effect=Exception('Render failed!'))
@@ -195,6 +202,70 @@ class CoursesRenderTest(ModuleStoreTestCase):
             course_about = get_course_about_section(self.course, 'short_description')
             self.assertIn("this module is temporarily unavailable", course_about)
 
+    def test_get_course_info_section_cached(self):
+        CourseOverview.load_from_modulestore(self.course.id)
+        cache.clear()
+        handouts = get_course_info_section(self.request, self.course, 'handouts')
+
+        with mock.patch('courseware.courses.get_module') as mock_module_render:
+            self.assertEqual(get_course_info_section(self.request, self.course, 'handouts'), handouts)
+            self.assertFalse(mock_module_render.called)
+
+            # Courses served with a different static asset path have their own entries.
+            self.course.static_asset_path = 'toy'
+            mock_module_render.return_value = None
+            self.assertEqual(get_course_info_section(self.request, self.course, 'handouts'), '')
+
+    @mock.patch.dict('django.conf.settings.FEATURES', {'DISPLAY_DEBUG_INFO_TO_STAFF': True})
+    def test_get_course_info_section_staff(self):
+        CourseOverview.load_from_modulestore(self.course.id)
+        cache.clear()
+        staff_request = get_request_for_user(UserFactory.create(is_staff=True))
+
+        # Handouts rendered for staff carry the Staff Debug markup, so they are neither cached nor read from the cache.
+        with mock.patch('courseware.courses._render_course_info_section') as mock_render:
+            mock_render.return_value = ("Staff", True)
+            self.assertEqual(get_course_info_section(staff_request, self.course, 'handouts'), "Staff")
+
+        self.assertEqual(
+            get_course_info_section(self.request, self.course, 'handouts'),
+            u"<a href='/c4x/edX/toy/asset/handouts_sample_handout.txt'>Sample</a>"
+        )
+
+    @mock.patch('courseware.courses.get_request_for_thread')
+    def test_get_course_about_section_cached(self, mock_get_request):
+        mock_get_request.return_value = self.request
+        CourseOverview.load_from_modulestore(self.course.id)
+        cache.clear()
+
+        self.assertEqual(get_course_about_section(self.course, 'short_description'), "A course about toys.")
+
+        # Rendered sections are shared until the course is published again.
+        with mock.patch('courseware.courses._render_course_about_section') as mock_render:
+            mock_render.return_value = ("Updated", True)
+            self.assertEqual(get_course_about_section(self.course, 'short_description'), "A course about toys.")
+
+            CourseOverview.objects.filter(course_id=self.course.id).update(
+                modified=datetime.now(UTC) + timedelta(minutes=1)
+            )
+            RequestCache().clear_request_cache()
+            self.assertEqual(get_course_about_section(self.course, 'short_description'), "Updated")
+
+    @mock.patch.dict('django.conf.settings.FEATURES', {'DISPLAY_DEBUG_INFO_TO_STAFF': True})
+    @mock.patch('courseware.courses.get_request_for_thread')
+    def test_get_course_about_section_staff(self, mock_get_request):
+        mock_get_request.return_value = get_request_for_user(UserFactory.create(is_staff=True))
+        CourseOverview.load_from_modulestore(self.course.id)
+        cache.clear()
+
+        # Sections rendered for staff carry the Staff Debug markup, so they are neither cached nor read from the cache.
+        with mock.patch('courseware.courses._render_course_about_section') as mock_render:
+            mock_render.return_value = ("Staff", True)
+            self.assertEqual(get_course_about_section(self.course, 'short_description'), "Staff")
+
+        mock_get_request.return_value = self.request
+        self.assertEqual(get_course_about_section(self.course, 'short_description'), "A course about toys.")
+
 
 class XmlCoursesRenderTest(ModuleStoreTestCase):
     """Test methods related to rendering courses content for an XML course."""
@@ -5,12 +5,14 @@ Test for lms courseware app, module render unit
 import ddt
 import itertools
 import json
+import time
 from functools import partial
 
 from bson import ObjectId
 from django.http import Http404, HttpResponse
 from django.core.urlresolvers import reverse
 from django.conf import settings
+from django.core.cache import cache
 from django.test.client import RequestFactory
 from django.contrib.auth.models import AnonymousUser
 from mock import MagicMock, patch, Mock
@@ -34,17 +36,20 @@ from courseware.tests.factories import StudentModuleFactory, UserFactory, Global
 from courseware.tests.tests import LoginEnrollmentTestCase
 from courseware.tests.test_submitting_problems import TestSubmittingProblems
 from lms.djangoapps.lms_xblock.runtime import quote_slashes
+from request_cache.middleware import RequestCache
 from student.models import anonymous_id_for_user
 from xmodule.modulestore.tests.django_utils import (
     TEST_DATA_MIXED_TOY_MODULESTORE,
     TEST_DATA_XML_MODULESTORE,
 )
+from xmodule.exceptions import NotFoundError
 from xmodule.lti_module import LTIDescriptor
 from xmodule.modulestore import ModuleStoreEnum
 from xmodule.modulestore.django import modulestore
 from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
 from xmodule.modulestore.tests.factories import ItemFactory, CourseFactory, check_mongo_calls
 from xmodule.x_module import XModuleDescriptor, XModule, STUDENT_VIEW, CombinedSystem
+from xmodule_modifiers import grade_histogram, grade_histograms
 
 TEST_DATA_DIR = settings.COMMON_TEST_DATA_ROOT
 
@@ -676,6 +681,61 @@ class TestHtmlModifiers(ModuleStoreTestCase):
         )
 
 
+class TestSequenceRenderUnitsOnDemand(ModuleStoreTestCase):
+    """
+    Tests that sequences set to render units on demand only render the current unit up front.
+    """
+    def setUp(self):
+        super(TestSequenceRenderUnitsOnDemand, self).setUp()
+        self.user = UserFactory.create()
+        self.request = RequestFactory().get('/')
+        self.request.user = self.user
+        self.request.session = {}
+        self.course = CourseFactory.create()
+        chapter = ItemFactory.create(category='chapter', parent_location=self.course.location)
+        self.sequence = ItemFactory.create(
+            category='sequential',
+            parent_location=chapter.location,
+            metadata={'render_units_on_demand': True},
+        )
+        for index in range(1, 4):
+            vertical = ItemFactory.create(category='vertical', parent_location=self.sequence.location)
+            ItemFactory.create(
+                category='html',
+                parent_location=vertical.location,
+                data='<p>Unit {} content</p>'.format(index),
+            )
+
+    def _get_sequence_module(self):
+        """ Returns the sequence module, for self.user. """
+        field_data_cache = FieldDataCache.cache_for_descriptor_descendents(
+            self.course.id, self.user, modulestore().get_item(self.sequence.location)
+        )
+        return render.get_module(self.user, self.request, self.sequence.location, field_data_cache)
+
+    def test_only_current_unit_rendered(self):
+        content = self._get_sequence_module().render(STUDENT_VIEW).content
+        self.assertIn('Unit 1 content', content)
+        self.assertNotIn('Unit 2 content', content)
+        self.assertNotIn('Unit 3 content', content)
+        self.assertIn('data-prefetch-next="true"', content)
+
+    def test_render_unit(self):
+        module = self._get_sequence_module()
+        module.render(STUDENT_VIEW)
+        response = json.loads(module.handle_ajax('render_unit', {'position': u'3'}))
+        self.assertIn('Unit 3 content', response['html'])
+        self.assertNotIn('Unit 2 content', response['html'])
+        # Rendering a unit on demand doesn't move the learner's position.
+        self.assertEqual(module.position, 1)
+
+    def test_render_unit_bad_position(self):
+        module = self._get_sequence_module()
+        for position in (u'0', u'4', u'one'):
+            with self.assertRaises(NotFoundError):
+                module.handle_ajax('render_unit', {'position': position})
+
+
 class XBlockWithJsonInitData(XBlock):
     """
     Pure XBlock to use in tests, with JSON init data.
@@ -958,6 +1018,91 @@ class TestStaffDebugInfo(ModuleStoreTestCase):
             module.render(STUDENT_VIEW)
             self.assertTrue(mock_grade_histogram.called)
 
+    def test_grade_histograms_rollup(self):
+        """
+        Histograms of all blocks in a course should be computed together in the background, and only read when
+        viewed.
+        """
+        other_problem = ItemFactory.create(category='problem', parent_location=self.course.location)
+        for grade in (0, 1, 1):
+            StudentModuleFactory.create(
+                course_id=self.course.id,
+                module_state_key=self.location,
+                student=UserFactory(),
+                grade=grade,
+                max_grade=1,
+                state="{}",
+            )
+        cache.clear()
+        RequestCache().clear_request_cache()
+
+        # The first view schedules the computation, which tasks run eagerly in tests, but shows no histogram yet.
+        with self.assertNumQueries(1):
+            self.assertIsNone(grade_histogram(self.location))
+
+        RequestCache().clear_request_cache()
+        with self.assertNumQueries(0):
+            self.assertEqual(grade_histogram(self.location), [(0, 1), (1, 2)])
+            self.assertEqual(grade_histogram(other_problem.location), [])
+
+        # Until the histograms are stale, new grades aren't counted and no more queries are made.
+        StudentModuleFactory.create(
+            course_id=self.course.id,
+            module_state_key=self.location,
+            student=UserFactory(),
+            grade=0,
+            max_grade=1,
+            state="{}",
+        )
+        RequestCache().clear_request_cache()
+        with self.assertNumQueries(0):
+            self.assertEqual(grade_histogram(self.location), [(0, 1), (1, 2)])
+
+        # Stale histograms are shown while they are computed again.
+        later = time.time() + settings.GRADE_HISTOGRAM_CACHE_TIMEOUT + 1
+        with patch('xmodule_modifiers.time.time', Mock(return_value=later)):
+            RequestCache().clear_request_cache()
+            self.assertEqual(grade_histogram(self.location), [(0, 1), (1, 2)])
+            RequestCache().clear_request_cache()
+            self.assertEqual(grade_histogram(self.location), [(0, 2), (1, 2)])
+
+    @patch('xmodule_modifiers.GRADE_HISTOGRAM_CHUNK_SIZE', 1)
+    def test_grade_histograms_chunks(self):
+        """
+        The histograms of a unit should be read together, from a rollup cached in chunks, and recomputed if a chunk
+        is evicted.
+        """
+        other_problem = ItemFactory.create(category='problem', parent_location=self.course.location)
+        for location, grade in ((self.location, 0), (other_problem.location, 1)):
+            StudentModuleFactory.create(
+                course_id=self.course.id,
+                module_state_key=location,
+                student=UserFactory(),
+                grade=grade,
+                max_grade=1,
+                state="{}",
+            )
+        cache.clear()
+        RequestCache().clear_request_cache()
+        self.assertEqual(
+            grade_histograms([self.location, other_problem.location]),
+            {self.location: None, other_problem.location: None}
+        )
+
+        RequestCache().clear_request_cache()
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                grade_histograms([self.location, other_problem.location]),
+                {self.location: [(0, 1)], other_problem.location: [(1, 1)]}
+            )
+
+        # Losing a chunk of the rollup recomputes it.
+        with patch('xmodule_modifiers.cache.get_many', Mock(return_value={})):
+            RequestCache().clear_request_cache()
+            self.assertIsNone(grade_histogram(self.location))
+        RequestCache().clear_request_cache()
+        self.assertEqual(grade_histogram(self.location), [(0, 1)])
+
 
 PER_COURSE_ANONYMIZED_DESCRIPTORS = (LTIDescriptor, )
 
@@ -0,0 +1,40 @@
+"""
+Tests for the courseware celery tasks.
+"""
+from django.test import TestCase
+from mock import patch
+
+from capa.xqueue_interface import make_xheader
+from courseware.module_render import XQUEUE_INTERFACE
+from courseware.tasks import send_xqueue_submission
+
+
+class SendXQueueSubmissionTest(TestCase):
+    """
+    Tests for sending submissions to the xqueue in the background.
+    """
+    def setUp(self):
+        super(SendXQueueSubmissionTest, self).setUp()
+        self.header = make_xheader('http://lms.example.com/callback', 'key', 'test-queue')
+        self.body = '{}'
+
+    def test_send(self):
+        with patch.object(XQUEUE_INTERFACE, 'send_now', return_value=(0, '0')) as mock_send:
+            send_xqueue_submission.delay(self.header, self.body)
+        mock_send.assert_called_once_with(self.header, self.body)
+
+    def test_retry(self):
+        replies = [(1, 'cannot connect to server'), (0, '0')]
+        with patch.object(XQUEUE_INTERFACE, 'send_now', side_effect=replies) as mock_send:
+            send_xqueue_submission.delay(self.header, self.body)
+        self.assertEqual(mock_send.call_count, 2)
+
+    @patch('courseware.tasks.log')
+    def test_give_up(self, mock_log):
+        with patch.object(send_xqueue_submission, 'max_retries', 0):
+            with patch.object(XQUEUE_INTERFACE, 'send_now', return_value=(1, 'cannot connect to server')):
+                send_xqueue_submission.delay(self.header, self.body)
+        mock_log.error.assert_called_once_with(
+            "Gave up sending submission to xqueue (%s): callback %s, queuekey %s",
+            'cannot connect to server', 'http://lms.example.com/callback', 'key'
+        )
@@ -153,13 +153,14 @@ def get_threads(request, course, discussion_id=None, per_page=THREADS_PER_PAGE):
 def use_bulk_ops(view_func):
     """
     Wraps internal request handling inside a modulestore bulk op, significantly
-    reducing redundant database calls.  Also converts the course_id parsed from
-    the request uri to a CourseKey before passing to the view.
+    reducing redundant database calls, and coalesces identical reads from the
+    comments service.  Also converts the course_id parsed from the request uri
+    to a CourseKey before passing to the view.
     """
     @wraps(view_func)
     def wrapped_view(request, course_id, *args, **kwargs):  # pylint: disable=missing-docstring
         course_key = CourseKey.from_string(course_id)
-        with modulestore().bulk_operations(course_key):
+        with modulestore().bulk_operations(course_key), cc.utils.coalesced_requests():
             return view_func(request, course_key, *args, **kwargs)
     return wrapped_view
 
@@ -277,7 +278,6 @@ def single_thread(request, course_key, discussion_id, thread_id):
     course = get_course_with_access(request.user, 'load_forum', course_key)
     course_settings = make_course_settings(course, request.user)
     cc_user = cc.User.from_django_user(request.user)
-    user_info = cc_user.to_dict()
     is_moderator = cached_has_permission(request.user, "see_all_cohorts", course_key)
 
     # Verify that the student has access to this thread if belongs to a discussion module
@@ -288,11 +288,14 @@ def single_thread(request, course_key, discussion_id, thread_id):
     # page; it would be a nice optimization to avoid that extra round trip to
     # the comments service.
     try:
-        thread = cc.Thread.find(thread_id).retrieve(
-            recursive=request.is_ajax(),
-            user_id=request.user.id,
-            response_skip=request.GET.get("resp_skip"),
-            response_limit=request.GET.get("resp_limit")
+        user_info, thread = cc.utils.perform_concurrently(
+            cc_user.to_dict,
+            lambda: cc.Thread.find(thread_id).retrieve(
+                recursive=request.is_ajax(),
+                user_id=request.user.id,
+                response_skip=request.GET.get("resp_skip"),
+                response_limit=request.GET.get("resp_limit")
+            )
         )
     except cc.utils.CommentClientRequestError as e:
         if e.status_code == 404:
@@ -394,10 +397,12 @@ def user_profile(request, course_key, user_id):
         else:
             profiled_user = cc.User(id=user_id, course_id=course_key)
 
-        threads, page, num_pages = profiled_user.active_threads(query_params)
+        (threads, page, num_pages), user_info = cc.utils.perform_concurrently(
+            lambda: profiled_user.active_threads(query_params),
+            cc.User.from_django_user(request.user).to_dict,
+        )
         query_params['page'] = page
         query_params['num_pages'] = num_pages
-        user_info = cc.User.from_django_user(request.user).to_dict()
 
         with newrelic.agent.FunctionTrace(nr_transaction, "get_metadata_for_threads"):
             annotated_content_info = utils.get_metadata_for_threads(course_key, threads, request.user, user_info)
@@ -475,10 +480,12 @@ def followed_threads(request, course_key, user_id):
         if group_id is not None:
             query_params['group_id'] = group_id
 
-        threads, page, num_pages = profiled_user.subscribed_threads(query_params)
+        (threads, page, num_pages), user_info = cc.utils.perform_concurrently(
+            lambda: profiled_user.subscribed_threads(query_params),
+            cc.User.from_django_user(request.user).to_dict,
+        )
         query_params['page'] = page
         query_params['num_pages'] = num_pages
-        user_info = cc.User.from_django_user(request.user).to_dict()
 
         with newrelic.agent.FunctionTrace(nr_transaction, "get_metadata_for_threads"):
             annotated_content_info = utils.get_metadata_for_threads(course_key, threads, request.user, user_info)
@@ -4,35 +4,128 @@ Module for checking permissions with the comment_client backend
 
 import logging
 from types import NoneType
+from uuid import uuid4
+
 from django.core import cache
+from django.db.models.signals import m2m_changed, post_delete
+from django.dispatch import receiver
+from request_cache.middleware import RequestCache
+
+from django_comment_common.models import Permission, Role, is_permission_withheld
 from lms.lib.comment_client import Thread
 from opaque_keys.edx.keys import CourseKey
+from xmodule.modulestore.django import modulestore
+from xmodule.modulestore.exceptions import ItemNotFoundError
 
 CACHE = cache.get_cache('default')
 CACHE_LIFESPAN = 60
+REQUEST_CACHE_KEY = 'django_comment_client.permissions'
 
 
-def cached_has_permission(user, permission, course_id=None):
+def _permissions_version_key(course_id):
+    """
+    Returns the cache key of the current version of the permission sets cached for the given course.
+    """
+    return u"permissions_version_{course_id}".format(course_id=course_id)
+
+
+def _load_permissions(user, course_id):
     """
-    Call has_permission if it's not cached. A change in a user's role or
-    a role's permissions will only become effective after CACHE_LIFESPAN seconds.
+    Returns the names of the permissions granted to the user by their roles in the given course, read in a single
+    query.
+    """
+    courses = []
+
+    def get_course():
+        """
+        Returns the course, loading it the first time it's needed.
+        """
+        if not courses:
+            course = modulestore().get_course(course_id)
+            if course is None:
+                raise ItemNotFoundError(course_id)
+            courses.append(course)
+        return courses[0]
+
+    permissions = set()
+    for role_name, permission in Role.objects.filter(users=user, course_id=course_id).values_list(
+            'name', 'permissions__name'
+    ):
+        if permission is None or is_permission_withheld(role_name, permission, get_course):
+            continue
+        permissions.add(permission)
+    return frozenset(permissions)
+
+
+def get_permissions(user, course_id=None):
+    """
+    Returns the names of all the permissions the user has in the given course.
+
+    The set is kept for the rest of the request, and cached for CACHE_LIFESPAN
+    seconds. It is discarded as soon as roles of the course, or their
+    permissions, are changed.
     """
     assert isinstance(course_id, (NoneType, CourseKey))
-    key = u"permission_{user_id:d}_{course_id}_{permission}".format(
-        user_id=user.id, course_id=course_id, permission=permission)
-    val = CACHE.get(key, None)
-    if val not in [True, False]:
-        val = has_permission(user, permission, course_id=course_id)
-        CACHE.set(key, val, CACHE_LIFESPAN)
-    return val
+    request_cache = RequestCache.get_request_cache().data.setdefault(REQUEST_CACHE_KEY, {})
+    if (user.id, course_id) not in request_cache:
+        key = u"permissions_{user_id:d}_{course_id}_{version}".format(
+            user_id=user.id, course_id=course_id, version=CACHE.get(_permissions_version_key(course_id), ''))
+        permissions = CACHE.get(key)
+        if permissions is None:
+            permissions = _load_permissions(user, course_id)
+            CACHE.set(key, permissions, CACHE_LIFESPAN)
+        request_cache[(user.id, course_id)] = permissions
+    return request_cache[(user.id, course_id)]
+
+
+def cached_has_permission(user, permission, course_id=None):
+    """
+    Checks the permission against the user's cached permission set (see
+    get_permissions).
+    """
+    return permission in get_permissions(user, course_id=course_id)
 
 
 def has_permission(user, permission, course_id=None):
     assert isinstance(course_id, (NoneType, CourseKey))
-    for role in user.roles.filter(course_id=course_id):
-        if role.has_permission(permission):
-            return True
-    return False
+    return permission in _load_permissions(user, course_id)
+
+
+def _invalidate_permissions(roles):
+    """
+    Discards the permission sets cached for the courses of the given roles.
+    """
+    for course_id in set(role.course_id for role in roles):
+        # Sets cached under the previous version expire before the version itself can.
+        CACHE.set(_permissions_version_key(course_id), uuid4().hex, CACHE_LIFESPAN)
+    RequestCache.get_request_cache().data.pop(REQUEST_CACHE_KEY, None)
+
+
+@receiver(m2m_changed, sender=Role.users.through)
+@receiver(m2m_changed, sender=Permission.roles.through)
+def invalidate_permissions_on_role_change(sender, instance, action, pk_set, **kwargs):  # pylint: disable=unused-argument
+    """
+    Discards cached permission sets when users are given or removed roles, or
+    roles are given or removed permissions.
+    """
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if isinstance(instance, Role):
+        roles = [instance]
+    elif action == 'pre_clear':
+        # Both users and permissions refer to their roles as `roles`.
+        roles = instance.roles.all()
+    else:
+        roles = Role.objects.filter(pk__in=pk_set)
+    _invalidate_permissions(roles)
+
+
+@receiver(post_delete, sender=Role)
+def invalidate_permissions_on_role_delete(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """
+    Discards cached permission sets when a role is deleted.
+    """
+    _invalidate_permissions([instance])
 
 
 CONDITIONS = ['is_open', 'is_author', 'is_question_author']
@@ -0,0 +1,70 @@
+"""
+Tests of the forum permission checks.
+"""
+from datetime import datetime, timedelta
+
+from django.utils.timezone import UTC
+
+from django_comment_client.permissions import cached_has_permission, get_permissions, has_permission
+from django_comment_client.tests.factories import RoleFactory
+from student.tests.factories import UserFactory
+from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
+from xmodule.modulestore.tests.factories import CourseFactory
+
+
+class PermissionsTestCase(ModuleStoreTestCase):
+    def setUp(self):
+        super(PermissionsTestCase, self).setUp()
+
+        self.course = CourseFactory.create()
+        self.student_role = RoleFactory(name='Student', course_id=self.course.id)
+        self.moderator_role = RoleFactory(name='Moderator', course_id=self.course.id)
+        for permission in ('create_thread', 'vote'):
+            self.student_role.add_permission(permission)
+            self.moderator_role.add_permission(permission)
+        self.moderator_role.add_permission('openclose_thread')
+
+        self.student = UserFactory.create()
+        self.student_role.users.add(self.student)
+        self.moderator = UserFactory.create()
+        self.moderator.roles.add(self.student_role, self.moderator_role)
+
+    def test_get_permissions(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(get_permissions(self.student, self.course.id), {'create_thread', 'vote'})
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                get_permissions(self.moderator, self.course.id), {'create_thread', 'vote', 'openclose_thread'}
+            )
+
+        # Later checks are answered from the cached sets.
+        with self.assertNumQueries(0):
+            self.assertTrue(cached_has_permission(self.student, 'vote', self.course.id))
+            self.assertFalse(cached_has_permission(self.student, 'openclose_thread', self.course.id))
+            self.assertTrue(cached_has_permission(self.moderator, 'openclose_thread', self.course.id))
+
+    def test_role_changes(self):
+        self.assertFalse(cached_has_permission(self.student, 'openclose_thread', self.course.id))
+
+        self.student.roles.add(self.moderator_role)
+        self.assertTrue(cached_has_permission(self.student, 'openclose_thread', self.course.id))
+
+        self.moderator_role.users.remove(self.student)
+        self.assertFalse(cached_has_permission(self.student, 'openclose_thread', self.course.id))
+
+        self.student_role.add_permission('openclose_thread')
+        self.assertTrue(cached_has_permission(self.student, 'openclose_thread', self.course.id))
+
+        self.student.roles.clear()
+        self.assertFalse(cached_has_permission(self.student, 'vote', self.course.id))
+
+    def test_posting_not_allowed(self):
+        now = datetime.now(UTC())
+        self.course.discussion_blackouts = [[
+            (now - timedelta(days=1)).isoformat(), (now + timedelta(days=1)).isoformat()
+        ]]
+        self.update_course(self.course, self.user.id)
+
+        self.assertEqual(get_permissions(self.student, self.course.id), {'vote'})
+        self.assertFalse(has_permission(self.student, 'create_thread', self.course.id))
+        self.assertTrue(has_permission(self.moderator, 'create_thread', self.course.id))
@@ -7,10 +7,12 @@ import mock
 import json
 import unittest
 
+from celery.signals import task_postrun
 from django.utils.timezone import utc
 from django.test.utils import override_settings
 
 from courseware.field_overrides import OverrideFieldData  # pylint: disable=import-error
+from request_cache.middleware import RequestCache  # pylint: disable=import-error
 from student.tests.factories import UserFactory  # pylint: disable=import-error
 from xmodule.fields import Date
 from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
@@ -248,6 +250,24 @@ class TestSetDueDateExtension(ModuleStoreTestCase):
             tools.set_due_date_extension(self.course, self.week1, self.user, extended)
             self._clear_field_data_cache()
 
+    def test_due_date_extensions_loaded_with_one_query(self):
+        extended = datetime.datetime(2013, 12, 25, 0, 0, tzinfo=utc)
+        tools.set_due_date_extension(self.course, self.week1, self.user, extended)
+        tools.set_due_date_extension(self.course, self.week2, self.user, extended)
+        self._clear_field_data_cache()
+        with self.assertNumQueries(1):
+            dues = [block.due for block in (self.week1, self.week2, self.homework, self.assignment)]
+        self.assertEqual(dues, [extended] * 4)
+
+    def test_due_date_extensions_not_kept_across_tasks(self):
+        extended = datetime.datetime(2013, 12, 25, 0, 0, tzinfo=utc)
+        tools.set_due_date_extension(self.course, self.week1, self.user, extended)
+        self._clear_field_data_cache()
+        self.assertEqual(self.week1.due, extended)
+        self.assertTrue(RequestCache.get_request_cache().data)
+        task_postrun.send(sender=None)
+        self.assertEqual(RequestCache.get_request_cache().data, {})
+
     def test_set_due_date_extension_invalid_date(self):
         extended = datetime.datetime(2009, 1, 1, 0, 0, tzinfo=utc)
         with self.assertRaises(tools.DashboardError):
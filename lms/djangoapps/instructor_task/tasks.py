@@ -26,12 +26,15 @@ from django.conf import settings
 from django.utils.translation import ugettext_noop
 
 from celery import task
+from celery.states import FAILURE
 from bulk_email.tasks import perform_delegate_email_batches
+from instructor_task.subtasks import SubtaskStatus, check_subtask_is_valid, update_subtask_status
 from instructor_task.tasks_helper import (
     run_main_task,
     BaseInstructorTask,
     perform_module_state_update,
-    rescore_problem_module_state,
+    perform_batched_rescore,
+    perform_rescore_subtask,
     reset_attempts_module_state,
     delete_problem_module_state,
     upload_grades_csv,
@@ -64,16 +67,44 @@ def rescore_problem(entry_id, xmodule_instance_args):
     """
     # Translators: This is a past-tense verb that is inserted into task progress messages as {action}.
     action_name = ugettext_noop('rescored')
-    update_fcn = partial(rescore_problem_module_state, xmodule_instance_args)
 
     def filter_fcn(modules_to_update):
         """Filter that matches problems which are marked as being done"""
         return modules_to_update.filter(state__contains='"done": true')
 
-    visit_fcn = partial(perform_module_state_update, update_fcn, filter_fcn)
+    visit_fcn = partial(perform_batched_rescore, xmodule_instance_args, filter_fcn)
     return run_main_task(entry_id, visit_fcn, action_name)
 
 
+@task  # pylint: disable=not-callable
+def rescore_problem_subtask(entry_id, module_ids, xmodule_instance_args, subtask_status_dict):
+    """Rescores a problem for some of the students of a rescore_problem task that was split into subtasks.
+
+    `entry_id` is the id value of the InstructorTask entry that corresponds to the parent task.
+    `module_ids` are the ids of the StudentModules to rescore, and `subtask_status_dict` is the
+    initial status of this subtask, as created by SubtaskStatus.to_dict().
+
+    The progress made is recorded in the InstructorTask entry.
+    """
+    subtask_status = SubtaskStatus.from_dict(subtask_status_dict)
+    current_task_id = subtask_status.task_id
+
+    # Reject duplicates of this subtask, e.g. from requeued parent tasks.
+    check_subtask_is_valid(entry_id, current_task_id, subtask_status)
+
+    try:
+        new_subtask_status = perform_rescore_subtask(entry_id, module_ids, xmodule_instance_args, subtask_status)
+    except Exception:
+        TASK_LOG.exception(u"Rescore subtask %s for instructor task %s: failed unexpectedly!", current_task_id, entry_id)
+        # We don't know how many StudentModules were rescored in a rolled back chunk, so count the rest as failed.
+        subtask_status.increment(failed=len(module_ids) - subtask_status.attempted, state=FAILURE)
+        update_subtask_status(entry_id, current_task_id, subtask_status)
+        raise
+
+    update_subtask_status(entry_id, current_task_id, new_subtask_status)
+    return new_subtask_status.to_dict()
+
+
 @task(base=BaseInstructorTask)  # pylint: disable=not-callable
 def reset_problem_attempts(entry_id, xmodule_instance_args):
     """Resets problem attempts to zero for a particular problem for all students in a course.
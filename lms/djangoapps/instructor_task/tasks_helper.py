@@ -11,6 +11,7 @@ import logging
 
 from celery import Task, current_task
 from celery.states import SUCCESS, FAILURE
+from django.conf import settings
 from django.contrib.auth.models import User
 from django.core.files.storage import DefaultStorage
 from django.db import transaction, reset_queries
@@ -30,6 +31,7 @@ from courseware.module_render import get_module_for_descriptor_internal
 from instructor_analytics.basic import enrolled_students_features
 from instructor_analytics.csvs import format_dictlist
 from instructor_task.models import ReportStore, InstructorTask, PROGRESS
+from instructor_task.subtasks import queue_subtasks_for_query
 from lms.djangoapps.lms_xblock.runtime import LmsPartitionService
 from openedx.core.djangoapps.course_groups.cohorts import get_cohort
 from openedx.core.djangoapps.course_groups.models import CourseUserGroup
@@ -263,41 +265,13 @@ def run_main_task(entry_id, task_fcn, action_name):
     return task_progress
 
 
-def perform_module_state_update(update_fcn, filter_fcn, _entry_id, course_id, task_input, action_name):
+def _get_problems_and_modules_to_update(course_id, task_input, filter_fcn):
     """
-    Performs generic update by visiting StudentModule instances with the update_fcn provided.
-
-    StudentModule instances are those that match the specified `course_id` and `module_state_key`.
-    If `student_identifier` is not None, it is used as an additional filter to limit the modules to those belonging
-    to that student. If `student_identifier` is None, performs update on modules for all students on the specified problem.
-
-    If a `filter_fcn` is not None, it is applied to the query that has been constructed.  It takes one
-    argument, which is the query being filtered, and returns the filtered version of the query.
-
-    The `update_fcn` is called on each StudentModule that passes the resulting filtering.
-    It is passed three arguments:  the module_descriptor for the module pointed to by the
-    module_state_key, the particular StudentModule to update, and the xmodule_instance_args being
-    passed through.  If the value returned by the update function evaluates to a boolean True,
-    the update is successful; False indicates the update on the particular student module failed.
-    A raised exception indicates a fatal condition -- that no other student modules should be considered.
-
-    The return value is a dict containing the task's results, with the following keys:
-
-          'attempted': number of attempts made
-          'succeeded': number of attempts that "succeeded"
-          'skipped': number of attempts that "skipped"
-          'failed': number of attempts that "failed"
-          'total': number of possible updates to attempt
-          'action_name': user-visible verb to use in status messages.  Should be past-tense.
-              Pass-through of input `action_name`.
-          'duration_ms': how long the task has (or had) been running.
-
-    Because this is run internal to a task, it does not catch exceptions.  These are allowed to pass up to the
-    next level, so that it can set the failure modes and capture the error trace in the InstructorTask and the
-    result object.
+    Returns the problems and StudentModules that a module state update with the given `task_input` applies to.
 
+    The problems are returned as a dict mapping usage key strings to descriptors; the StudentModules as a
+    queryset.  See perform_module_state_update for the meaning of `task_input` and `filter_fcn`.
     """
-    start_time = time()
     usage_keys = []
     problem_url = task_input.get('problem_url')
     entrance_exam_url = task_input.get('entrance_exam_url')
@@ -338,30 +312,186 @@ def perform_module_state_update(update_fcn, filter_fcn, _entry_id, course_id, ta
     if filter_fcn is not None:
         modules_to_update = filter_fcn(modules_to_update)
 
+    return problems, modules_to_update
+
+
+def _iterate_in_chunks(modules_to_update, chunk_size):
+    """
+    Yields the StudentModules of the `modules_to_update` queryset as lists of at most `chunk_size` modules,
+    with their students already loaded.
+
+    Each chunk is fetched with its own query, so that large updates don't hold every StudentModule
+    (and its state) in memory at once.
+    """
+    modules_to_update = modules_to_update.select_related('student').order_by('id')
+    last_id = None
+    while True:
+        chunk_query = modules_to_update if last_id is None else modules_to_update.filter(id__gt=last_id)
+        chunk = list(chunk_query[:chunk_size])
+        if not chunk:
+            return
+        yield chunk
+        last_id = chunk[-1].id
+
+
+def _count_update_status(task_progress, update_status):
+    """
+    Adds the status returned by an update function to the counts of `task_progress`, a TaskProgress.
+    """
+    if update_status == UPDATE_STATUS_SUCCEEDED:
+        # If the update_fcn returns true, then it performed some kind of work.
+        # Logging of failures is left to the update_fcn itself.
+        task_progress.succeeded += 1
+    elif update_status == UPDATE_STATUS_FAILED:
+        task_progress.failed += 1
+    elif update_status == UPDATE_STATUS_SKIPPED:
+        task_progress.skipped += 1
+    else:
+        raise UpdateProblemModuleStateError("Unexpected update_status returned: {}".format(update_status))
+
+
+def perform_module_state_update(update_fcn, filter_fcn, _entry_id, course_id, task_input, action_name):
+    """
+    Performs generic update by visiting StudentModule instances with the update_fcn provided.
+
+    StudentModule instances are those that match the specified `course_id` and `module_state_key`.
+    If `student_identifier` is not None, it is used as an additional filter to limit the modules to those belonging
+    to that student. If `student_identifier` is None, performs update on modules for all students on the specified problem.
+
+    If a `filter_fcn` is not None, it is applied to the query that has been constructed.  It takes one
+    argument, which is the query being filtered, and returns the filtered version of the query.
+
+    The `update_fcn` is called on each StudentModule that passes the resulting filtering.
+    It is passed three arguments:  the module_descriptor for the module pointed to by the
+    module_state_key, the particular StudentModule to update, and the xmodule_instance_args being
+    passed through.  If the value returned by the update function evaluates to a boolean True,
+    the update is successful; False indicates the update on the particular student module failed.
+    A raised exception indicates a fatal condition -- that no other student modules should be considered.
+
+    The return value is a dict containing the task's results, with the following keys:
+
+          'attempted': number of attempts made
+          'succeeded': number of attempts that "succeeded"
+          'skipped': number of attempts that "skipped"
+          'failed': number of attempts that "failed"
+          'total': number of possible updates to attempt
+          'action_name': user-visible verb to use in status messages.  Should be past-tense.
+              Pass-through of input `action_name`.
+          'duration_ms': how long the task has (or had) been running.
+
+    Because this is run internal to a task, it does not catch exceptions.  These are allowed to pass up to the
+    next level, so that it can set the failure modes and capture the error trace in the InstructorTask and the
+    result object.
+
+    """
+    start_time = time()
+    problems, modules_to_update = _get_problems_and_modules_to_update(course_id, task_input, filter_fcn)
+
     task_progress = TaskProgress(action_name, modules_to_update.count(), start_time)
     task_progress.update_task_state()
 
-    for module_to_update in modules_to_update:
-        task_progress.attempted += 1
-        module_descriptor = problems[unicode(module_to_update.module_state_key)]
-        # There is no try here:  if there's an error, we let it throw, and the task will
-        # be marked as FAILED, with a stack trace.
-        with dog_stats_api.timer('instructor_tasks.module.time.step', tags=[u'action:{name}'.format(name=action_name)]):
-            update_status = update_fcn(module_descriptor, module_to_update)
-            if update_status == UPDATE_STATUS_SUCCEEDED:
-                # If the update_fcn returns true, then it performed some kind of work.
-                # Logging of failures is left to the update_fcn itself.
-                task_progress.succeeded += 1
-            elif update_status == UPDATE_STATUS_FAILED:
-                task_progress.failed += 1
-            elif update_status == UPDATE_STATUS_SKIPPED:
-                task_progress.skipped += 1
-            else:
-                raise UpdateProblemModuleStateError("Unexpected update_status returned: {}".format(update_status))
+    for module_chunk in _iterate_in_chunks(modules_to_update, settings.INSTRUCTOR_TASK_MODULE_CHUNK_SIZE):
+        for module_to_update in module_chunk:
+            task_progress.attempted += 1
+            module_descriptor = problems[unicode(module_to_update.module_state_key)]
+            # There is no try here:  if there's an error, we let it throw, and the task will
+            # be marked as FAILED, with a stack trace.
+            with dog_stats_api.timer('instructor_tasks.module.time.step', tags=[u'action:{name}'.format(name=action_name)]):
+                update_status = update_fcn(module_descriptor, module_to_update)
+                _count_update_status(task_progress, update_status)
+
+    return task_progress.update_task_state()
+
+
+def perform_batched_rescore(xmodule_instance_args, filter_fcn, entry_id, course_id, task_input, action_name):
+    """
+    Rescores the StudentModules selected by `task_input` and `filter_fcn` (see perform_module_state_update).
+
+    StudentModules are rescored in chunks of settings.INSTRUCTOR_TASK_MODULE_CHUNK_SIZE; see
+    rescore_problem_module_states.  If there are more than settings.INSTRUCTOR_TASK_RESCORE_MODULES_PER_TASK
+    of them, the work is split between rescore_problem_subtask tasks instead, which report their progress
+    to the InstructorTask themselves.
+
+    Returns the task progress dict, as perform_module_state_update does.
+    """
+    # Import here to avoid a circular import.
+    from instructor_task.tasks import rescore_problem_subtask
+
+    start_time = time()
+    problems, modules_to_update = _get_problems_and_modules_to_update(course_id, task_input, filter_fcn)
+    total = modules_to_update.count()
+    modules_per_task = settings.INSTRUCTOR_TASK_RESCORE_MODULES_PER_TASK
+
+    if total > modules_per_task:
+        entry = InstructorTask.objects.get(pk=entry_id)
+        if len(entry.subtasks) > 0 and len(entry.task_output) > 0:
+            # The task was requeued after its subtasks had been queued, so let them finish.
+            TASK_LOG.warning(u"Task %s has already queued its rescoring subtasks! InstructorTask = %s",
+                             entry.task_id, entry)
+            return json.loads(entry.task_output)
+
+        def _create_rescore_subtask(module_list, initial_subtask_status):
+            """Creates a subtask to rescore the given StudentModules."""
+            return rescore_problem_subtask.subtask(
+                (
+                    entry_id,
+                    [module['pk'] for module in module_list],
+                    xmodule_instance_args,
+                    initial_subtask_status.to_dict(),
+                ),
+                task_id=initial_subtask_status.task_id,
+            )
+
+        return queue_subtasks_for_query(
+            entry,
+            action_name,
+            _create_rescore_subtask,
+            [modules_to_update.order_by('id')],
+            [],
+            modules_per_task,
+            total,
+        )
+
+    task_progress = TaskProgress(action_name, total, start_time)
+    task_progress.update_task_state()
+
+    for module_chunk in _iterate_in_chunks(modules_to_update, settings.INSTRUCTOR_TASK_MODULE_CHUNK_SIZE):
+        with dog_stats_api.timer('instructor_tasks.module.time.chunk', tags=[u'action:{name}'.format(name=action_name)]):
+            update_statuses = rescore_problem_module_states(xmodule_instance_args, problems, module_chunk)
+        for update_status in update_statuses:
+            task_progress.attempted += 1
+            _count_update_status(task_progress, update_status)
+        task_progress.update_task_state()
 
     return task_progress.update_task_state()
 
 
+def perform_rescore_subtask(entry_id, module_ids, xmodule_instance_args, subtask_status):
+    """
+    Rescores the StudentModules with the given ids, as one of the subtasks of a rescoring InstructorTask.
+
+    Returns the updated SubtaskStatus.  As with perform_module_state_update, exceptions are not caught.
+    """
+    entry = InstructorTask.objects.get(pk=entry_id)
+    problems, modules_to_update = _get_problems_and_modules_to_update(
+        entry.course_id, json.loads(entry.task_input), None
+    )
+    modules_to_update = modules_to_update.filter(id__in=module_ids)
+
+    num_rescored = 0
+    for module_chunk in _iterate_in_chunks(modules_to_update, settings.INSTRUCTOR_TASK_MODULE_CHUNK_SIZE):
+        update_statuses = rescore_problem_module_states(xmodule_instance_args, problems, module_chunk)
+        num_rescored += len(update_statuses)
+        subtask_status.increment(
+            succeeded=update_statuses.count(UPDATE_STATUS_SUCCEEDED),
+            failed=update_statuses.count(UPDATE_STATUS_FAILED),
+        )
+
+    # StudentModules deleted since the subtask was queued count as skipped.
+    subtask_status.increment(skipped=len(module_ids) - num_rescored, state=SUCCESS)
+    return subtask_status
+
+
 def _get_task_id_from_xmodule_args(xmodule_instance_args):
     """Gets task_id from `xmodule_instance_args` dict, or returns default value if missing."""
     return xmodule_instance_args.get('task_id', UNKNOWN_TASK_ID) if xmodule_instance_args is not None else UNKNOWN_TASK_ID
@@ -389,16 +519,19 @@ def _get_track_function_for_task(student, xmodule_instance_args=None, source_pag
 
 
 def _get_module_instance_for_task(course_id, student, module_descriptor, xmodule_instance_args=None,
-                                  grade_bucket_type=None):
+                                  grade_bucket_type=None, field_data_cache=None):
     """
     Fetches a StudentModule instance for a given `course_id`, `student` object, and `module_descriptor`.
 
     `xmodule_instance_args` is used to provide information for creating a track function and an XQueue callback.
     These are passed, along with `grade_bucket_type`, to get_module_for_descriptor_internal, which sidesteps
     the need for a Request object when instantiating an xmodule instance.
+
+    If no `field_data_cache` is given, one is loaded for the module and its descendents.
     """
     # reconstitute the problem's corresponding XModule:
-    field_data_cache = FieldDataCache.cache_for_descriptor_descendents(course_id, student, module_descriptor)
+    if field_data_cache is None:
+        field_data_cache = FieldDataCache.cache_for_descriptor_descendents(course_id, student, module_descriptor)
 
     # get request-related tracking information from args passthrough, and supplement with task-specific
     # information:
@@ -444,11 +577,68 @@ def rescore_problem_module_state(xmodule_instance_args, module_descriptor, stude
     Returns True if problem was successfully rescored for the given student, and False
     if problem encountered some kind of error in rescoring.
     '''
+    instance = _get_module_instance_for_task(
+        student_module.course_id,
+        student_module.student,
+        module_descriptor,
+        xmodule_instance_args,
+        grade_bucket_type='rescore'
+    )
+    return _rescore_module_instance(instance, student_module)
+
+
+def _student_module_seed(student_module):
+    """
+    Returns the random seed stored in the state of a problem's StudentModule, or None.
+    """
+    try:
+        return json.loads(student_module.state).get('seed') if student_module.state else None
+    except ValueError:
+        return None
+
+
+def rescore_problem_module_states(xmodule_instance_args, problems, student_modules):
+    """
+    Rescores a chunk of StudentModules, and returns the list of their update statuses.
+
+    `problems` maps usage key strings to the descriptors of the problems that the StudentModules belong to.
+
+    This does the work of rescore_problem_module_state for many students at once: the modules are
+    grouped by problem and by seed, so that the (cached) parsing and script execution of each problem
+    variant is reused by consecutive students, the already loaded StudentModules are used instead of
+    querying for each student's state, and all of the chunk's writes are committed together.
+    """
+    student_modules = sorted(
+        student_modules,
+        key=lambda student_module: (unicode(student_module.module_state_key), _student_module_seed(student_module))
+    )
+    update_statuses = []
+    with transaction.commit_on_success():
+        for student_module in student_modules:
+            module_descriptor = problems[unicode(student_module.module_state_key)]
+            instance = _get_module_instance_for_task(
+                student_module.course_id,
+                student_module.student,
+                module_descriptor,
+                xmodule_instance_args,
+                grade_bucket_type='rescore',
+                field_data_cache=FieldDataCache.cache_for_student_module(module_descriptor, student_module),
+            )
+            update_statuses.append(_rescore_module_instance(instance, student_module))
+    return update_statuses
+
+
+def _rescore_module_instance(instance, student_module):
+    """
+    Rescores the problem `instance` loaded for the given StudentModule, and saves its new state.
+
+    Raises UpdateProblemModuleStateError if the module could not be loaded or doesn't support rescoring;
+    otherwise returns the update status.
+    """
     # unpack the StudentModule:
     course_id = student_module.course_id
     student = student_module.student
     usage_key = student_module.module_state_key
-    instance = _get_module_instance_for_task(course_id, student, module_descriptor, xmodule_instance_args, grade_bucket_type='rescore')
 
     if instance is None:
         # Either permissions just changed, or someone is trying to be clever
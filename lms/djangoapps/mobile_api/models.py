@@ -25,3 +25,8 @@ class MobileApiConfig(ConfigurationModel):
         Get the list of profiles in priority order when requesting from VAL
         """
         return [profile.strip() for profile in cls.current().video_profiles.split(",") if profile]  # pylint: disable=no-member
+
+
+# Signals must be imported in a file that is automatically loaded at app startup (e.g. models.py). We import them
+# at the end of this file to avoid circular dependencies.
+from mobile_api.video_outlines import signals  # pylint: disable=unused-import
@@ -1,10 +1,12 @@
 """
 Serializer for video outline
 """
+from django.core.cache import cache
 from rest_framework.reverse import reverse
 
+from xmodule.modulestore.django import modulestore
 from xmodule.modulestore.mongo.base import BLOCK_TYPES_WITH_CHILDREN
-from courseware.access import has_access
+from courseware.access import has_access, can_load_with_access_fields, get_access_fields
 from courseware.model_data import FieldDataCache
 from courseware.module_render import get_module_for_descriptor
 from util.module_utils import get_dynamic_descriptor_children
@@ -13,10 +15,19 @@ from edxval.api import (
     get_video_info_for_course_and_profiles, ValInternalError
 )
 
+# Outlines are regenerated whenever the course changes, so this only bounds how long unused outlines are kept.
+OUTLINE_CACHE_TIMEOUT = 24 * 60 * 60
+# Number of outline entries cached together, which keeps each cache value well under memcached's 1MB limit even
+# for courses with thousands of videos.
+OUTLINE_CACHE_CHUNK_SIZE = 100
+
 
 class BlockOutline(object):
     """
     Serializes course videos, pulling data from VAL and the video modules.
+
+    The request-independent part of the outline (paths, URLs, block data, and the data needed to check access) is
+    computed once per course version by get_block_outline; iterating only filters it for the requesting user.
     """
     def __init__(self, course_id, start_block, block_types, request, video_profiles):
         """Create a BlockOutline using `start_block` as a starting point."""
@@ -33,65 +44,201 @@ class BlockOutline(object):
             self.local_cache['course_videos'] = {}
 
     def __iter__(self):
-        def parent_or_requested_block_type(usage_key):
-            """
-            Returns whether the usage_key's block_type is one of self.block_types or a parent type.
-            """
-            return (
-                usage_key.block_type in self.block_types or
-                usage_key.block_type in BLOCK_TYPES_WITH_CHILDREN
-            )
+        access_checker = OutlineAccessChecker(self.course_id, self.start_block, self.request)
 
-        def create_module(descriptor):
-            """
-            Factory method for creating and binding a module for the given descriptor.
-            """
-            field_data_cache = FieldDataCache.cache_for_descriptor_descendents(
-                self.course_id, self.request.user, descriptor, depth=0,
-            )
-            return get_module_for_descriptor(
-                self.request.user, self.request, descriptor, field_data_cache, self.course_id
-            )
+        for entry in get_block_outline(self.start_block):
+            if entry["category"] not in self.block_types:
+                continue
 
-        child_to_parent = {}
-        stack = [self.start_block]
-        while stack:
-            curr_block = stack.pop()
-
-            if curr_block.hide_from_toc:
-                # For now, if the 'hide_from_toc' setting is set on the block, do not traverse down
-                # the hierarchy.  The reason being is that these blocks may not have human-readable names
-                # to display on the mobile clients.
-                # Eventually, we'll need to figure out how we want these blocks to be displayed on the
-                # mobile clients.  As they are still accessible in the browser, just not navigatable
-                # from the table-of-contents.
+            if not access_checker.can_load(entry):
                 continue
 
-            if curr_block.location.block_type in self.block_types:
-                if not has_access(self.request.user, 'load', curr_block, course_key=self.course_id):
-                    continue
-
-                summary_fn = self.block_types[curr_block.category]
-                block_path = list(path(curr_block, child_to_parent, self.start_block))
-                unit_url, section_url = find_urls(self.course_id, curr_block, child_to_parent, self.request)
-
-                yield {
-                    "path": block_path,
-                    "named_path": [b["name"] for b in block_path],
-                    "unit_url": unit_url,
-                    "section_url": section_url,
-                    "summary": summary_fn(self.course_id, curr_block, self.request, self.local_cache)
-                }
-
-            if curr_block.has_children:
-                children = get_dynamic_descriptor_children(
-                    curr_block,
-                    create_module,
-                    usage_key_filter=parent_or_requested_block_type
+            summary_fn = self.block_types[entry["category"]]
+            yield {
+                "path": entry["path"],
+                "named_path": [b["name"] for b in entry["path"]],
+                "unit_url": self.request.build_absolute_uri(entry["unit_url"]),
+                "section_url": self.request.build_absolute_uri(entry["section_url"]),
+                "summary": summary_fn(self.course_id, entry["info"], self.request, self.local_cache)
+            }
+
+
+class OutlineAccessChecker(object):
+    """
+    Applies the 'load' access rule of courseware.access to outline entries for a single user, using the
+    AccessFields cached with the outline instead of the blocks themselves.
+    """
+    def __init__(self, course_id, start_block, request):
+        self.course_id = course_id
+        self.start_block = start_block
+        self.request = request
+        self.user = request.user
+        self._is_staff = None
+        self._user_groups = {}
+        self._dynamic_children = {}
+
+    @property
+    def is_staff(self):
+        """
+        Whether the user has staff access to the course.
+        """
+        if self._is_staff is None:
+            self._is_staff = has_access(self.user, 'staff', self.start_block, course_key=self.course_id)
+        return self._is_staff
+
+    def can_load(self, entry):
+        """
+        Returns whether the user may load the block of the given outline entry.
+        """
+        for ancestor_key, child_key in entry["dynamic_ancestors"]:
+            if child_key not in self._get_dynamic_children(ancestor_key):
+                return False
+
+        return can_load_with_access_fields(
+            self.user, entry["access"], self.course_id, self.start_block.user_partitions,
+            lambda: self.is_staff, self._user_groups
+        )
+
+    def _get_dynamic_children(self, usage_key):
+        """
+        Returns the set of child usage keys the user is shown by the block with dynamic children (e.g. split_test).
+        """
+        if usage_key not in self._dynamic_children:
+            descriptor = modulestore().get_item(usage_key, depth=1)
+
+            def create_module(descriptor):
+                """
+                Factory method for creating and binding a module for the given descriptor.
+                """
+                field_data_cache = FieldDataCache.cache_for_descriptor_descendents(
+                    self.course_id, self.user, descriptor, depth=0,
+                )
+                return get_module_for_descriptor(
+                    self.user, self.request, descriptor, field_data_cache, self.course_id
                 )
-                for block in reversed(children):
-                    stack.append(block)
-                    child_to_parent[block] = curr_block
+
+            self._dynamic_children[usage_key] = set(
+                child.location for child in get_dynamic_descriptor_children(descriptor, create_module)
+            )
+        return self._dynamic_children[usage_key]
+
+
+def get_block_outline(start_block):
+    """
+    Returns the cached request-independent outline of the blocks below start_block, computing it if necessary.
+    """
+    outline = _get_cached_outline(_outline_cache_key(start_block))
+    if outline is None:
+        outline = cache_block_outline(modulestore().get_item(start_block.location, depth=None))
+    return outline
+
+
+def cache_block_outline(start_block):
+    """
+    Computes and caches the outline of the blocks below start_block, which must be loaded with all its descendants.
+
+    The outline is cached in chunks of OUTLINE_CACHE_CHUNK_SIZE entries, under keys derived from the outline's key,
+    which holds the number of chunks.
+    """
+    outline = list(_compute_block_outline(start_block))
+    cache_key = _outline_cache_key(start_block)
+    chunks = {
+        _outline_chunk_cache_key(cache_key, index): outline[offset:offset + OUTLINE_CACHE_CHUNK_SIZE]
+        for index, offset in enumerate(xrange(0, len(outline), OUTLINE_CACHE_CHUNK_SIZE))
+    }
+    chunks[cache_key] = len(chunks)
+    cache.set_many(chunks, OUTLINE_CACHE_TIMEOUT)
+    return outline
+
+
+def _get_cached_outline(cache_key):
+    """
+    Returns the outline cached under the given key, or None unless all of its chunks are cached.
+    """
+    chunk_count = cache.get(cache_key)
+    if chunk_count is None:
+        return None
+    chunk_keys = [_outline_chunk_cache_key(cache_key, index) for index in xrange(chunk_count)]
+    chunks = cache.get_many(chunk_keys)
+    if len(chunks) < chunk_count:
+        return None
+    return [entry for chunk_key in chunk_keys for entry in chunks[chunk_key]]
+
+
+def _outline_chunk_cache_key(cache_key, index):
+    """
+    Cache key for a chunk of the outline cached under the given key.
+    """
+    return u'{}.{}'.format(cache_key, index)
+
+
+def _outline_cache_key(start_block):
+    """
+    Cache key for the outline of the given block. It includes the time of the latest edit below the block, so that
+    each version of the content gets its own entry.
+    """
+    # Blocks from modulestores without edit info (i.e. XML) never change.
+    version = getattr(start_block, 'subtree_edited_on', None)
+    return u'mobile_api.video_outline.{}.{}'.format(
+        start_block.location, version.isoformat() if version else None
+    )
+
+
+def _compute_block_outline(start_block):
+    """
+    Yields an outline entry for each block with an info function in BLOCK_INFO_FUNCTIONS below start_block.
+
+    Blocks with dynamic children (e.g. split_test) are traversed through all their children; each entry records
+    such ancestors so that the user's actual children can be checked when filtering.
+    """
+    def parent_or_requested_block_type(usage_key):
+        """
+        Returns whether the usage_key's block_type is one of BLOCK_INFO_FUNCTIONS or a parent type.
+        """
+        return (
+            usage_key.block_type in BLOCK_INFO_FUNCTIONS or
+            usage_key.block_type in BLOCK_TYPES_WITH_CHILDREN
+        )
+
+    child_to_parent = {}
+    dynamic_ancestors = {start_block: []}
+    stack = [start_block]
+    while stack:
+        curr_block = stack.pop()
+
+        if curr_block.hide_from_toc:
+            # For now, if the 'hide_from_toc' setting is set on the block, do not traverse down
+            # the hierarchy.  The reason being is that these blocks may not have human-readable names
+            # to display on the mobile clients.
+            # Eventually, we'll need to figure out how we want these blocks to be displayed on the
+            # mobile clients.  As they are still accessible in the browser, just not navigatable
+            # from the table-of-contents.
+            continue
+
+        if curr_block.location.block_type in BLOCK_INFO_FUNCTIONS:
+            info_fn = BLOCK_INFO_FUNCTIONS[curr_block.category]
+            unit_url, section_url = find_urls(start_block.location.course_key, curr_block, child_to_parent, None)
+
+            yield {
+                "category": curr_block.category,
+                "path": list(path(curr_block, child_to_parent, start_block)),
+                "unit_url": unit_url,
+                "section_url": section_url,
+                "info": info_fn(curr_block),
+                "access": get_access_fields(curr_block),
+                "dynamic_ancestors": dynamic_ancestors[curr_block],
+            }
+
+        if curr_block.has_children:
+            children = curr_block.get_children(usage_key_filter=parent_or_requested_block_type)
+            child_ancestors = dynamic_ancestors[curr_block]
+            for block in reversed(children):
+                stack.append(block)
+                child_to_parent[block] = curr_block
+                if curr_block.has_dynamic_children():
+                    dynamic_ancestors[block] = child_ancestors + [(curr_block.location, block.location)]
+                else:
+                    dynamic_ancestors[block] = child_ancestors
 
 
 def path(block, child_to_parent, start_block):
@@ -159,18 +306,40 @@ def find_urls(course_id, block, child_to_parent, request):
     return unit_url, section_url
 
 
-def video_summary(video_profiles, course_id, video_descriptor, request, local_cache):
+def video_info(video_descriptor):
     """
-    returns summary dict for the given video module
+    returns the request-independent data of the given video module needed by video_summary
     """
-    always_available_data = {
+    if video_descriptor.html5_sources:
+        fallback_url = video_descriptor.html5_sources[0]
+    else:
+        fallback_url = video_descriptor.source
+
+    return {
         "name": video_descriptor.display_name,
         "category": video_descriptor.category,
         "id": unicode(video_descriptor.scope_ids.usage_id),
+        "block_id": video_descriptor.scope_ids.usage_id.block_id,
         "only_on_web": video_descriptor.only_on_web,
+        "edx_video_id": video_descriptor.edx_video_id,
+        "fallback_url": fallback_url,
+        "transcript_languages": video_descriptor.available_translations(verify_assets=False),
+        "language": video_descriptor.get_default_transcript_language(),
     }
 
-    if video_descriptor.only_on_web:
+
+def video_summary(video_profiles, course_id, video, request, local_cache):
+    """
+    returns summary dict for the given video, as returned by video_info
+    """
+    always_available_data = {
+        "name": video["name"],
+        "category": video["category"],
+        "id": video["id"],
+        "only_on_web": video["only_on_web"],
+    }
+
+    if video["only_on_web"]:
         ret = {
             "video_url": None,
             "video_thumbnail_url": None,
@@ -183,7 +352,7 @@ def video_summary(video_profiles, course_id, video_descriptor, request, local_ca
         return ret
 
     # Get encoded videos
-    video_data = local_cache['course_videos'].get(video_descriptor.edx_video_id, {})
+    video_data = local_cache['course_videos'].get(video["edx_video_id"], {})
 
     # Get highest priority video to populate backwards compatible field
     default_encoded_video = {}
@@ -197,29 +366,25 @@ def video_summary(video_profiles, course_id, video_descriptor, request, local_ca
     if default_encoded_video:
         video_url = default_encoded_video['url']
     # Then fall back to VideoDescriptor fields for video URLs
-    elif video_descriptor.html5_sources:
-        video_url = video_descriptor.html5_sources[0]
     else:
-        video_url = video_descriptor.source
+        video_url = video["fallback_url"]
 
     # Get duration/size, else default
     duration = video_data.get('duration', None)
     size = default_encoded_video.get('file_size', 0)
 
     # Transcripts...
-    transcript_langs = video_descriptor.available_translations(verify_assets=False)
-
     transcripts = {
         lang: reverse(
             'video-transcripts-detail',
             kwargs={
                 'course_id': unicode(course_id),
-                'block_id': video_descriptor.scope_ids.usage_id.block_id,
+                'block_id': video["block_id"],
                 'lang': lang
             },
             request=request,
         )
-        for lang in transcript_langs
+        for lang in video["transcript_languages"]
     }
 
     ret = {
@@ -228,8 +393,14 @@ def video_summary(video_profiles, course_id, video_descriptor, request, local_ca
         "duration": duration,
         "size": size,
         "transcripts": transcripts,
-        "language": video_descriptor.get_default_transcript_language(),
+        "language": video["language"],
         "encoded_videos": video_data.get('profiles')
     }
     ret.update(always_available_data)
     return ret
+
+
+# Functions returning the request-independent data of each block type included in outlines.
+BLOCK_INFO_FUNCTIONS = {
+    "video": video_info,
+}
@@ -0,0 +1,17 @@
+"""
+Signal handlers for precomputing video outlines.
+"""
+from django.dispatch.dispatcher import receiver
+
+from xmodule.modulestore.django import SignalHandler
+
+
+@receiver(SignalHandler.course_published)
+def listen_for_course_publish(sender, course_key, **kwargs):  # pylint: disable=unused-argument
+    """
+    Precomputes the video outline of the newly published version of the course.
+    """
+    # Import tasks here to avoid a circular import.
+    from .tasks import update_video_outline
+
+    update_video_outline.apply_async([unicode(course_key)], countdown=0)
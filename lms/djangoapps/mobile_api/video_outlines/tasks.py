@@ -0,0 +1,29 @@
+"""
+Tasks for precomputing video outlines.
+"""
+import logging
+
+from celery.task import task
+from opaque_keys.edx.keys import CourseKey
+from xmodule.modulestore import ModuleStoreEnum
+from xmodule.modulestore.django import modulestore
+
+from .serializers import cache_block_outline
+
+
+log = logging.getLogger('edx.celery.task')
+
+
+@task(name=u'mobile_api.video_outlines.tasks.update_video_outline')
+def update_video_outline(course_id):
+    """
+    Computes and caches the video outline of the published version of the course.
+    """
+    course_key = CourseKey.from_string(course_id)
+    store = modulestore()
+    with store.branch_setting(ModuleStoreEnum.Branch.published_only, course_key):
+        course = store.get_course(course_key, depth=None)
+        if course is None:
+            log.warning('Unable to compute video outline for %s: course not found.', course_id)
+            return
+        cache_block_outline(course)
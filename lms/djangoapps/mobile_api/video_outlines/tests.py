@@ -7,6 +7,7 @@ import ddt
 import itertools
 from uuid import uuid4
 from collections import namedtuple
+from mock import patch
 
 from edxval import api
 from mobile_api.models import MobileApiConfig
@@ -861,6 +862,47 @@ class TestVideoSummaryList(
                 set(case.expected_transcripts)
             )
 
+    def test_outline_cached(self):
+        """
+        The request-independent outline should be computed once per version of the course.
+        """
+        self.login_and_enroll()
+        self._create_video_with_subs()
+        first_outline = self.api_response().data
+
+        with patch('mobile_api.video_outlines.serializers._compute_block_outline') as compute_outline:
+            self.assertEqual(self.api_response().data, first_outline)
+            self.assertFalse(compute_outline.called)
+
+        # Changing the course creates a new version, so the new video should be included.
+        ItemFactory.create(
+            parent=self.other_unit,
+            category="video",
+            edx_video_id=self.edx_video_id,
+            display_name=u"another video"
+        )
+        self.assertEqual(len(self.api_response().data), 2)
+
+    @patch('mobile_api.video_outlines.serializers.OUTLINE_CACHE_CHUNK_SIZE', 1)
+    def test_outline_cached_in_chunks(self):
+        """
+        Outlines too big for a single cache value should be cached and read back in chunks.
+        """
+        self.login_and_enroll()
+        self._create_video_with_subs()
+        ItemFactory.create(
+            parent=self.other_unit,
+            category="video",
+            edx_video_id=self.edx_video_id,
+            display_name=u"another video"
+        )
+        first_outline = self.api_response().data
+        self.assertEqual(len(first_outline), 2)
+
+        with patch('mobile_api.video_outlines.serializers._compute_block_outline') as compute_outline:
+            self.assertEqual(self.api_response().data, first_outline)
+            self.assertFalse(compute_outline.called)
+
 
 class TestTranscriptsDetail(
     TestVideoAPITestCase, MobileAuthTestMixin, MobileEnrolledCourseAccessTestMixin, TestVideoAPIMixin  # pylint: disable=bad-continuation
@@ -77,7 +77,7 @@ class VideoSummaryList(generics.ListAPIView):
                 * size: The size of the video file
     """
 
-    @mobile_course_access(depth=None)
+    @mobile_course_access()
     def list(self, request, course, *args, **kwargs):
         video_profiles = MobileApiConfig.get_video_profiles()
         video_outline = list(
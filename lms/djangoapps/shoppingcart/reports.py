@@ -1,16 +1,21 @@
 """ Objects and functions related to generating CSV reports """
 
+from collections import defaultdict
+from datetime import datetime
 from decimal import Decimal
+
+import pytz
 import unicodecsv
 
+from django.db.models import Count, Q, Sum
 from django.utils.translation import ugettext as _
+from opaque_keys.edx.keys import CourseKey
 
-from courseware.courses import get_course_by_id
 from course_modes.models import CourseMode
+from openedx.core.djangoapps.content.course_overviews.models import CourseOverview
 from shoppingcart.models import CertificateItem, OrderItem
 from student.models import CourseEnrollment
 from util.query import use_read_replica_if_available
-from xmodule.modulestore.django import modulestore
 
 
 class Report(object):
@@ -152,13 +157,20 @@ class CertificateStatusReport(Report):
     gross revenue, gross revenue over the minimum, and total dollars refunded.
     """
     def rows(self):
-        for course_id in course_ids_between(self.start_word, self.end_word):
+        courses = courses_between(self.start_word, self.end_word)
+        course_ids = [course.id for course in courses]
+        enrollment_counts = _enrollment_counts(course_ids)
+        certificate_totals = _verified_certificate_totals(course_ids)
+        contributing_over_min = _verified_certificates_contributing_more_than_minimum(course_ids)
+        min_prices = _min_verified_prices(course_ids, 'usd')
+
+        for course in courses:
             # If the first letter of the university is between start_word and end_word, then we include
             # it in the report.  These comparisons are unicode-safe.
-            cur_course = get_course_by_id(course_id)
-            university = cur_course.org
-            course = cur_course.number + " " + cur_course.display_name_with_default  # TODO add term (i.e. Fall 2013)?
-            counts = CourseEnrollment.enrollment_counts(course_id)
+            university = course.org
+            course_name = _course_name(course)  # TODO add term (i.e. Fall 2013)?
+            counts = enrollment_counts[course.id]
+            totals = certificate_totals[course.id]
             total_enrolled = counts['total']
             audit_enrolled = counts['audit']
             honor_enrolled = counts['honor']
@@ -169,17 +181,17 @@ class CertificateStatusReport(Report):
                 gross_rev_over_min = Decimal(0.00)
             else:
                 verified_enrolled = counts['verified']
-                gross_rev = CertificateItem.verified_certificates_monetary_field_sum(course_id, 'purchased', 'unit_cost')
-                gross_rev_over_min = gross_rev - (CourseMode.min_course_price_for_verified_for_currency(course_id, 'usd') * verified_enrolled)
+                gross_rev = totals['purchased']['unit_cost']
+                gross_rev_over_min = gross_rev - (min_prices.get(course.id, 0) * verified_enrolled)
 
-            num_verified_over_the_minimum = CertificateItem.verified_certificates_contributing_more_than_minimum(course_id)
+            num_verified_over_the_minimum = contributing_over_min.get(course.id, 0)
 
             # should I be worried about is_active here?
-            number_of_refunds = CertificateItem.verified_certificates_count(course_id, 'refunded')
+            number_of_refunds = totals['refunded']['count']
             if number_of_refunds == 0:
                 dollars_refunded = Decimal(0.00)
             else:
-                dollars_refunded = CertificateItem.verified_certificates_monetary_field_sum(course_id, 'refunded', 'unit_cost')
+                dollars_refunded = totals['refunded']['unit_cost']
 
             course_announce_date = ""
             course_reg_start_date = ""
@@ -188,7 +200,7 @@ class CertificateStatusReport(Report):
 
             yield [
                 university,
-                course,
+                course_name,
                 course_announce_date,
                 course_reg_start_date,
                 course_reg_close_date,
@@ -234,19 +246,20 @@ class UniversityRevenueShareReport(Report):
     total payments collected, service fees, number of refunds, and total amount of refunds.
     """
     def rows(self):
-        for course_id in course_ids_between(self.start_word, self.end_word):
-            cur_course = get_course_by_id(course_id)
-            university = cur_course.org
-            course = cur_course.number + " " + cur_course.display_name_with_default
-            total_payments_collected = CertificateItem.verified_certificates_monetary_field_sum(course_id, 'purchased', 'unit_cost')
-            service_fees = CertificateItem.verified_certificates_monetary_field_sum(course_id, 'purchased', 'service_fee')
-            num_refunds = CertificateItem.verified_certificates_count(course_id, "refunded")
-            amount_refunds = CertificateItem.verified_certificates_monetary_field_sum(course_id, 'refunded', 'unit_cost')
-            num_transactions = (num_refunds * 2) + CertificateItem.verified_certificates_count(course_id, "purchased")
+        courses = courses_between(self.start_word, self.end_word)
+        certificate_totals = _verified_certificate_totals([course.id for course in courses])
+
+        for course in courses:
+            totals = certificate_totals[course.id]
+            total_payments_collected = totals['purchased']['unit_cost']
+            service_fees = totals['purchased']['service_fee']
+            num_refunds = totals['refunded']['count']
+            amount_refunds = totals['refunded']['unit_cost']
+            num_transactions = (num_refunds * 2) + totals['purchased']['count']
 
             yield [
-                university,
-                course,
+                course.org,
+                _course_name(course),
                 num_transactions,
                 total_payments_collected,
                 service_fees,
@@ -266,15 +279,121 @@ class UniversityRevenueShareReport(Report):
         ]
 
 
+def courses_between(start_word, end_word):
+    """
+    Returns the CourseOverviews of all courses whose ids fall alphabetically between start_word and end_word,
+    ordered by course id. These comparisons are unicode-safe.
+
+    The overviews list every course of the modulestore, whether or not anyone is enrolled, without the course
+    descriptors having to be loaded.
+    """
+    courses = [
+        course for course in CourseOverview.get_all_courses()
+        if start_word.lower() <= course.id.to_deprecated_string().lower() <= end_word.lower()
+    ]
+    return sorted(courses, key=lambda course: course.id.to_deprecated_string())
+
+
 def course_ids_between(start_word, end_word):
     """
     Returns a list of all valid course_ids that fall alphabetically between start_word and end_word.
     These comparisons are unicode-safe.
     """
+    return [course.id for course in courses_between(start_word, end_word)]
+
+
+def _course_key(course_id):
+    """
+    Returns the CourseKey for a course id read through values(), which gives the raw column value.
+    """
+    if isinstance(course_id, CourseKey):
+        return course_id
+    return CourseKey.from_string(course_id)
+
 
-    valid_courses = []
-    for course in modulestore().get_courses():
-        course_id = course.id.to_deprecated_string()
-        if start_word.lower() <= course_id.lower() <= end_word.lower():
-            valid_courses.append(course.id)
-    return valid_courses
+def _course_name(course):
+    """
+    Returns the name of the course as shown in the reports, e.g. "6.002x Circuits and Electronics".
+    """
+    display_name = course.display_name or course.id.run.replace('_', ' ')
+    return course.id.course + " " + display_name
+
+
+def _enrollment_counts(course_ids):
+    """
+    Returns a dictionary from course key to the number of active enrollments in each mode of the course, plus the
+    total, in the format of CourseEnrollment.enrollment_counts.
+    """
+    counts = defaultdict(lambda: defaultdict(int))
+    query = use_read_replica_if_available(
+        CourseEnrollment.objects.filter(course_id__in=course_ids, is_active=True).values(
+            'course_id', 'mode'
+        ).order_by().annotate(Count('id'))
+    )
+    for row in query:
+        course_counts = counts[_course_key(row['course_id'])]
+        course_counts[row['mode']] += row['id__count']
+        course_counts['total'] += row['id__count']
+    return counts
+
+
+def _verified_certificate_totals(course_ids):
+    """
+    Returns a dictionary from course key to status ('purchased', 'refunded', ...) to the number of verified
+    certificates of the course with that status and the sums of their unit_cost and service_fee.
+    """
+    totals = defaultdict(lambda: defaultdict(lambda: {
+        'count': 0,
+        'unit_cost': Decimal(0.00),
+        'service_fee': Decimal(0.00),
+    }))
+    query = use_read_replica_if_available(
+        CertificateItem.objects.filter(course_id__in=course_ids, mode='verified').values(
+            'course_id', 'status'
+        ).order_by().annotate(Count('id'), Sum('unit_cost'), Sum('service_fee'))
+    )
+    for row in query:
+        totals[_course_key(row['course_id'])][row['status']] = {
+            'count': row['id__count'],
+            'unit_cost': row['unit_cost__sum'] or Decimal(0.00),
+            'service_fee': row['service_fee__sum'] or Decimal(0.00),
+        }
+    return totals
+
+
+def _min_verified_prices(course_ids, currency):
+    """
+    Returns a dictionary from course key to the minimum price of the course's unexpired verified mode in the given
+    currency, as given by CourseMode.min_course_price_for_verified_for_currency. Courses without such a mode are
+    left out.
+    """
+    now = datetime.now(pytz.UTC)
+    query = use_read_replica_if_available(
+        CourseMode.objects.filter(
+            Q(expiration_datetime__isnull=True) | Q(expiration_datetime__gte=now),
+            course_id__in=course_ids,
+            mode_slug='verified',
+            currency=currency,
+        ).values('course_id', 'min_price')
+    )
+    return {_course_key(row['course_id']): row['min_price'] for row in query}
+
+
+def _verified_certificates_contributing_more_than_minimum(course_ids):
+    """
+    Returns a dictionary from course key to the number of purchased verified certificates of the course that cost
+    more than the course's minimum verified price, as in
+    CertificateItem.verified_certificates_contributing_more_than_minimum.
+    """
+    min_prices = _min_verified_prices(course_ids, 'usd')
+    contributing = defaultdict(int)
+    query = use_read_replica_if_available(
+        CertificateItem.objects.filter(course_id__in=course_ids, mode='verified', status='purchased').values(
+            'course_id', 'unit_cost'
+        ).order_by().annotate(Count('id'))
+    )
+    for row in query:
+        course_key = _course_key(row['course_id'])
+        if row['unit_cost'] > min_prices.get(course_key, 0):
+            contributing[course_key] += row['id__count']
+    return contributing
@@ -154,6 +154,26 @@ class ReportTypeTests(ModuleStoreTestCase):
         csv = csv_file.getvalue()
         self.assertEqual(csv.replace('\r\n', '\n').strip(), self.CORRECT_UNI_REVENUE_SHARE_CSV.strip())
 
+    def test_uni_revenue_share_multiple_courses(self):
+        """
+        Courses are reported in order of their ids, with totals computed per course, including courses without
+        enrollments.
+        """
+        CourseFactory.create(org='MITx', number='1000', display_name=u'Other Course')
+
+        report = initialize_report("university_revenue_share", self.now - self.FIVE_MINS, self.now + self.FIVE_MINS, 'A', 'Z')
+        csv_file = StringIO.StringIO()
+        report.write_csv(csv_file)
+        csv = csv_file.getvalue()
+        self.assertEqual(
+            csv.replace('\r\n', '\n').strip(),
+            dedent("""
+                University,Course,Number of Transactions,Total Payments Collected,Service Fees (if any),Number of Successful Refunds,Total Amount of Refunds
+                MITx,1000 Other Course,0,0,0,0,0
+                MITx,999 Robot Super Course,6,80.00,0.00,2,80.00
+                """).strip()
+        )
+
 
 class ItemizedPurchaseReportTest(ModuleStoreTestCase):
     """
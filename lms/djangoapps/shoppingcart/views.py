@@ -1087,7 +1087,6 @@ def csv_report(request):
             return _render_report_form(start_date, end_date, start_letter, end_letter, report_type, date_fmt_error=True)
 
         report = initialize_report(report_type, start_date, end_date, start_letter, end_letter)
-        items = report.rows()
 
         response = HttpResponse(mimetype='text/csv')
         filename = "purchases_report_{}.csv".format(datetime.datetime.now(pytz.UTC).strftime("%Y-%m-%d-%H-%M-%S"))
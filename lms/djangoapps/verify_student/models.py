@@ -8,6 +8,7 @@ of a student over a period of time. Right now, the only models are the abstract
 `SoftwareSecurePhotoVerification`. The hope is to keep as much of the
 photo verification process as generic as possible.
 """
+from collections import defaultdict
 from datetime import datetime, timedelta
 from email.utils import formatdate
 import functools
@@ -17,6 +18,7 @@ import uuid
 
 from boto.s3.connection import S3Connection
 from boto.s3.key import Key
+from django.core.cache import cache
 from django.core.exceptions import ObjectDoesNotExist
 import pytz
 import requests
@@ -24,6 +26,8 @@ import requests
 from django.conf import settings
 from django.core.urlresolvers import reverse
 from django.db import models
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 from django.contrib.auth.models import User
 from django.utils.translation import ugettext as _
 from model_utils.models import StatusModel
@@ -185,6 +189,9 @@ class PhotoVerification(StatusModel):
         abstract = True
         ordering = ['-created_at']
 
+    # How long the verification statuses of a user are cached; see user_statuses.
+    STATUS_CACHE_TIMEOUT = 60 * 60
+
     ##### Methods listed in the order you'd typically call them
     @classmethod
     def _earliest_allowed_date(cls):
@@ -206,6 +213,9 @@ class PhotoVerification(StatusModel):
         If window is set to anything else, it will check for the reverification
         associated with that window.
         """
+        if earliest_allowed_date is None:
+            return cls.user_status(user, window)[0] == 'approved'
+
         return cls.objects.filter(
             user=user,
             status="approved",
@@ -214,6 +224,26 @@ class PhotoVerification(StatusModel):
             window=window
         ).exists()
 
+    @classmethod
+    def verified_user_ids(cls, user_ids, earliest_allowed_date=None, window=None):
+        """
+        Returns the set of ids, out of the given user ids, of the users for whom
+        user_is_verified is True, using a single query.
+        """
+        if earliest_allowed_date is None:
+            return set(
+                user_id for user_id, (status, __) in cls.user_statuses(user_ids, window).iteritems()
+                if status == 'approved'
+            )
+
+        return set(cls.objects.filter(
+            user__in=user_ids,
+            status="approved",
+            created_at__gte=(earliest_allowed_date
+                             or cls._earliest_allowed_date()),
+            window=window
+        ).values_list('user_id', flat=True))
+
     @classmethod
     def verification_valid_or_pending(cls, user, earliest_allowed_date=None, window=None, queryset=None):
         """
@@ -262,6 +292,9 @@ class PhotoVerification(StatusModel):
         Returns:
             bool: True or False according to existence of valid verifications
         """
+        if earliest_allowed_date is None and queryset is None:
+            return cls.user_status(user, window)[0] in ('approved', 'pending')
+
         return cls.verification_valid_or_pending(user, earliest_allowed_date, window, queryset).exists()
 
     @classmethod
@@ -294,51 +327,136 @@ class PhotoVerification(StatusModel):
 
         If window=None, this checks initial verifications
         If window is set, this checks for the reverification associated with that window
+
+        Statuses are cached; see user_statuses.
+        """
+        return cls.user_statuses([user.id], window)[user.id]
+
+    @classmethod
+    def user_statuses(cls, user_ids, window=None):
         """
-        status = 'none'
-        error_msg = ''
+        Returns a dictionary from user id to the (status, error_msg) tuple that
+        user_status returns for each of the given users.
+
+        The statuses of all the users are cached, until one of their attempts is
+        saved or the status changes because an attempt expires. The statuses that
+        are not cached are computed with a single query. Attempts changed with a
+        queryset's update() don't send post_save, so the code doing so must call
+        clear_cached_statuses itself.
+        """
+        window_id = window.id if window else None
+        now = datetime.now(pytz.UTC)
+        cache_keys = {cls._status_cache_key(user_id): user_id for user_id in user_ids}
+        cached = cache.get_many(cache_keys.keys())
+
+        statuses = {}
+        missing_user_ids = []
+        for cache_key, user_id in cache_keys.iteritems():
+            entry = cached.get(cache_key, {}).get(window_id)
+            if entry is not None and (entry['expires'] is None or entry['expires'] > now):
+                statuses[user_id] = cls._status_from_entry(entry)
+            else:
+                missing_user_ids.append(user_id)
+
+        if missing_user_ids:
+            attempts = defaultdict(list)
+            for attempt in cls.objects.filter(user__in=missing_user_ids, window=window).order_by('-updated_at'):
+                attempts[attempt.user_id].append(attempt)
+
+            to_cache = {}
+            for user_id in missing_user_ids:
+                entry = cls._status_entry(attempts[user_id], window)
+                statuses[user_id] = cls._status_from_entry(entry)
 
-        if cls.user_is_verified(user, window=window):
-            status = 'approved'
+                # The statuses of all the windows of a user are cached together,
+                # so that they can be invalidated together.
+                cache_key = cls._status_cache_key(user_id)
+                entries = dict(cached.get(cache_key, {}))
+                entries[window_id] = entry
+                to_cache[cache_key] = entries
+            cache.set_many(to_cache, cls.STATUS_CACHE_TIMEOUT)
 
-        elif cls.user_has_valid_or_pending(user, window=window):
-            # user_has_valid_or_pending does include 'approved', but if we are
-            # here, we know that the attempt is still pending
-            status = 'pending'
+        return statuses
+
+    @classmethod
+    def clear_cached_statuses(cls, user_id):
+        """
+        Clears the cached verification statuses of the user.
+        """
+        cache.delete(cls._status_cache_key(user_id))
+
+    @classmethod
+    def _status_cache_key(cls, user_id):
+        """
+        Returns the key under which the verification statuses of the user are cached.
+        """
+        return u'verify_student.{}.statuses.{}'.format(cls.__name__, user_id)
+
+    @classmethod
+    def _status_entry(cls, attempts, window):
+        """
+        Returns the cacheable status of a user, given their attempts for the
+        window, most recently updated first.
+
+        The status is stored untranslated, along with the time at which it will
+        change because one of the attempts expires (or None).
+        """
+        earliest_allowed_date = cls._earliest_allowed_date()
+        current_attempts = [attempt for attempt in attempts if attempt.created_at >= earliest_allowed_date]
+        entry = {
+            'status': 'none',
+            'error_msg': '',
+            'expires': min(attempt.expiration_datetime for attempt in current_attempts) if current_attempts else None,
+        }
+
+        valid_statuses = ['submitted', 'approved']
+        if not window:
+            valid_statuses.append('must_retry')
+
+        if any(attempt.status == 'approved' for attempt in current_attempts):
+            entry['status'] = 'approved'
+
+        elif any(attempt.status in valid_statuses for attempt in current_attempts):
+            # the approved attempts have been ruled out above, so the attempt is
+            # still pending
+            entry['status'] = 'pending'
+
+        elif not attempts:
+            # If no verification exists for a *midcourse* reverification, then that just
+            # means the student still needs to reverify.  For *original* verifications,
+            # we return 'none'
+            if window:
+                entry['status'] = 'must_reverify'
 
         else:
             # we need to check the most recent attempt to see if we need to ask them to do
             # a retry
-            try:
-                attempts = cls.objects.filter(user=user, window=window).order_by('-updated_at')
-                attempt = attempts[0]
-            except IndexError:
-
-                # If no verification exists for a *midcourse* reverification, then that just
-                # means the student still needs to reverify.  For *original* verifications,
-                # we return 'none'
-                if(window):
-                    return('must_reverify', error_msg)
-                else:
-                    return ('none', error_msg)
-
-            if attempt.created_at < cls._earliest_allowed_date():
-                return (
-                    'expired',
-                    _("Your {platform_name} verification has expired.").format(platform_name=settings.PLATFORM_NAME)
-                )
+            attempt = attempts[0]
+            if attempt.created_at < earliest_allowed_date:
+                entry['status'] = 'expired'
+            else:
+                # If someone is denied their original verification attempt, they can try to reverify.
+                # However, if a midcourse reverification is denied, that denial is permanent.
+                if attempt.status == 'denied':
+                    entry['status'] = 'must_reverify' if window is None else 'denied'
+                entry['error_msg'] = attempt.error_msg
 
-            # If someone is denied their original verification attempt, they can try to reverify.
-            # However, if a midcourse reverification is denied, that denial is permanent.
-            if attempt.status == 'denied':
-                if window is None:
-                    status = 'must_reverify'
-                else:
-                    status = 'denied'
-            if attempt.error_msg:
-                error_msg = attempt.parsed_error_msg()
+        return entry
 
-        return (status, error_msg)
+    @classmethod
+    def _status_from_entry(cls, entry):
+        """
+        Returns the (status, error_msg) tuple for a status computed by _status_entry.
+        """
+        if entry['status'] == 'expired':
+            error_msg = _("Your {platform_name} verification has expired.").format(
+                platform_name=settings.PLATFORM_NAME
+            )
+        elif entry['error_msg']:
+            error_msg = cls(error_msg=entry['error_msg']).parsed_error_msg()
+        else:
+            error_msg = ''
+        return (entry['status'], error_msg)
 
     @classmethod
     def verification_for_datetime(cls, deadline, candidates):
@@ -570,6 +688,8 @@ class PhotoVerification(StatusModel):
         """
         user = User.objects.get(id=user_id)
         cls.objects.filter(user=user, status="denied").exclude(window=None).update(display=False)
+        # update() doesn't send post_save, which clears the cached statuses
+        cls.clear_cached_statuses(user_id)
 
     @classmethod
     def display_status(cls, user, window):
@@ -656,6 +776,30 @@ class SoftwareSecurePhotoVerification(PhotoVerification):
 
         return True
 
+    @classmethod
+    def reverified_for_all_user_ids(cls, course_id, user_ids):
+        """
+        Returns the set of ids, out of the given user ids, of the users for whom
+        user_is_reverified_for_all is True, using a single query for all users
+        and windows of the course.
+        """
+        all_windows = list(MidcourseReverificationWindow.objects.filter(course_id=course_id))
+        # if there are no windows for a course, then everyone counts as reverified
+        if not all_windows:
+            return set(user_ids)
+
+        # Attempts are ordered by update time, so the last status seen for each
+        # user and window is the status of their most recent reverification
+        latest_statuses = {}
+        attempts = cls.objects.filter(user__in=user_ids, window__in=all_windows).order_by('updated_at')
+        for user_id, window_id, status in attempts.values_list('user_id', 'window_id', 'status'):
+            latest_statuses[(user_id, window_id)] = status
+
+        return set(
+            user_id for user_id in user_ids
+            if all(latest_statuses.get((user_id, window.id)) == "approved" for window in all_windows)
+        )
+
     @classmethod
     def original_verification(cls, user):
         """
@@ -938,6 +1082,16 @@ class SoftwareSecurePhotoVerification(PhotoVerification):
         return attempt
 
 
+@receiver(post_save, sender=SoftwareSecurePhotoVerification)
+@receiver(post_delete, sender=SoftwareSecurePhotoVerification)
+def invalidate_verification_statuses(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """
+    Clears the cached verification statuses of the user whenever one of their
+    attempts changes (e.g. when it is marked ready, submitted, approved or denied).
+    """
+    sender.clear_cached_statuses(instance.user_id)
+
+
 class VerificationCheckpoint(models.Model):
     """Represents a point at which a user is challenged to reverify his or her identity.
         Each checkpoint is uniquely identified by a (course_id, checkpoint_name) tuple.
@@ -6,6 +6,7 @@ import requests.exceptions
 import pytz
 
 from django.conf import settings
+from django.core.cache import cache
 from django.test import TestCase
 from django.db.utils import IntegrityError
 from mock import patch
@@ -129,6 +130,11 @@ def mock_software_secure_post_unavailable(url, headers=None, data=None, **kwargs
 @patch('verify_student.models.requests.post', new=mock_software_secure_post)
 class TestPhotoVerification(TestCase):
 
+    def setUp(self):
+        super(TestPhotoVerification, self).setUp()
+        # Statuses cached for the users of earlier tests, which may have had the same ids
+        cache.clear()
+
     def test_state_transitions(self):
         """
         Make sure we can't make unexpected status transitions.
@@ -390,6 +396,43 @@ class TestPhotoVerification(TestCase):
         message = 'Your {platform_name} verification has expired.'.format(platform_name=settings.PLATFORM_NAME)
         self.assertEquals(reverify_status, ('expired', message))
 
+    def test_user_statuses(self):
+        approved_user = UserFactory.create()
+        SoftwareSecurePhotoVerification.objects.create(user=approved_user, status='approved')
+        pending_user = UserFactory.create()
+        SoftwareSecurePhotoVerification.objects.create(user=pending_user, status='submitted')
+        unverified_user = UserFactory.create()
+        user_ids = [approved_user.id, pending_user.id, unverified_user.id]
+
+        with self.assertNumQueries(1):
+            statuses = SoftwareSecurePhotoVerification.user_statuses(user_ids)
+        self.assertEqual(statuses, {
+            approved_user.id: ('approved', ''),
+            pending_user.id: ('pending', ''),
+            unverified_user.id: ('none', ''),
+        })
+
+        # The statuses are cached
+        with self.assertNumQueries(0):
+            self.assertEqual(SoftwareSecurePhotoVerification.user_statuses(user_ids), statuses)
+            self.assertTrue(SoftwareSecurePhotoVerification.user_is_verified(approved_user))
+            self.assertTrue(SoftwareSecurePhotoVerification.user_has_valid_or_pending(pending_user))
+            self.assertEqual(SoftwareSecurePhotoVerification.verified_user_ids(user_ids), set([approved_user.id]))
+
+    def test_user_status_cache_invalidation(self):
+        user = UserFactory.create()
+        attempt = SoftwareSecurePhotoVerification.objects.create(user=user, status='submitted')
+        self.assertEqual(SoftwareSecurePhotoVerification.user_status(user), ('pending', ''))
+
+        attempt.approve()
+        self.assertEqual(SoftwareSecurePhotoVerification.user_status(user), ('approved', ''))
+
+        # The cached status expires along with the attempt
+        expired = datetime.now(pytz.UTC) + timedelta(days=settings.VERIFY_STUDENT["DAYS_GOOD_FOR"] + 1)
+        with patch('verify_student.models.datetime') as mock_datetime:
+            mock_datetime.now.return_value = expired
+            self.assertEqual(SoftwareSecurePhotoVerification.user_status(user)[0], 'expired')
+
     def test_display(self):
         user = UserFactory.create()
         window = MidcourseReverificationWindowFactory()
@@ -18,6 +18,7 @@ from django.conf import settings
 from django.core.urlresolvers import reverse
 from django.core.exceptions import ObjectDoesNotExist
 from django.core import mail
+from django.core.cache import cache
 from bs4 import BeautifulSoup
 from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
 from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory
@@ -1169,6 +1170,8 @@ class TestSubmitPhotosForVerification(TestCase):
 
     def setUp(self):
         super(TestSubmitPhotosForVerification, self).setUp()
+        # Statuses cached for the users of earlier tests, which may have had the same ids
+        cache.clear()
         self.user = UserFactory.create(username=self.USERNAME, password=self.PASSWORD)
         result = self.client.login(username=self.USERNAME, password=self.PASSWORD)
         self.assertTrue(result, msg="Could not log in")
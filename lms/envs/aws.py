@@ -207,6 +207,10 @@ BULK_EMAIL_MAX_RETRIES = ENV_TOKENS.get('BULK_EMAIL_MAX_RETRIES', BULK_EMAIL_MAX
 BULK_EMAIL_INFINITE_RETRY_CAP = ENV_TOKENS.get('BULK_EMAIL_INFINITE_RETRY_CAP', BULK_EMAIL_INFINITE_RETRY_CAP)
 BULK_EMAIL_LOG_SENT_EMAILS = ENV_TOKENS.get('BULK_EMAIL_LOG_SENT_EMAILS', BULK_EMAIL_LOG_SENT_EMAILS)
 BULK_EMAIL_RETRY_DELAY_BETWEEN_SENDS = ENV_TOKENS.get('BULK_EMAIL_RETRY_DELAY_BETWEEN_SENDS', BULK_EMAIL_RETRY_DELAY_BETWEEN_SENDS)
+
+# Instructor task overrides
+INSTRUCTOR_TASK_MODULE_CHUNK_SIZE = ENV_TOKENS.get('INSTRUCTOR_TASK_MODULE_CHUNK_SIZE', INSTRUCTOR_TASK_MODULE_CHUNK_SIZE)
+INSTRUCTOR_TASK_RESCORE_MODULES_PER_TASK = ENV_TOKENS.get('INSTRUCTOR_TASK_RESCORE_MODULES_PER_TASK', INSTRUCTOR_TASK_RESCORE_MODULES_PER_TASK)
 # We want Bulk Email running on the high-priority queue, so we define the
 # routing key that points to it. At the moment, the name is the same.
 # We have to reset the value here, since we have changed the value of the queue name.
@@ -391,6 +391,11 @@ GENERATE_PROFILE_SCORES = False
 # Used with XQueue
 XQUEUE_WAITTIME_BETWEEN_REQUESTS = 5  # seconds
 
+# Grade histograms shown to staff (see FEATURES['DISPLAY_HISTOGRAMS_TO_STAFF'])
+# are computed per course in a celery task, which is scheduled again when they
+# are viewed more than this many seconds later.
+GRADE_HISTOGRAM_CACHE_TIMEOUT = 5 * 60
+
 
 ############################# SET PATH INFORMATION #############################
 PROJECT_ROOT = path(__file__).abspath().dirname().dirname()  # /edx-platform/lms
@@ -1548,6 +1553,16 @@ BULK_EMAIL_LOG_SENT_EMAILS = False
 # parallel, and what the SES rate is.
 BULK_EMAIL_RETRY_DELAY_BETWEEN_SENDS = 0.02
 
+############################# Instructor Tasks ################################
+
+# Number of StudentModules that are loaded together by instructor tasks that
+# update problem state.  When rescoring, each chunk is also committed together.
+INSTRUCTOR_TASK_MODULE_CHUNK_SIZE = 500
+
+# Rescoring tasks for more StudentModules than this are split into subtasks
+# of at most this size, so that they can run on several workers in parallel.
+INSTRUCTOR_TASK_RESCORE_MODULES_PER_TASK = 2000
+
 ############################# Email Opt In ####################################
 
 # Minimum age for organization-wide email opt in
@@ -1714,6 +1729,7 @@ INSTALLED_APPS = (
     'lms.djangoapps.lms_xblock',
 
     'openedx.core.djangoapps.content.course_structures',
+    'openedx.core.djangoapps.content.course_overviews',
     'course_structure_api',
 
     # CORS and cross-domain CSRF
@@ -6,3 +6,7 @@ else:
     SERVICE_HOST = 'http://localhost:4567'
 
 PREFIX = SERVICE_HOST + '/api/v1'
+
+# Connections kept open to the comments service by each process, and requests issued at once on behalf of a page.
+POOL_SIZE = getattr(settings, "COMMENTS_SERVICE_POOL_SIZE", 10)
+CONCURRENCY = getattr(settings, "COMMENTS_SERVICE_CONCURRENCY", 4)
@@ -1,12 +1,20 @@
 from contextlib import contextmanager
+import copy
 import dogstats_wrapper as dog_stats_api
+import json
 import logging
+from multiprocessing.pool import ThreadPool
 import requests
+import requests.adapters
+import threading
 from django.conf import settings
 from time import time
 from uuid import uuid4
+from django.utils import translation
 from django.utils.translation import get_language
 
+import settings as cc_settings
+
 log = logging.getLogger(__name__)
 
 
@@ -50,6 +58,98 @@ def request_timer(request_id, method, url, tags=None):
     )
 
 
+_session = None
+_thread_pool = None
+_pool_lock = threading.Lock()
+_local = threading.local()
+
+
+def _get_session():
+    """
+    Returns the requests session shared by all requests of this process to the
+    comments service, creating it if needed.
+
+    Sharing the session lets requests reuse its keep-alive connections instead
+    of setting up a new connection each time. At most `POOL_SIZE` connections
+    are opened; further requests wait for a connection to be free.
+    """
+    global _session  # pylint: disable=global-statement
+    with _pool_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(
+                pool_connections=1, pool_maxsize=cc_settings.POOL_SIZE, pool_block=True
+            )
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            _session = session
+        return _session
+
+
+def _get_thread_pool():
+    """
+    Returns the pool of threads used by perform_concurrently, creating it if needed.
+    """
+    global _thread_pool  # pylint: disable=global-statement
+    with _pool_lock:
+        if _thread_pool is None:
+            _thread_pool = ThreadPool(cc_settings.CONCURRENCY)
+        return _thread_pool
+
+
+@contextmanager
+def coalesced_requests():
+    """
+    Within this context, identical GET requests to the comments service are
+    only issued once; later ones return a copy of the first response. Any
+    other request discards the responses stored so far, since it may have
+    changed them.
+
+    Nested contexts share the responses of the outermost one.
+    """
+    if getattr(_local, 'responses', None) is not None:
+        yield
+        return
+    _local.responses = {}
+    try:
+        yield
+    finally:
+        _local.responses = None
+
+
+def perform_concurrently(*calls):
+    """
+    Calls each of the given functions, which should only make requests to the
+    comments service, on a small pool of threads and returns their results in
+    order. The first exception raised by a call is re-raised.
+
+    The calls are made with the active language and request coalescing of the
+    caller. Calls made from within a call are run serially.
+    """
+    if len(calls) < 2 or getattr(_local, 'in_pool', False):
+        return [call() for call in calls]
+
+    language = get_language()
+    responses = getattr(_local, 'responses', None)
+
+    def call_in_context(call):
+        """ Runs the call in the context of the caller's thread. """
+        _local.in_pool = True
+        _local.responses = responses
+        if language:
+            translation.activate(language)
+        try:
+            return call()
+        finally:
+            translation.deactivate()
+            _local.responses = None
+            _local.in_pool = False
+
+    pool = _get_thread_pool()
+    results = [pool.apply_async(call_in_context, (call,)) for call in calls]
+    return [result.get() for result in results]
+
+
 def perform_request(method, url, data_or_params=None, raw=False,
                     metric_action=None, metric_tags=None, paged_results=False):
 
@@ -62,6 +162,17 @@ def perform_request(method, url, data_or_params=None, raw=False,
 
     if data_or_params is None:
         data_or_params = {}
+
+    responses = getattr(_local, 'responses', None)
+    response_key = None
+    if responses is not None:
+        if method == 'get':
+            response_key = (url, json.dumps(data_or_params, sort_keys=True, default=unicode), get_language(), raw)
+            if response_key in responses:
+                return copy.deepcopy(responses[response_key])
+        else:
+            responses.clear()
+
     headers = {
         'X-Edx-Api-Key': getattr(settings, "COMMENTS_SERVICE_KEY", None),
         'Accept-Language': get_language(),
@@ -76,7 +187,7 @@ def perform_request(method, url, data_or_params=None, raw=False,
         data = None
         params = merge_dict(data_or_params, request_id_dict)
     with request_timer(request_id, method, url, metric_tags):
-        response = requests.request(
+        response = _get_session().request(
             method,
             url,
             data=data,
@@ -102,7 +213,7 @@ def perform_request(method, url, data_or_params=None, raw=False,
         raise CommentClient500Error(response.text)
     else:
         if raw:
-            return response.text
+            data = response.text
         else:
             try:
                 data = response.json()
@@ -129,7 +240,9 @@ def perform_request(method, url, data_or_params=None, raw=False,
                     value=data.get('num_pages', 1),
                     tags=metric_tags
                 )
-            return data
+        if response_key is not None:
+            responses[response_key] = copy.deepcopy(data)
+        return data
 
 
 class CommentClientError(Exception):
@@ -0,0 +1,12 @@
+from ratelimitbackend import admin
+
+from .models import CourseOverview
+
+
+class CourseOverviewAdmin(admin.ModelAdmin):
+    search_fields = ('course_id', 'display_name')
+    list_display = ('course_id', 'display_name', 'start', 'end', 'modified')
+    ordering = ('course_id', '-modified')
+
+
+admin.site.register(CourseOverview, CourseOverviewAdmin)
@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+from south.utils import datetime_utils as datetime
+from south.db import db
+from south.v2 import SchemaMigration
+from django.db import models
+
+
+class Migration(SchemaMigration):
+
+    def forwards(self, orm):
+        # Adding field 'CourseOverview.version'
+        # Existing rows get version 0, so that CourseOverview.get_all_courses summarizes them again.
+        db.add_column('course_overviews_courseoverview', 'version',
+                      self.gf('django.db.models.fields.IntegerField')(default=0),
+                      keep_default=False)
+
+        # Adding field 'CourseOverview.display_number_with_default'
+        db.add_column('course_overviews_courseoverview', 'display_number_with_default',
+                      self.gf('django.db.models.fields.TextField')(default='', blank=True),
+                      keep_default=False)
+
+        # Adding field 'CourseOverview.display_org_with_default'
+        db.add_column('course_overviews_courseoverview', 'display_org_with_default',
+                      self.gf('django.db.models.fields.TextField')(default='', blank=True),
+                      keep_default=False)
+
+        # Adding field 'CourseOverview.advertised_start'
+        db.add_column('course_overviews_courseoverview', 'advertised_start',
+                      self.gf('django.db.models.fields.TextField')(null=True),
+                      keep_default=False)
+
+        # Adding field 'CourseOverview.announcement'
+        db.add_column('course_overviews_courseoverview', 'announcement',
+                      self.gf('django.db.models.fields.DateTimeField')(null=True),
+                      keep_default=False)
+
+        # Adding field 'CourseOverview.enrollment_start'
+        db.add_column('course_overviews_courseoverview', 'enrollment_start',
+                      self.gf('django.db.models.fields.DateTimeField')(null=True),
+                      keep_default=False)
+
+        # Adding field 'CourseOverview.enrollment_end'
+        db.add_column('course_overviews_courseoverview', 'enrollment_end',
+                      self.gf('django.db.models.fields.DateTimeField')(null=True),
+                      keep_default=False)
+
+        # Adding field 'CourseOverview.enrollment_domain'
+        db.add_column('course_overviews_courseoverview', 'enrollment_domain',
+                      self.gf('django.db.models.fields.TextField')(null=True),
+                      keep_default=False)
+
+        # Adding field 'CourseOverview.invitation_only'
+        db.add_column('course_overviews_courseoverview', 'invitation_only',
+                      self.gf('django.db.models.fields.BooleanField')(default=False),
+                      keep_default=False)
+
+        # Adding field 'CourseOverview.ispublic'
+        db.add_column('course_overviews_courseoverview', 'ispublic',
+                      self.gf('django.db.models.fields.NullBooleanField')(null=True, blank=True),
+                      keep_default=False)
+
+        # Adding field 'CourseOverview.catalog_visibility'
+        db.add_column('course_overviews_courseoverview', 'catalog_visibility',
+                      self.gf('django.db.models.fields.TextField')(null=True),
+                      keep_default=False)
+
+        # Adding field 'CourseOverview.mobile_available'
+        db.add_column('course_overviews_courseoverview', 'mobile_available',
+                      self.gf('django.db.models.fields.BooleanField')(default=False),
+                      keep_default=False)
+
+        # Adding field 'CourseOverview.visible_to_staff_only'
+        db.add_column('course_overviews_courseoverview', 'visible_to_staff_only',
+                      self.gf('django.db.models.fields.BooleanField')(default=False),
+                      keep_default=False)
+
+        # Adding field 'CourseOverview.days_early_for_beta'
+        db.add_column('course_overviews_courseoverview', 'days_early_for_beta',
+                      self.gf('django.db.models.fields.FloatField')(null=True),
+                      keep_default=False)
+
+        # Adding field 'CourseOverview.pre_requisite_courses_json'
+        db.add_column('course_overviews_courseoverview', 'pre_requisite_courses_json',
+                      self.gf('django.db.models.fields.TextField')(default='[]'),
+                      keep_default=False)
+
+        # Adding field 'CourseOverview.group_access_json'
+        db.add_column('course_overviews_courseoverview', 'group_access_json',
+                      self.gf('django.db.models.fields.TextField')(default='{}'),
+                      keep_default=False)
+
+
+    def backwards(self, orm):
+        # Deleting field 'CourseOverview.version'
+        db.delete_column('course_overviews_courseoverview', 'version')
+
+        # Deleting field 'CourseOverview.display_number_with_default'
+        db.delete_column('course_overviews_courseoverview', 'display_number_with_default')
+
+        # Deleting field 'CourseOverview.display_org_with_default'
+        db.delete_column('course_overviews_courseoverview', 'display_org_with_default')
+
+        # Deleting field 'CourseOverview.advertised_start'
+        db.delete_column('course_overviews_courseoverview', 'advertised_start')
+
+        # Deleting field 'CourseOverview.announcement'
+        db.delete_column('course_overviews_courseoverview', 'announcement')
+
+        # Deleting field 'CourseOverview.enrollment_start'
+        db.delete_column('course_overviews_courseoverview', 'enrollment_start')
+
+        # Deleting field 'CourseOverview.enrollment_end'
+        db.delete_column('course_overviews_courseoverview', 'enrollment_end')
+
+        # Deleting field 'CourseOverview.enrollment_domain'
+        db.delete_column('course_overviews_courseoverview', 'enrollment_domain')
+
+        # Deleting field 'CourseOverview.invitation_only'
+        db.delete_column('course_overviews_courseoverview', 'invitation_only')
+
+        # Deleting field 'CourseOverview.ispublic'
+        db.delete_column('course_overviews_courseoverview', 'ispublic')
+
+        # Deleting field 'CourseOverview.catalog_visibility'
+        db.delete_column('course_overviews_courseoverview', 'catalog_visibility')
+
+        # Deleting field 'CourseOverview.mobile_available'
+        db.delete_column('course_overviews_courseoverview', 'mobile_available')
+
+        # Deleting field 'CourseOverview.visible_to_staff_only'
+        db.delete_column('course_overviews_courseoverview', 'visible_to_staff_only')
+
+        # Deleting field 'CourseOverview.days_early_for_beta'
+        db.delete_column('course_overviews_courseoverview', 'days_early_for_beta')
+
+        # Deleting field 'CourseOverview.pre_requisite_courses_json'
+        db.delete_column('course_overviews_courseoverview', 'pre_requisite_courses_json')
+
+        # Deleting field 'CourseOverview.group_access_json'
+        db.delete_column('course_overviews_courseoverview', 'group_access_json')
+
+
+    models = {
+        'course_overviews.courseoverview': {
+            'Meta': {'object_name': 'CourseOverview'},
+            'advertised_start': ('django.db.models.fields.TextField', [], {'null': 'True'}),
+            'announcement': ('django.db.models.fields.DateTimeField', [], {'null': 'True'}),
+            'catalog_visibility': ('django.db.models.fields.TextField', [], {'null': 'True'}),
+            'course_id': ('xmodule_django.models.CourseKeyField', [], {'unique': 'True', 'max_length': '255', 'db_index': 'True'}),
+            'course_image_url': ('django.db.models.fields.TextField', [], {'blank': 'True'}),
+            'created': ('model_utils.fields.AutoCreatedField', [], {'default': 'datetime.datetime.now'}),
+            'days_early_for_beta': ('django.db.models.fields.FloatField', [], {'null': 'True'}),
+            'display_name': ('django.db.models.fields.TextField', [], {'null': 'True'}),
+            'display_number_with_default': ('django.db.models.fields.TextField', [], {'blank': 'True'}),
+            'display_org_with_default': ('django.db.models.fields.TextField', [], {'blank': 'True'}),
+            'end': ('django.db.models.fields.DateTimeField', [], {'null': 'True'}),
+            'group_access_json': ('django.db.models.fields.TextField', [], {'default': "'{}'"}),
+            'enrollment_domain': ('django.db.models.fields.TextField', [], {'null': 'True'}),
+            'enrollment_end': ('django.db.models.fields.DateTimeField', [], {'null': 'True'}),
+            'enrollment_start': ('django.db.models.fields.DateTimeField', [], {'null': 'True'}),
+            'invitation_only': ('django.db.models.fields.BooleanField', [], {'default': 'False'}),
+            'ispublic': ('django.db.models.fields.NullBooleanField', [], {'null': 'True', 'blank': 'True'}),
+            'mobile_available': ('django.db.models.fields.BooleanField', [], {'default': 'False'}),
+            'modified': ('model_utils.fields.AutoLastModifiedField', [], {'default': 'datetime.datetime.now'}),
+            'org': ('django.db.models.fields.CharField', [], {'max_length': '255', 'db_index': 'True'}),
+            'overview_id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True', 'db_column': "'id'"}),
+            'pre_requisite_courses_json': ('django.db.models.fields.TextField', [], {'default': "'[]'"}),
+            'start': ('django.db.models.fields.DateTimeField', [], {'null': 'True'}),
+            'version': ('django.db.models.fields.IntegerField', [], {'default': '0'}),
+            'visible_to_staff_only': ('django.db.models.fields.BooleanField', [], {'default': 'False'})
+        }
+    }
+
+    complete_apps = ['course_overviews']
@@ -0,0 +1,316 @@
+"""
+Lightweight, denormalized summaries of courses.
+
+A CourseOverview row holds the handful of course attributes needed to list
+courses, so that listing pages and APIs can run an indexed SQL query instead
+of loading every course descriptor from the modulestore.
+"""
+import json
+import logging
+from datetime import datetime
+from math import exp
+
+import dateutil.parser
+from django.db import models
+from django.utils.timezone import UTC
+from django.utils.translation import ugettext as _
+from model_utils.models import TimeStampedModel
+
+from util.date_utils import strftime_localized
+from xmodule.course_module import DEFAULT_START_DATE
+from xmodule.fields import Date
+from xmodule.modulestore import ModuleStoreEnum
+from xmodule.modulestore.django import modulestore
+from xmodule_django.models import CourseKeyField
+
+
+log = logging.getLogger(__name__)
+
+
+class CourseOverview(TimeStampedModel):
+    """
+    Summary of a course, populated from the modulestore when the course is published.
+
+    Overviews mirror the CourseDescriptor attributes used by course listings and by courseware.access, so that
+    they can be passed to listing templates and has_access() in place of the descriptors.
+    """
+    # The version of the summary stored by this code. Rows with an older version lack some of the fields, and are
+    # summarized again from the modulestore when they are read.
+    VERSION = 1
+
+    # The primary key keeps the "id" column, but not the attribute name, which is the course key (see below).
+    overview_id = models.AutoField(primary_key=True, db_column='id')
+
+    course_id = CourseKeyField(max_length=255, db_index=True, unique=True, verbose_name='Course ID')
+
+    # Copied from the course key so that org-wide access filtering can be done in SQL.
+    org = models.CharField(max_length=255, db_index=True)
+
+    # The VERSION of the summary when it was stored; 0 for rows stored before the access and listing fields existed.
+    version = models.IntegerField(default=0)
+
+    display_name = models.TextField(null=True)
+    display_number_with_default = models.TextField(blank=True)
+    display_org_with_default = models.TextField(blank=True)
+    start = models.DateTimeField(null=True)
+    end = models.DateTimeField(null=True)
+    advertised_start = models.TextField(null=True)
+    announcement = models.DateTimeField(null=True)
+    course_image_url = models.TextField(blank=True)
+
+    # Fields used by the access checks of courseware.access.
+    enrollment_start = models.DateTimeField(null=True)
+    enrollment_end = models.DateTimeField(null=True)
+    enrollment_domain = models.TextField(null=True)
+    invitation_only = models.BooleanField(default=False)
+    ispublic = models.NullBooleanField()
+    catalog_visibility = models.TextField(null=True)
+    mobile_available = models.BooleanField(default=False)
+    visible_to_staff_only = models.BooleanField(default=False)
+    days_early_for_beta = models.FloatField(null=True)
+    pre_requisite_courses_json = models.TextField(default='[]')
+    # The course's group_access, as courseware.access.get_access_fields computes it for the course block.
+    group_access_json = models.TextField(default='{}')
+
+    # Every overview is a course; this mirrors CourseDescriptor.category for serializers.
+    category = 'course'
+
+    @property
+    def id(self):  # pylint: disable=invalid-name
+        """
+        The course key, named to match CourseDescriptor.id.
+        """
+        return self.course_id
+
+    @property
+    def location(self):
+        """
+        The usage key of the course block, as CourseDescriptor.location.
+        """
+        block_id = self.course_id.run if self.course_id.deprecated else 'course'
+        return self.course_id.make_usage_key('course', block_id)
+
+    @property
+    def number(self):
+        return self.course_id.course
+
+    @property
+    def display_name_with_default(self):
+        """
+        Returns the display name of the course, falling back to its url name, as CourseDescriptor does.
+        """
+        name = self.display_name
+        if name is None:
+            name = self.location.name.replace('_', ' ')
+        return name.replace('<', '&lt;').replace('>', '&gt;')
+
+    @property
+    def pre_requisite_courses(self):
+        return json.loads(self.pre_requisite_courses_json)
+
+    @property
+    def group_access(self):
+        """
+        The course-level group_access, keyed by user partition id as on the course block.
+        """
+        return {int(partition_id): groups for partition_id, groups in json.loads(self.group_access_json).iteritems()}
+
+    @property
+    def start_date_is_still_default(self):
+        """
+        Checks if the start date set for the course is still default, i.e. .start has not been modified,
+        and .advertised_start has not been set.
+        """
+        return self.advertised_start is None and self.start == DEFAULT_START_DATE
+
+    def has_started(self):
+        return datetime.now(UTC()) > self.start
+
+    def has_ended(self):
+        """
+        Returns True if the current time is after the specified course end date.
+        Returns False if there is no end date specified.
+        """
+        if self.end is None:
+            return False
+
+        return datetime.now(UTC()) > self.end
+
+    def start_datetime_text(self, format_string="SHORT_DATE"):
+        """
+        Returns the desired text corresponding the course's start date and time in UTC.  Prefers .advertised_start,
+        then falls back to .start
+
+        This matches CourseDescriptor.start_datetime_text, except that dates are localized for the active Django
+        language rather than through the XBlock runtime.
+        """
+        if self.advertised_start is not None:
+            try:
+                when = Date().from_json(self.advertised_start)
+            except ValueError:
+                when = None
+            if when is None:
+                return self.advertised_start.title()
+        elif self.start_date_is_still_default:
+            # Translators: TBD stands for 'To Be Determined' and is used when a course
+            # does not yet have an announced start date.
+            return _('TBD')
+        else:
+            when = self.start
+
+        if format_string == "DATE_TIME":
+            return strftime_localized(when, format_string) + u" UTC"
+        return strftime_localized(when, format_string)
+
+    def end_datetime_text(self, format_string="SHORT_DATE"):
+        """
+        Returns the end date or date_time for the course formatted as a string.
+
+        If the course does not have an end date set (course.end is None), an empty string will be returned.
+        """
+        if self.end is None:
+            return ''
+        date_time = strftime_localized(self.end, format_string)
+        return date_time if format_string == "SHORT_DATE" else date_time + u" UTC"
+
+    @property
+    def sorting_score(self):
+        """
+        Returns a score that sorts courses by how "new" they are, as CourseDescriptor.sorting_score does.
+
+        The lower the number the "newer" the course.
+        """
+        now = datetime.now(UTC())
+        scale = 300.0  # about a year
+        if self.announcement:
+            days = (now - self.announcement).days
+            return -exp(-days / scale)
+
+        try:
+            start = dateutil.parser.parse(self.advertised_start)
+            if start.tzinfo is None:
+                start = start.replace(tzinfo=UTC())
+        except (ValueError, AttributeError):
+            start = self.start
+        days = (now - start).days
+        return exp(days / scale)
+
+    def _update_from_course(self, course):
+        """
+        Copies the summarized attributes of the given course descriptor onto this overview, without saving it.
+        """
+        # Import here to avoid loading the courseware app at model import time.
+        from courseware.access import get_access_fields
+        from courseware.courses import course_image_url
+
+        self.course_id = course.id
+        self.org = course.id.org
+        self.version = self.VERSION
+        self.display_name = course.display_name
+        self.display_number_with_default = course.display_number_with_default
+        self.display_org_with_default = course.display_org_with_default
+        self.start = course.start
+        self.end = course.end
+        self.advertised_start = course.advertised_start
+        self.announcement = course.announcement
+        self.course_image_url = course_image_url(course)
+
+        self.enrollment_start = course.enrollment_start
+        self.enrollment_end = course.enrollment_end
+        self.enrollment_domain = course.enrollment_domain
+        self.invitation_only = course.invitation_only
+        # ispublic is only defined by the LMS runtime's mixins.
+        self.ispublic = getattr(course, 'ispublic', None)
+        self.catalog_visibility = course.catalog_visibility
+        self.mobile_available = course.mobile_available
+        self.visible_to_staff_only = course.visible_to_staff_only
+        self.days_early_for_beta = course.days_early_for_beta
+        self.pre_requisite_courses_json = json.dumps(course.pre_requisite_courses)
+        self.group_access_json = json.dumps(get_access_fields(course).group_access)
+
+    @classmethod
+    def create_or_update_from_course(cls, course):
+        """
+        Stores the summary of the given course descriptor, and returns the resulting CourseOverview.
+        """
+        overview, __ = cls.objects.get_or_create(course_id=course.id, defaults={'org': course.id.org})
+        overview._update_from_course(course)  # pylint: disable=protected-access
+        overview.save()
+        return overview
+
+    @classmethod
+    def load_from_modulestore(cls, course_key):
+        """
+        Loads the course from the modulestore and stores its summary.
+
+        Returns the CourseOverview, or None if no course with the given key exists.
+        """
+        course = modulestore().get_course(course_key, depth=0)
+        if course is None or course.scope_ids.block_type != 'course':
+            # Missing courses and ErrorDescriptors cannot be summarized.
+            log.warning('Unable to create course overview for %s: course could not be loaded.', course_key)
+            return None
+        return cls.create_or_update_from_course(course)
+
+    @classmethod
+    def get_from_ids(cls, course_keys):
+        """
+        Returns a queryset of the overviews for the given course keys.
+
+        Overviews that have not been stored yet (e.g. for courses published before this table existed) are
+        created from the modulestore first.
+        """
+        stored = set(overview.course_id for overview in cls.objects.filter(course_id__in=course_keys))
+        for course_key in course_keys:
+            if course_key not in stored:
+                cls.load_from_modulestore(course_key)
+        return cls.objects.filter(course_id__in=course_keys)
+
+    @classmethod
+    def get_all_courses(cls, org=None):
+        """
+        Returns a list of the overviews of all courses, optionally restricted to those of the given org.
+
+        Courses are summarized when they are published, or by the generate_course_overview management command.
+        Courses in the XML modulestore are never published, so unsaved overviews are built for them from the
+        descriptors that store already holds in memory. Courses of the other modulestores whose overview is missing
+        or older than VERSION are summarized from the modulestore here, so that the listing doesn't depend on the
+        table having been backfilled.
+        """
+        overviews = cls.objects.all()
+        if org:
+            overviews = overviews.filter(org=org)
+        overviews = {overview.course_id: overview for overview in overviews}
+
+        # pylint: disable=protected-access
+        xml_store = getattr(modulestore(), '_get_modulestore_by_type', lambda store_type: None)(
+            ModuleStoreEnum.Type.xml
+        )
+        xml_course_keys = set()
+        if xml_store is not None:
+            for course in xml_store.get_courses():
+                xml_course_keys.add(course.id)
+                if course.scope_ids.block_type != 'course' or (org and course.id.org != org):
+                    continue
+                overview = overviews.get(course.id) or cls()
+                overview._update_from_course(course)
+                overviews[course.id] = overview
+
+        for course_key in modulestore().get_course_keys(org=org):
+            if course_key in xml_course_keys:
+                continue
+            overview = overviews.get(course_key)
+            if overview is None or overview.version < cls.VERSION:
+                overview = cls.load_from_modulestore(course_key)
+                if overview is not None:
+                    overviews[course_key] = overview
+
+        return overviews.values()
+
+    def __unicode__(self):
+        return unicode(self.course_id)
+
+
+# Signals must be imported in a file that is automatically loaded at app startup (e.g. models.py). We import them
+# at the end of this file to avoid circular dependencies.
+import signals  # pylint: disable=unused-import
@@ -0,0 +1,28 @@
+import logging
+
+from celery.task import task
+from opaque_keys.edx.keys import CourseKey
+
+
+log = logging.getLogger('edx.celery.task')
+
+
+@task(name=u'openedx.core.djangoapps.content.course_overviews.tasks.update_course_overview')
+def update_course_overview(course_key):
+    """
+    Regenerates and updates the course overview (in the database) for the specified course.
+    """
+    # Import here to avoid circular import.
+    from .models import CourseOverview
+
+    # Callers should pass the course key as a Unicode string, since CourseLocator is not JSON-serializable.
+    if not isinstance(course_key, basestring):
+        raise ValueError('course_key must be a string. {} is not acceptable.'.format(type(course_key)))
+
+    course_key = CourseKey.from_string(course_key)
+
+    try:
+        CourseOverview.load_from_modulestore(course_key)
+    except Exception as ex:
+        log.exception('An error occurred while generating course overview: %s', ex.message)
+        raise
@@ -0,0 +1,133 @@
+from datetime import datetime, timedelta
+
+import ddt
+from django.contrib.auth.models import AnonymousUser
+from django.utils.timezone import UTC
+from opaque_keys.edx.locator import CourseLocator
+from xmodule.course_module import CATALOG_VISIBILITY_ABOUT
+from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
+from xmodule.modulestore.tests.factories import CourseFactory
+from xmodule.partitions.partitions import Group, UserPartition
+
+from courseware.access import has_access
+from courseware.courses import course_image_url
+from student.tests.factories import UserFactory
+from openedx.core.djangoapps.content.course_overviews.models import CourseOverview
+from openedx.core.djangoapps.content.course_overviews.tasks import update_course_overview
+
+
+@ddt.ddt
+class CourseOverviewTests(ModuleStoreTestCase):
+    def setUp(self):
+        super(CourseOverviewTests, self).setUp()
+        self.course = CourseFactory.create(display_name='Overview Test Course')
+        CourseOverview.objects.all().delete()
+
+    def assertOverviewMatchesCourse(self, overview, course):
+        """ Verifies the overview summarizes the given course. """
+        self.assertEqual(overview.id, course.id)
+        self.assertEqual(overview.org, course.id.org)
+        self.assertEqual(overview.display_name, course.display_name)
+        self.assertEqual(overview.start, course.start)
+        self.assertEqual(overview.end, course.end)
+        self.assertEqual(overview.course_image_url, course_image_url(course))
+
+    def test_create_or_update_from_course(self):
+        overview = CourseOverview.create_or_update_from_course(self.course)
+        self.assertOverviewMatchesCourse(overview, self.course)
+
+        # Updating should modify the existing row rather than create a new one.
+        self.course.display_name = 'Renamed'
+        CourseOverview.create_or_update_from_course(self.course)
+        self.assertEqual(CourseOverview.objects.count(), 1)
+        self.assertEqual(CourseOverview.objects.get(course_id=self.course.id).display_name, 'Renamed')
+
+    def test_get_from_ids(self):
+        """
+        Missing overviews should be created from the modulestore, and unknown courses skipped.
+        """
+        missing_key = CourseLocator(org='no', course='such', run='course')
+        overviews = list(CourseOverview.get_from_ids([self.course.id, missing_key]))
+
+        self.assertEqual(len(overviews), 1)
+        self.assertOverviewMatchesCourse(overviews[0], self.course)
+
+    def test_update_course_overview(self):
+        # Method requires string input
+        self.assertRaises(ValueError, update_course_overview, self.course.id)
+
+        update_course_overview(unicode(self.course.id))
+        self.assertOverviewMatchesCourse(CourseOverview.objects.get(course_id=self.course.id), self.course)
+
+    def test_listing_attributes(self):
+        """
+        Overviews should render in course listings exactly as the descriptors they summarize.
+        """
+        course = CourseFactory.create(
+            org='ListingX',
+            number='L101',
+            display_coursenumber='Listing 101',
+            advertised_start='Spring 2016',
+            end=datetime(2015, 1, 1, tzinfo=UTC()),
+        )
+        overview = CourseOverview.create_or_update_from_course(course)
+
+        self.assertEqual(overview.location, course.location)
+        self.assertEqual(overview.number, course.number)
+        self.assertEqual(overview.display_name_with_default, course.display_name_with_default)
+        self.assertEqual(overview.display_number_with_default, 'Listing 101')
+        self.assertEqual(overview.display_org_with_default, course.display_org_with_default)
+        self.assertEqual(overview.start_datetime_text(), course.start_datetime_text())
+        self.assertEqual(overview.end_datetime_text(), course.end_datetime_text())
+        self.assertEqual(overview.has_ended(), course.has_ended())
+        self.assertEqual(overview.sorting_score, course.sorting_score)
+        self.assertEqual(course_image_url(overview), course_image_url(course))
+
+    @ddt.data(
+        ('see_exists', {}),
+        ('see_exists', {'start': datetime.now(UTC()) + timedelta(days=10)}),
+        ('see_exists', {'enrollment_end': datetime.now(UTC()) - timedelta(days=1), 'invitation_only': True}),
+        ('see_in_catalog', {'catalog_visibility': CATALOG_VISIBILITY_ABOUT}),
+        ('see_about_page', {'catalog_visibility': CATALOG_VISIBILITY_ABOUT}),
+        ('load', {'visible_to_staff_only': True}),
+        ('load', {'start': datetime.now(UTC()) + timedelta(days=10), 'days_early_for_beta': 20}),
+        # course-level group_access which refers to a partition the course doesn't define denies non-staff
+        ('load', {
+            'user_partitions': [UserPartition(0, 'Cohorts', 'Partition', [Group(0, 'Alpha')])],
+            'group_access': {1: [0]},
+        }),
+    )
+    @ddt.unpack
+    def test_has_access(self, action, course_fields):
+        course = CourseFactory.create(**course_fields)
+        overview = CourseOverview.create_or_update_from_course(course)
+
+        for user in (AnonymousUser(), UserFactory.create(), UserFactory.create(is_staff=True)):
+            self.assertEqual(has_access(user, action, overview), has_access(user, action, course))
+
+    def test_get_all_courses(self):
+        other_course = CourseFactory.create(org='OtherX')
+        CourseOverview.get_from_ids([self.course.id, other_course.id])
+
+        self.assertItemsEqual(
+            [overview.id for overview in CourseOverview.get_all_courses()],
+            [self.course.id, other_course.id]
+        )
+        self.assertEqual([overview.id for overview in CourseOverview.get_all_courses(org='OtherX')], [other_course.id])
+
+    def test_get_all_courses_reads_through(self):
+        """
+        Courses without an overview, or with one stored before the access and listing fields, are summarized from
+        the modulestore.
+        """
+        other_course = CourseFactory.create(org='OtherX')
+        CourseOverview.get_from_ids([other_course.id])
+        CourseOverview.objects.filter(course_id=other_course.id).update(version=0, catalog_visibility=None)
+
+        overviews = {overview.id: overview for overview in CourseOverview.get_all_courses()}
+        self.assertItemsEqual(overviews.keys(), [self.course.id, other_course.id])
+        for course in (self.course, other_course):
+            self.assertOverviewMatchesCourse(overviews[course.id], course)
+            stored = CourseOverview.objects.get(course_id=course.id)
+            self.assertEqual(stored.version, CourseOverview.VERSION)
+            self.assertEqual(stored.catalog_visibility, course.catalog_visibility)
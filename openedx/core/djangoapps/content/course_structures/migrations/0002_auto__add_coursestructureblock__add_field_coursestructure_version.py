@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+import datetime
+from south.db import db
+from south.v2 import SchemaMigration
+from django.db import models
+
+
+class Migration(SchemaMigration):
+
+    def forwards(self, orm):
+        # Adding model 'CourseStructureBlock'
+        db.create_table('course_structures_coursestructureblock', (
+            ('id', self.gf('django.db.models.fields.AutoField')(primary_key=True)),
+            ('course_id', self.gf('xmodule_django.models.CourseKeyField')(max_length=255, db_index=True)),
+            ('usage_key', self.gf('xmodule_django.models.UsageKeyField')(max_length=255)),
+            ('path', self.gf('django.db.models.fields.CharField')(max_length=255, db_index=True)),
+            ('update_version', self.gf('django.db.models.fields.CharField')(max_length=255, null=True, blank=True)),
+            ('block_json', self.gf('django.db.models.fields.TextField')()),
+        ))
+        db.send_create_signal('course_structures', ['CourseStructureBlock'])
+
+        # Adding unique constraint on 'CourseStructureBlock', fields ['course_id', 'usage_key']
+        db.create_unique('course_structures_coursestructureblock', ['course_id', 'usage_key'])
+
+        # Adding field 'CourseStructure.version'
+        db.add_column('course_structures_coursestructure', 'version',
+                      self.gf('django.db.models.fields.CharField')(max_length=255, null=True, blank=True),
+                      keep_default=False)
+
+
+    def backwards(self, orm):
+        # Removing unique constraint on 'CourseStructureBlock', fields ['course_id', 'usage_key']
+        db.delete_unique('course_structures_coursestructureblock', ['course_id', 'usage_key'])
+
+        # Deleting model 'CourseStructureBlock'
+        db.delete_table('course_structures_coursestructureblock')
+
+        # Deleting field 'CourseStructure.version'
+        db.delete_column('course_structures_coursestructure', 'version')
+
+
+    models = {
+        'course_structures.coursestructure': {
+            'Meta': {'object_name': 'CourseStructure'},
+            'course_id': ('xmodule_django.models.CourseKeyField', [], {'unique': 'True', 'max_length': '255', 'db_index': 'True'}),
+            'created': ('model_utils.fields.AutoCreatedField', [], {'default': 'datetime.datetime.now'}),
+            'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'modified': ('model_utils.fields.AutoLastModifiedField', [], {'default': 'datetime.datetime.now'}),
+            'structure_json': ('django.db.models.fields.TextField', [], {'null': 'True', 'blank': 'True'}),
+            'version': ('django.db.models.fields.CharField', [], {'max_length': '255', 'null': 'True', 'blank': 'True'})
+        },
+        'course_structures.coursestructureblock': {
+            'Meta': {'unique_together': "(('course_id', 'usage_key'),)", 'object_name': 'CourseStructureBlock'},
+            'block_json': ('django.db.models.fields.TextField', [], {}),
+            'course_id': ('xmodule_django.models.CourseKeyField', [], {'max_length': '255', 'db_index': 'True'}),
+            'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'path': ('django.db.models.fields.CharField', [], {'max_length': '255', 'db_index': 'True'}),
+            'update_version': ('django.db.models.fields.CharField', [], {'max_length': '255', 'null': 'True', 'blank': 'True'}),
+            'usage_key': ('xmodule_django.models.UsageKeyField', [], {'max_length': '255'})
+        }
+    }
+
+    complete_apps = ['course_structures']
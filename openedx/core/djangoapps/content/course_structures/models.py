@@ -1,10 +1,11 @@
 import json
 import logging
 
+from django.db import models
 from model_utils.models import TimeStampedModel
 
 from util.models import CompressedTextField
-from xmodule_django.models import CourseKeyField
+from xmodule_django.models import CourseKeyField, UsageKeyField
 
 
 logger = logging.getLogger(__name__)  # pylint: disable=invalid-name
@@ -20,12 +21,68 @@ class CourseStructure(TimeStampedModel):
     # we'd have to be careful about caching.
     structure_json = CompressedTextField(verbose_name='Structure JSON', blank=True, null=True)
 
+    # Version of the modulestore structure the data was generated from. Only set for modulestores that version
+    # their courses (i.e. Split); used to skip regeneration when nothing has been published since.
+    version = models.CharField(max_length=255, blank=True, null=True)
+
     @property
     def structure(self):
         if self.structure_json:
             return json.loads(self.structure_json)
         return None
 
+
+class CourseStructureBlock(models.Model):
+    """
+    A single block of a course structure.
+
+    The full structure is also stored as one compressed document on CourseStructure. The per-block rows allow
+    fetching a subtree without loading the whole document, and record the modulestore version of each block so
+    that regeneration only needs to reload blocks that changed.
+    """
+    # Width of each segment of the materialized path.
+    PATH_SEGMENT_FORMAT = u'{:04d}.'
+
+    course_id = CourseKeyField(max_length=255, db_index=True, verbose_name='Course ID')
+    usage_key = UsageKeyField(max_length=255, verbose_name='Usage Key')
+
+    # Materialized path of the block: the position of each ancestor (and of the block itself) among its siblings,
+    # starting below the root. The root has an empty path, so a subtree is every row whose path starts with the
+    # path of its root.
+    path = models.CharField(max_length=255, db_index=True)
+
+    # Modulestore version in which the block last changed, if the modulestore versions blocks (i.e. Split).
+    update_version = models.CharField(max_length=255, blank=True, null=True)
+
+    block_json = models.TextField(verbose_name='Block JSON')
+
+    class Meta(object):  # pylint: disable=missing-docstring
+        unique_together = ('course_id', 'usage_key')
+
+    @property
+    def block(self):
+        """
+        The JSON-parsed block, in the same format as the entries of CourseStructure.structure['blocks'].
+        """
+        return json.loads(self.block_json)
+
+    @classmethod
+    def get_subtree(cls, course_key, usage_key):
+        """
+        Returns the structure of the subtree rooted at the given block, in the same format as
+        CourseStructure.structure, or None if the block is not part of the stored structure.
+        """
+        try:
+            root = cls.objects.get(course_id=course_key, usage_key=usage_key)
+        except cls.DoesNotExist:
+            return None
+
+        rows = cls.objects.filter(course_id=course_key, path__startswith=root.path)
+        return {
+            'root': unicode(root.usage_key),
+            'blocks': {unicode(row.usage_key): row.block for row in rows},
+        }
+
 # Signals must be imported in a file that is automatically loaded at app startup (e.g. models.py). We import them
 # at the end of this file to avoid circular dependencies.
 import signals  # pylint: disable=unused-import
@@ -1,3 +1,5 @@
+from django.conf import settings
+from django.core.cache import cache
 from django.dispatch.dispatcher import receiver
 
 from xmodule.modulestore.django import SignalHandler
@@ -6,8 +8,15 @@ from xmodule.modulestore.django import SignalHandler
 @receiver(SignalHandler.course_published)
 def listen_for_course_publish(sender, course_key, **kwargs):  # pylint: disable=unused-argument
     # Import tasks here to avoid a circular import.
-    from .tasks import update_course_structure
+    from .tasks import update_course_structure, update_pending_cache_key
 
-    # Note: The countdown=0 kwarg is set to to ensure the method below does not attempt to access the course
-    # before the signal emitter has finished all operations. This is also necessary to ensure all tests pass.
-    update_course_structure.apply_async([unicode(course_key)], countdown=0)
+    # Publishes tend to come in bursts while authors work, so updates are debounced: the task is delayed, and
+    # further publishes before it starts are picked up by that same run instead of scheduling another one. The flag
+    # expires on its own in case the task is lost.
+    delay = getattr(settings, 'COURSE_STRUCTURE_UPDATE_DELAY', 30)
+    if not cache.add(update_pending_cache_key(course_key), True, delay + 300):
+        return
+
+    # Note: The countdown kwarg also ensures the method below does not attempt to access the course before the
+    # signal emitter has finished all operations.
+    update_course_structure.apply_async([unicode(course_key)], countdown=delay)
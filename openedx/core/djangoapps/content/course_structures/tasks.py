@@ -2,13 +2,45 @@ import json
 import logging
 
 from celery.task import task
-from opaque_keys.edx.keys import CourseKey
+from django.core.cache import cache
+from opaque_keys.edx.keys import CourseKey, UsageKey
+from xmodule.modulestore import ModuleStoreEnum
 from xmodule.modulestore.django import modulestore
 
 
 log = logging.getLogger('edx.celery.task')
 
 
+def update_pending_cache_key(course_key):
+    """
+    Returns the cache key flagging that a structure update has been scheduled, but not started, for the course.
+    """
+    return u'course_structures.update_pending.{}'.format(course_key)
+
+
+def _block_summary(curr_block, key, children):
+    """
+    Returns the structure entry for the given block, whose usage key and child usage keys are given as strings.
+    """
+    block = {
+        "usage_key": key,
+        "block_type": curr_block.category,
+        "display_name": curr_block.display_name,
+        "children": children
+    }
+
+    # Retrieve these attributes separately so that we can fail gracefully if the block doesn't have the attribute.
+    attrs = (('graded', False), ('format', None))
+    for attr, default in attrs:
+        if hasattr(curr_block, attr):
+            block[attr] = getattr(curr_block, attr, default)
+        else:
+            log.warning('Failed to retrieve %s attribute of block %s. Defaulting to %s.', attr, key, default)
+            block[attr] = default
+
+    return block
+
+
 def _generate_course_structure(course_key):
     """
     Generates a course structure dictionary for the specified course.
@@ -20,23 +52,9 @@ def _generate_course_structure(course_key):
         curr_block = blocks_stack.pop()
         children = curr_block.get_children() if curr_block.has_children else []
         key = unicode(curr_block.scope_ids.usage_id)
-        block = {
-            "usage_key": key,
-            "block_type": curr_block.category,
-            "display_name": curr_block.display_name,
-            "children": [unicode(child.scope_ids.usage_id) for child in children]
-        }
-
-        # Retrieve these attributes separately so that we can fail gracefully if the block doesn't have the attribute.
-        attrs = (('graded', False), ('format', None))
-        for attr, default in attrs:
-            if hasattr(curr_block, attr):
-                block[attr] = getattr(curr_block, attr, default)
-            else:
-                log.warning('Failed to retrieve %s attribute of block %s. Defaulting to %s.', attr, key, default)
-                block[attr] = default
-
-        blocks_dict[key] = block
+        blocks_dict[key] = _block_summary(
+            curr_block, key, [unicode(child.scope_ids.usage_id) for child in children]
+        )
 
         # Add this blocks children to the stack so that we can traverse them as well.
         blocks_stack.extend(children)
@@ -46,13 +64,152 @@ def _generate_course_structure(course_key):
     }
 
 
+def _get_block_versions(course_key):
+    """
+    Reads the versions of the published blocks of a Split course directly from its structure document, without
+    instantiating any blocks.
+
+    Returns a dictionary with the structure version, the root usage key, and a map from usage key to the block's
+    update version and child usage keys (keys are strings). Returns None for courses in other modulestores.
+    """
+    store = modulestore()
+    if store.get_modulestore_type(course_key) != ModuleStoreEnum.Type.split:
+        return None
+
+    # pylint: disable=protected-access
+    split_store = store._get_modulestore_for_courselike(course_key)
+    structure = split_store._lookup_course(course_key.for_branch(ModuleStoreEnum.BranchName.published)).structure
+    # pylint: enable=protected-access
+
+    def usage_key_string(block_key):
+        """ Converts a (block type, block id) pair to a usage key string. """
+        block_type, block_id = block_key
+        return unicode(course_key.make_usage_key(block_type, block_id))
+
+    return {
+        "version": unicode(structure['_id']),
+        "root": usage_key_string(structure['root']),
+        "blocks": {
+            usage_key_string(block_key): {
+                "version": unicode(block_data.edit_info.update_version),
+                "children": [usage_key_string(child) for child in block_data.fields.get('children', [])],
+            }
+            for block_key, block_data in structure['blocks'].iteritems()
+        }
+    }
+
+
+def _regenerate_course_structure(course_key, block_versions, previous_blocks):
+    """
+    Generates a course structure dictionary for the specified course, reusing the previously stored entries of
+    blocks that have not changed.
+
+    Arguments:
+        block_versions (dict): The current block versions, as returned by _get_block_versions.
+        previous_blocks (dict): The stored CourseStructureBlocks of the course, keyed by usage key string.
+    """
+    store = modulestore()
+    blocks_dict = {}
+    reloaded = 0
+
+    # Each entry is a block key and whether one of its ancestors changed. Inherited settings (e.g. graded) may have
+    # changed for every descendant of a changed block, so those are reloaded as well.
+    blocks_stack = [(block_versions['root'], False)]
+    while blocks_stack:
+        key, ancestor_changed = blocks_stack.pop()
+        if key in blocks_dict:
+            continue
+
+        version_info = block_versions['blocks'][key]
+        previous_block = previous_blocks.get(key)
+        changed = (
+            ancestor_changed or
+            previous_block is None or
+            previous_block.update_version != version_info['version']
+        )
+
+        if changed:
+            curr_block = store.get_item(UsageKey.from_string(key))
+            blocks_dict[key] = _block_summary(curr_block, key, version_info['children'])
+            reloaded += 1
+        else:
+            blocks_dict[key] = previous_block.block
+
+        blocks_stack.extend((child, changed) for child in version_info['children'])
+
+    log.info('Regenerated course structure for %s, reloading %d of %d blocks.', course_key, reloaded, len(blocks_dict))
+    return {
+        "root": block_versions['root'],
+        "blocks": blocks_dict
+    }
+
+
+def _block_paths(structure):
+    """
+    Returns a map from usage key to materialized path (see CourseStructureBlock.path) for the given structure.
+    """
+    from .models import CourseStructureBlock
+
+    paths = {structure['root']: u''}
+    queue = [structure['root']]
+    while queue:
+        key = queue.pop(0)
+        for index, child in enumerate(structure['blocks'][key]['children']):
+            # Blocks with multiple parents are stored at their first position in a breadth-first traversal.
+            if child not in paths:
+                paths[child] = paths[key] + CourseStructureBlock.PATH_SEGMENT_FORMAT.format(index)
+                queue.append(child)
+    return paths
+
+
+def _update_structure_blocks(course_key, structure, block_versions, previous_blocks):
+    """
+    Brings the stored CourseStructureBlocks of the course in line with the given structure, writing only the rows
+    that changed.
+    """
+    from .models import CourseStructureBlock
+
+    paths = _block_paths(structure)
+    new_rows = []
+    for key, block in structure['blocks'].iteritems():
+        if key not in paths:
+            continue
+
+        block_json = json.dumps(block, sort_keys=True)
+        update_version = block_versions['blocks'].get(key, {}).get('version') if block_versions else None
+        previous_block = previous_blocks.pop(key, None)
+
+        if previous_block is None:
+            new_rows.append(CourseStructureBlock(
+                course_id=course_key,
+                usage_key=UsageKey.from_string(key),
+                path=paths[key],
+                update_version=update_version,
+                block_json=block_json,
+            ))
+        elif (previous_block.path, previous_block.update_version, previous_block.block_json) != \
+                (paths[key], update_version, block_json):
+            previous_block.path = paths[key]
+            previous_block.update_version = update_version
+            previous_block.block_json = block_json
+            previous_block.save()
+
+    CourseStructureBlock.objects.bulk_create(new_rows)
+
+    # Any blocks left over are no longer part of the course.
+    if previous_blocks:
+        CourseStructureBlock.objects.filter(id__in=[block.id for block in previous_blocks.itervalues()]).delete()
+
+
 @task(name=u'openedx.core.djangoapps.content.course_structures.tasks.update_course_structure')
 def update_course_structure(course_key):
     """
     Regenerates and updates the course structure (in the database) for the specified course.
+
+    For Split courses only the blocks whose version changed since the stored structure was generated are reloaded.
     """
     # Import here to avoid circular import.
-    from .models import CourseStructure
+    from .models import CourseStructure, CourseStructureBlock
 
     # Ideally we'd like to accept a CourseLocator; however, CourseLocator is not JSON-serializable (by default) so
     # Celery's delayed tasks fail to start. For this reason, callers should pass the course key as a Unicode string.
@@ -61,19 +218,41 @@ def update_course_structure(course_key):
 
     course_key = CourseKey.from_string(course_key)
 
+    # Publishes from now on are not covered by this run, so allow them to schedule another update.
+    cache.delete(update_pending_cache_key(course_key))
+
+    store = modulestore()
     try:
-        structure = _generate_course_structure(course_key)
+        # The structure describes the course as learners see it, regardless of the default branch of this process.
+        with store.branch_setting(ModuleStoreEnum.Branch.published_only, course_key):
+            block_versions = _get_block_versions(course_key)
+            stored_version = CourseStructure.objects.filter(course_id=course_key).values_list('version', flat=True)
+            if block_versions and block_versions['version'] in stored_version:
+                log.info('Course structure for %s is already up to date.', course_key)
+                return
+
+            previous_blocks = {
+                unicode(block.usage_key): block for block in CourseStructureBlock.objects.filter(course_id=course_key)
+            }
+            if block_versions and previous_blocks:
+                structure = _regenerate_course_structure(course_key, block_versions, previous_blocks)
+            else:
+                structure = _generate_course_structure(course_key)
     except Exception as ex:
         log.exception('An error occurred while generating course structure: %s', ex.message)
         raise
 
     structure_json = json.dumps(structure)
+    version = block_versions['version'] if block_versions else None
 
     cs, created = CourseStructure.objects.get_or_create(
         course_id=course_key,
-        defaults={'structure_json': structure_json}
+        defaults={'structure_json': structure_json, 'version': version}
     )
 
     if not created:
         cs.structure_json = structure_json
+        cs.version = version
         cs.save()
+
+    _update_structure_blocks(course_key, structure, block_versions, previous_blocks)
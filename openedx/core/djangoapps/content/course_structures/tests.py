@@ -1,11 +1,17 @@
 import json
 
-from xmodule.modulestore.django import SignalHandler
+from django.core.cache import cache
+from mock import patch
+from xmodule.modulestore import ModuleStoreEnum
+from xmodule.modulestore.django import SignalHandler, modulestore
 from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
 from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory
-from openedx.core.djangoapps.content.course_structures.models import CourseStructure
+from openedx.core.djangoapps.content.course_structures import tasks
+from openedx.core.djangoapps.content.course_structures.models import CourseStructure, CourseStructureBlock
 from openedx.core.djangoapps.content.course_structures.signals import listen_for_course_publish
-from openedx.core.djangoapps.content.course_structures.tasks import _generate_course_structure, update_course_structure
+from openedx.core.djangoapps.content.course_structures.tasks import (
+    _generate_course_structure, update_course_structure, update_pending_cache_key
+)
 
 
 class SignalDisconnectTestMixin(object):
@@ -24,6 +30,7 @@ class CourseStructureTaskTests(ModuleStoreTestCase):
         self.course = CourseFactory.create()
         self.section = ItemFactory.create(parent=self.course, category='chapter', display_name='Test Section')
         CourseStructure.objects.all().delete()
+        CourseStructureBlock.objects.all().delete()
 
     def test_generate_course_structure(self):
         blocks = {}
@@ -128,3 +135,81 @@ class CourseStructureTaskTests(ModuleStoreTestCase):
         cs = CourseStructure.objects.get(course_id=course_id)
         self.assertEqual(cs.course_id, course_id)
         self.assertEqual(cs.structure, structure)
+
+
+class IncrementalCourseStructureTests(SignalDisconnectTestMixin, ModuleStoreTestCase):
+    """
+    Tests for regenerating the structure of Split courses from their previously stored blocks.
+    """
+    def setUp(self):
+        super(IncrementalCourseStructureTests, self).setUp()
+        self.course = CourseFactory.create(default_store=ModuleStoreEnum.Type.split)
+        self.section = ItemFactory.create(parent=self.course, category='chapter', display_name='Test Section')
+        self.subsection = ItemFactory.create(parent=self.section, category='sequential', display_name='Lesson')
+        self.other_section = ItemFactory.create(parent=self.course, category='chapter', display_name='Other Section')
+        update_course_structure(unicode(self.course.id))
+
+    def test_only_changed_blocks_reloaded(self):
+        self.subsection.display_name = 'Renamed Lesson'
+        modulestore().update_item(self.subsection, self.user.id)
+        modulestore().publish(self.subsection.location, self.user.id)
+
+        with patch.object(tasks, '_block_summary', wraps=tasks._block_summary) as block_summary:
+            update_course_structure(unicode(self.course.id))
+
+        reloaded = [args[1] for args, __ in block_summary.call_args_list]
+        self.assertIn(unicode(self.subsection.location), reloaded)
+        self.assertNotIn(unicode(self.other_section.location), reloaded)
+        self.assertEqual(CourseStructure.objects.get(course_id=self.course.id).structure,
+                         _generate_course_structure(self.course.id))
+        self.assertEqual(
+            CourseStructureBlock.objects.get(usage_key=self.subsection.location).block['display_name'],
+            'Renamed Lesson'
+        )
+
+    def test_unchanged_version_skipped(self):
+        with patch.object(tasks, '_block_summary') as block_summary:
+            update_course_structure(unicode(self.course.id))
+        self.assertFalse(block_summary.called)
+
+    def test_get_subtree(self):
+        subtree = CourseStructureBlock.get_subtree(self.course.id, self.section.location)
+        self.assertEqual(subtree['root'], unicode(self.section.location))
+        self.assertEqual(
+            set(subtree['blocks'].keys()),
+            {unicode(self.section.location), unicode(self.subsection.location)}
+        )
+
+        subtree = CourseStructureBlock.get_subtree(self.course.id, self.course.location)
+        self.assertEqual(subtree, CourseStructure.objects.get(course_id=self.course.id).structure)
+
+    def test_removed_blocks_deleted(self):
+        modulestore().delete_item(self.other_section.location, self.user.id)
+        update_course_structure(unicode(self.course.id))
+
+        self.assertFalse(CourseStructureBlock.objects.filter(usage_key=self.other_section.location).exists())
+        self.assertNotIn(
+            unicode(self.other_section.location),
+            CourseStructure.objects.get(course_id=self.course.id).structure['blocks']
+        )
+
+
+class CourseStructureSignalTests(ModuleStoreTestCase):
+    def setUp(self):
+        super(CourseStructureSignalTests, self).setUp()
+        self.course = CourseFactory.create()
+        cache.delete(update_pending_cache_key(self.course.id))
+
+    def test_publishes_debounced(self):
+        """
+        Publishes before the scheduled update starts should not schedule further updates.
+        """
+        with patch.object(tasks.update_course_structure, 'apply_async') as apply_async:
+            listen_for_course_publish(None, self.course.id)
+            listen_for_course_publish(None, self.course.id)
+            self.assertEqual(apply_async.call_count, 1)
+
+            # Once the update starts, the next publish schedules a new one.
+            cache.delete(update_pending_cache_key(self.course.id))
+            listen_for_course_publish(None, self.course.id)
+            self.assertEqual(apply_async.call_count, 2)